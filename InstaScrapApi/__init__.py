@@ -1,2 +1,12 @@
 #package moudles
-from .core.back_end import ROOT, USER, logging
\ No newline at end of file
+from .core.back_end import ROOT, USER, logging
+from .core.batch import BATCH
+from .core.cache import CACHE
+from .core.checkpoint import CHECKPOINT
+from .core.columns import COLUMNS
+from .core.index import INDEX
+from .core.proxies import PROXIES
+from .core.records import MEDIA, PROFILE, STORY
+from .core.sinks import NDJSON
+from .core.throttle import ACCOUNTS
+from .core.async_end import ASYNC_ROOT, ASYNC_USER
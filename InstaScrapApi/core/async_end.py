@@ -0,0 +1,597 @@
+#standard modules
+import json
+import time
+import asyncio
+import weakref
+import logging
+import traceback
+
+#third party modules
+import tqdm
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+#package modules
+from .back_end import USER
+from .engine import NODES
+from .throttle import BACKOFF
+from .meta import (RATE_LIMIT, OUTPUT, hashes, headers)
+from .parser import MediaDict, MediaNode, ProfilePref, SidecarNodes, StoryReel, UserNode, VideoLink
+
+
+# rate limit backoff of every shared client session
+BACKOFFS = weakref.WeakKeyDictionary()
+
+
+async def Paginate(fetch, scrap, after: str, options: list) -> None:
+    '''follow an instagram cursor chain inside the event loop
+
+    every page is parsed in its own task while the next page is requested
+
+    Parameters
+    ----------
+    fetch : coroutine function
+        fetch(after, number) -> (page, has_next, end_cursor) or None to stop
+    scrap : coroutine function
+        scrap(page) parses one fetched page
+    after : str
+        instagram cursor of the first page
+    options : list
+        [number_or_requests, number_of_left, per_request] as USER.__ParseVar returns
+    '''
+    scraping = []
+    options = list(options)
+    while options[0] > 0:
+        if options[0] == 1:
+            number = options[1]
+        else:
+            number = options[2]
+
+        result = await fetch(after, number)
+        if result is None:
+            break
+
+        page, has_next, after = result
+        scraping.append(asyncio.ensure_future(scrap(page)))
+        if not has_next:
+            break
+        options[0] -= 1
+
+    await asyncio.gather(*scraping)
+
+
+class ASYNC_USER(object):
+    '''create instagram user to be scraped on asyncio event loop
+
+        every method is a coroutine returning the same data as USER,
+        many users can share one aiohttp.ClientSession so thousands of
+        cursor chains run over one connection pool without a thread each
+
+        Parameters
+        ----------
+        username : str
+            instagram username
+        cookies : dict
+            valid session cookies (default None == the cookies of session cookie jar)
+        session: aiohttp.ClientSession
+            shared client session (default new session owned by the user)
+        verbose: bool
+            enable debug messages
+        bar: bool
+            enable progress bar
+        timeout: int
+            request timeout
+        threads: int
+            number of running requests
+        '''
+
+    # formating the output
+    p = OUTPUT()
+
+    def __init__(self, username, cookies=None, session=None, proxy={}, ssl=True, verbose=False, bar=True, timeout=20, threads=5):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for async mode .. pip install aiohttp")
+
+        self.info = None
+        self.full_info = None
+        self.user_valid = None
+        self.username = username
+
+        self.bar = bar
+        self.ssl = ssl
+        self.proxy = proxy.get("https") or proxy.get("http")
+        self.cookie = cookies
+        self.timeout = timeout
+        self.verbose = verbose
+        self.info_retry_attempts = 10
+
+        self.headers = dict(headers)
+        if cookies and cookies.get("csrftoken"):
+            self.headers["x-csrftoken"] = cookies["csrftoken"]
+
+        self.media_list = NODES()
+        self.media_error = []
+
+        self.following_list = []
+        self.following_error = []
+
+        self.follower_list = []
+        self.follower_error = []
+
+        self.story = None
+        self.story_error = []
+
+        self.session = session
+        self.own_session = session is None
+        self.jail = asyncio.Semaphore(threads)
+        if session is None:
+            self.backoff = BACKOFF()
+        else:
+            self.backoff = BACKOFFS.setdefault(session, BACKOFF())
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.Close()
+
+    async def Close(self) -> None:
+        '''close the client session if it was created by this user'''
+        if self.own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __Get(self, url: str) -> tuple:
+        if self.session is None:
+            connection_pool = aiohttp.TCPConnector(limit=30, ssl=None if self.ssl else False)
+            self.session = aiohttp.ClientSession(connector=connection_pool)
+
+        async with self.jail:
+            # every coroutine waits out the shared rate limit pause
+            while self.backoff.Pause() > 0:
+                await asyncio.sleep(self.backoff.Pause())
+            sent = time.time()
+            async with self.session.get(url, headers=self.headers, cookies=self.cookie, proxy=self.proxy,
+                                        ssl=None if self.ssl else False,
+                                        timeout=aiohttp.ClientTimeout(total=self.timeout)) as query_result:
+                if query_result.status == 200:
+                    self.backoff.Success()
+                elif query_result.status in BACKOFF.THROTTLED:
+                    self.backoff.Failure(query_result.status, query_result.headers.get("Retry-After"), sent)
+                return query_result.status, await query_result.read()
+
+    def __Bar(self, total: int, unit: str):
+        if self.bar:
+            progress = tqdm.trange(total, unit=unit, leave=False, ascii=True)
+            progress.refresh(True)
+            return progress
+
+    def __Cookies(self) -> dict:
+        # cookies of the user or else the instagram cookies of the shared session
+        if self.cookie:
+            return self.cookie
+        if self.session is None:
+            return {}
+        return {name: cookie.value for name, cookie in self.session.cookie_jar.filter_cookies(URL("https://www.instagram.com")).items()}
+
+    def __Valid(self) -> bool:
+        if not self.user_valid:
+            msg = "NOT_VALID_USERNAME"
+            logging.error("{0} <{1}>".format(msg,self.username))
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(msg) + self.p.High(self.username))
+        return self.user_valid
+
+    async def Information(self) -> dict:
+        '''collecting user basic information, same data as USER.Information'''
+        cookies = self.__Cookies()
+        if not cookies:
+            msg = "NON_VALID_SESSION"
+            logging.error(msg)
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(msg))
+            return
+        if cookies.get("csrftoken"):
+            self.headers["x-csrftoken"] = cookies["csrftoken"]
+
+        retry_attempts = 0
+        query_url = "https://www.instagram.com/%s/?__a=1" % (self.username)
+
+        while True:
+            try:
+                errors = []
+                status_code, query_result = await self.__Get(query_url)
+
+                # make sure that user is exist
+                if b"The link you followed may be broken" in query_result:
+                    self.user_valid = False
+                    errors.append("USER_NOT_FOUND")
+                    logging.error("USER_NOT_FOUND <%s>" % self.username)
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error("USER_NOT_FOUND" + self.p.High(self.username)))
+                    return {"errors": errors, "pref": "", "full": ""}
+
+                if status_code != 200:
+                    raise(RATE_LIMIT)
+
+                profile_page = json.loads(query_result)['graphql']['user']
+                pref_data = ProfilePref(profile_page, self.username)
+
+                # make sure account is not private or followed by the viewer
+                if pref_data['private'] and not profile_page['followed_by_viewer']:
+                    if not pref_data['id'] == cookies.get("ds_user_id"):
+                        errors.append("PRIVATE_USER")
+                        logging.error("<%s> PRIVATE_USER" % self.username)
+                        if self.verbose:
+                            tqdm.tqdm.write(self.p.Error("PRIVATE_USER" + self.p.High(self.username)))
+
+                business_info = await self.__BusinessInfo(pref_data['id'])
+
+                logging.info("<%s> profile scraped successfuly" % self.username)
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Success("profile scraped successfuly" + self.p.High(self.username)))
+
+                data = {
+                    "errors": errors,
+                    "pref": pref_data,
+                    "full": business_info
+                }
+                self.user_valid = True
+                break
+
+            except RATE_LIMIT:
+                msg = "RATE_LIMITED [information]"
+                logging.error(msg)
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(msg))
+                # throttled responses already paused the backoff inside __Get
+                if status_code not in BACKOFF.THROTTLED:
+                    self.backoff.Failure(status_code)
+
+            except Exception as e:
+                retry_attempts += 1
+                msg = "{0}\n{1}".format(e, traceback.format_exc())
+                logging.error(msg)
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(msg))
+
+                # handle max faild retries
+                if retry_attempts > self.info_retry_attempts:
+                    errors.append("MAX_RETRIES")
+                    logging.error("MAX_RETRIES <%s>" % self.username)
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error("MAX_RETRIES" + self.p.High(self.username)))
+                    data = {
+                        "errors": errors,
+                        "pref": "",
+                        "full": ""
+                    }
+                    break
+
+        # set object data
+        self.info = data['pref']
+        self.full_info = data['full']
+        return data
+
+    async def __BusinessInfo(self, profile_id: str):
+        # bounded by info_retry_attempts, "" once they are used up
+        business_mail = "https://i.instagram.com/api/v1/users/{0}/info/".format(profile_id)
+        for _ in range(self.info_retry_attempts + 1):
+            try:
+                business_status, business_result = await self.__Get(business_mail)
+                if business_status == 200:
+                    return json.loads(business_result)['user']
+                elif business_status == 400:
+                    return json.loads(business_result)
+
+                msg = "RATE_LIMITED [business_info]"
+                logging.error(msg)
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(msg))
+                # throttled responses already paused the backoff inside __Get
+                if business_status not in BACKOFF.THROTTLED:
+                    self.backoff.Failure(business_status)
+
+            except Exception as e:
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+
+        logging.error("MAX_RETRIES [business_info] <%s>" % self.username)
+        return ""
+
+    async def __Page(self, query_url: str, path: tuple, errors: list, label: str) -> tuple:
+        # request one graphql page and return (page, has_next, end_cursor)
+        while True:
+            try:
+                status_code, query_result = await self.__Get(query_url)
+                query_json = json.loads(query_result)
+                # unknown tags and users are answered with a null node, not a rate limit
+                if query_json.get('status') == "ok" and (query_json.get('data') or {}).get(path[0], {}) is None:
+                    errors.append("NOT_FOUND [%s]" % label)
+                    logging.error("NOT_FOUND [%s] <%s>" % (label, self.username))
+                    return
+                try:
+                    page = query_json['data']
+                    for key in path:
+                        page = page[key]
+                    has_next = page['page_info']['has_next_page']
+                    after_that = page['page_info']['end_cursor']
+                except (KeyError, TypeError):
+                    raise(RATE_LIMIT)
+
+                if query_json['status'] == "ok":
+                    return page, has_next, after_that
+                return
+
+            except RATE_LIMIT:
+                errors.append("RATE_LIMITED")
+                logging.error("RATE_LIMITED [%s]" % label)
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [%s]" % label + self.p.High(self.username)))
+                # throttled responses already paused the backoff inside __Get
+                if status_code not in BACKOFF.THROTTLED:
+                    self.backoff.Failure(status_code)
+
+            except Exception as e:
+                if str(e).upper() not in errors:
+                    errors.append(str(e).upper())
+                    logging.error("%s \n %s" % (e,traceback.format_exc()))
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error(str(e).upper()))
+
+    async def __MediaDetail(self, node_db: list) -> list:
+        # pictures need no post page
+        if not (node_db[1] == "GraphSidecar" or node_db[8]):
+            return [MediaDict(node_db)]
+
+        # bounded by info_retry_attempts, deleted or private posts keep the row of the graph node
+        post_page_url = "https://www.instagram.com/p/%s" % (node_db[2])
+        for _ in range(self.info_retry_attempts + 1):
+            try:
+                status_code, post_page = await self.__Get(post_page_url)
+                if status_code in (404, 410):
+                    logging.error("POST_NOT_FOUND <%s>" % node_db[2])
+                    break
+                elif status_code != 200:
+                    # throttled responses already paused the backoff inside __Get
+                    continue
+
+                # GET SIDECAR ALL MEDIA
+                if node_db[1] == "GraphSidecar":
+                    return [MediaDict(child) for child in SidecarNodes(node_db, post_page)]
+                # GET VIDEO
+                node_db[13] = VideoLink(post_page)
+                return [MediaDict(node_db)]
+            except Exception as e:
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+        else:
+            logging.error("MAX_RETRIES [post] <%s>" % node_db[2])
+
+        # the display url is not the video or the sidecar children
+        node_db[13] = None
+        return [MediaDict(node_db)]
+
+    async def __ScrapMediaPage(self, page: dict, media_list: list, bar) -> None:
+        # detail pages of one media page are requested together
+        details = await asyncio.gather(*[self.__MediaDetail(MediaNode(nodes['node'])) for nodes in page['edges']])
+        for node_dbs in details:
+            for node_db in node_dbs:
+                media_list.Add(node_db)
+            if self.bar:
+                bar.update(1)
+
+    async def Media(self, get_number=0, per_request=50, after="") -> dict:
+        '''collecting user media, same parameters and data as USER.Media'''
+        if not self.__Valid():
+            return
+
+        time1 = time.time()
+        profile_id = self.info['id']
+        nodes_number = self.info['media'] if get_number == 0 else get_number
+        media_progress = self.__Bar(nodes_number, " Node @ " + self.username)
+
+        async def fetch(after, number):
+            query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"id":%s,"first":%s,"after":"%s"}' % (hashes['profile_media'], str(profile_id), number, after)
+            return await self.__Page(query_url, ('user', 'edge_owner_to_timeline_media'), self.media_error, "media")
+
+        async def scrap(page):
+            await self.__ScrapMediaPage(page, self.media_list, media_progress)
+
+        await Paginate(fetch, scrap, after, USER._USER__ParseVar(nodes_number, per_request))
+
+        logging.info("profile media scraped successfuly <{0}>".format(self.username))
+        if self.verbose:
+            tqdm.tqdm.write(self.p.Success("profile media scraped successfuly {0}".format(self.p.High(self.username))))
+        if self.bar:
+            media_progress.close()
+
+        return {
+            "errors": self.media_error,
+            "media": {
+                "count": len(self.media_list),
+                "data": self.media_list
+            },
+            "time": time.time()-time1
+        }
+
+    async def __Users(self, hash_name: str, edge: str, number_key: str, get_number: int, per_request: int, after: str, users_list: list, errors: list, label: str) -> dict:
+        if not self.__Valid():
+            return
+
+        time1 = time.time()
+        profile_id = self.info['id']
+        users_number = self.info[number_key] if get_number == 0 else get_number
+        progress = self.__Bar(users_number, " %s @ %s" % (label, self.username))
+
+        async def fetch(after, number):
+            query_url = 'https://www.instagram.com:443/graphql/query/?query_hash=%s&variables={"id":%s,"first":%s,"after":"%s"}' % (hashes[hash_name], profile_id, number, after)
+            return await self.__Page(query_url, ('user', edge), errors, label)
+
+        async def scrap(page):
+            for user in page['edges']:
+                users_list.append(UserNode(user['node']))
+                if self.bar:
+                    progress.update(1)
+
+        await Paginate(fetch, scrap, after, USER._USER__ParseVar(users_number, per_request))
+
+        logging.info("profile {0} scraped successfuly <{1}>".format(label, self.username))
+        if self.verbose:
+            tqdm.tqdm.write(self.p.Success("profile {0} scraped successfuly {1}".format(label, self.p.High(self.username))))
+        if self.bar:
+            progress.close()
+
+        return {
+            "errors": errors,
+            "following": {
+                "count": len(users_list),
+                "data": users_list
+            },
+            "time": time.time()-time1
+        }
+
+    async def Following(self, get_number=0, per_request=50, after="") -> dict:
+        '''collecting user following list, same parameters and data as USER.Following'''
+        return await self.__Users('profile_following', 'edge_follow', 'following', get_number, per_request, after,
+                                  self.following_list, self.following_error, "following")
+
+    async def Follower(self, get_number=0, per_request=50, after="") -> dict:
+        '''collecting user follower list, same parameters and data as USER.Follower'''
+        return await self.__Users('profile_follower', 'edge_followed_by', 'followers', get_number, per_request, after,
+                                  self.follower_list, self.follower_error, "follower")
+
+    async def Story(self) -> dict:
+        '''getting user stories, same data as USER.Story'''
+        time1 = time.time()
+        json_type = json.dumps([self.info['id']])
+
+        try:
+            query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"reel_ids":%s,"precomposed_overlay":false}' % (hashes['story'], json_type)
+            status_code, query_result = await self.__Get(query_url)
+            for user in json.loads(query_result)['data']['reels_media']:
+                self.story = StoryReel(user)
+
+        except KeyError:
+            pass
+
+        except Exception as e:
+            self.story_error.append(e)
+            logging.error(str(e).upper())
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error((str(e).upper())))
+
+        logging.info("profile story scraped successfuly <{0}>".format(self.username))
+        if self.verbose:
+            tqdm.tqdm.write(self.p.Success("profile story scraped successfuly {0}".format(self.p.High(self.username))))
+
+        try:
+            c = len(self.story['stories'])
+        except TypeError:
+            c = 0
+
+        return {
+            "errors": self.story_error,
+            "stories": {
+                "count": c,
+                'data': self.story
+            },
+            "time": time.time()-time1
+        }
+
+
+class ASYNC_ROOT(ASYNC_USER):
+    '''create instagram root user (viewer) to be scraped on asyncio event loop
+
+        Parameters
+        ----------
+        same as ASYNC_USER
+        '''
+
+    def __init__(self, username, cookies=None, session=None, proxy={}, ssl=True, verbose=False, bar=True, timeout=20, threads=5):
+        super().__init__(username, cookies, session, proxy, ssl, verbose, bar, timeout, threads)
+
+        self.explore_list = NODES()
+        self.explore_error = []
+
+    async def Search(self, query: str) -> dict:
+        '''search for keyword, same data as ROOT.Search'''
+        query_url = "https://www.instagram.com/web/search/topsearch/?context=blended&query=%s" % query
+        status_code, query_result = await self._ASYNC_USER__Get(query_url)
+        return json.loads(query_result)
+
+    async def HashTag(self, tag: str, get_number=50, per_request=50, after="") -> dict:
+        '''search for hashtag and collect its media, same parameters and data as ROOT.HashTag'''
+        time1 = time.time()
+        errors = []
+        hashtag_list = NODES()
+        hashtag_progress = self._ASYNC_USER__Bar(get_number, " Node @ #" + tag)
+
+        async def fetch(after, number):
+            query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"tag_name":"%s","first":%s,"after":"%s"}' % (hashes['hash_tag'], tag, number, after)
+            return await self._ASYNC_USER__Page(query_url, ('hashtag', 'edge_hashtag_to_media'), errors, "hashtag")
+
+        async def scrap(page):
+            await self._ASYNC_USER__ScrapMediaPage(page, hashtag_list, hashtag_progress)
+
+        await Paginate(fetch, scrap, after, USER._USER__ParseVar(get_number, per_request))
+
+        if self.bar:
+            hashtag_progress.close()
+
+        return {
+            "errors": errors,
+            "media": {
+                "count": len(hashtag_list),
+                "data": hashtag_list
+            },
+            "time": time.time()-time1
+        }
+
+    async def HashTags(self, tags: list, get_number=50, per_request=50) -> dict:
+        '''collect the media of many hashtags at once, same data as ROOT.HashTags'''
+        time1 = time.time()
+        tags = list(dict.fromkeys(tags))
+        results = await asyncio.gather(*[self.HashTag(tag, get_number, per_request) for tag in tags])
+        return {
+            "errors": [error for result in results for error in result['errors']],
+            "tags": dict(zip(tags, results)),
+            "time": time.time()-time1
+        }
+
+    async def ExploreMedia(self, get_number=14, per_request=14, after="1") -> dict:
+        '''collecting root user explore media, same parameters and data as ROOT.ExploreMedia'''
+        if not self._ASYNC_USER__Valid():
+            return
+
+        time1 = time.time()
+        explore_progress = self._ASYNC_USER__Bar(get_number, " Node @ Explore " + self.username)
+
+        async def fetch(after, number):
+            query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"first":%s,"after":"%s"}' % (hashes['explore'], number, after)
+            return await self._ASYNC_USER__Page(query_url, ('user', 'edge_web_discover_media'), self.explore_error, "explore")
+
+        async def scrap(page):
+            await self._ASYNC_USER__ScrapMediaPage(page, self.explore_list, explore_progress)
+
+        await Paginate(fetch, scrap, after, USER._USER__ParseVar(get_number, per_request))
+
+        logging.info("profile explore media scraped successfuly <{0}>".format(self.username))
+        if self.verbose:
+            tqdm.tqdm.write(self.p.Success("profile explore media scraped successfuly {0}".format(self.p.High(self.username))))
+        if self.bar:
+            explore_progress.close()
+
+        return {
+            "errors": self.explore_error,
+            "media": {
+                "count": len(self.explore_list),
+                "data": self.explore_list
+            },
+            "time": time.time()-time1
+        }
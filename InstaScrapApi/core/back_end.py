@@ -2,15 +2,23 @@
 import json
 import time
 import logging
-import traceback
 import threading
+import traceback
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor
 
 #third party modules
 import tqdm
 import requests
-from bs4 import BeautifulSoup as bs
 
 #package modules
+from .checkpoint import CHECKPOINT
+from .engine import NODES, PAGINATOR, STREAM, TASKS
+from .index import INDEX
+from .proxies import PROXIES
+from .throttle import SCHEDULER
+from .parser import CommentNode, HighlightItem, HighlightReel, MediaDict, MediaNode, ProfilePref, SidecarNodes, StoryReel, UserFields, UserNode, VideoLink
+from .records import MEDIA, PROFILE, STORY
 from .meta import (EXCUTION_ERROR, FAILD_LOGIN, PRIVATE_USER, RATE_LIMIT, OUTPUT, hashes, headers)
 
 
@@ -30,6 +38,8 @@ class USER(object):
             valid session cookies
         session: requests.Session
             active requests session
+        proxy: dict or PROXIES
+            requests proxies, or pool of proxies picked per request
         verbose: bool
             enable debug messages
         bar: bool
@@ -38,13 +48,31 @@ class USER(object):
             request timeout
         threads: int
             number of running threads
+        checkpoint: str or CHECKPOINT
+            sqlite file saving every scraped page to resume interrupted crawls (default None)
+        records: bool
+            keep scraped rows as compact MEDIA/PROFILE/STORY records instead of dicts (default False)
+        pools: tuple
+            (page pool, resolver pool) executors shared with other users instead of own pools of threads (default None)
+        index: str or INDEX
+            sqlite file keeping the profile id of every username for Resolve() (default None)
         '''
 
     # formating the output
     p = OUTPUT()
 
-    def __init__(self, username, cookies=None, session=None, proxy={}, ssl=True, verbose=False, bar=True, timeout=20, threads=5):
+    # query hash, media edge and extra variables of the post crawls
+    POST_CRAWLS = {
+        "comments": ("post_comments", "edge_media_to_comment", ''),
+        "likes": ("psot_likes", "edge_liked_by", '"include_reel":false,')
+    }
+
+    # get_number of crawls whose total is not known
+    ALL = 2 ** 31
+
+    def __init__(self, username, cookies=None, session=None, proxy={}, ssl=True, verbose=False, bar=True, timeout=20, threads=5, checkpoint=None, records=False, pools=None, index=None):
         self.info = None
+        self.__business = threading.Lock()
         self.full_info = None
         self.user_valid = None
         self.username = username
@@ -56,23 +84,35 @@ class USER(object):
         self.cookie = cookies
         self.timeout = timeout
         self.verbose = verbose
+        self.records = records
         self.info_retry_attempts = 10
 
-        self.threads = []
-        self.media_list = []
+        self.media_list = NODES()
         self.media_error = []
         
         self.following_list = [] 
         self.following_error = []  
-        self.following_threads = []
 
         self.follower_list = []
         self.follower_error = [] 
-        self.follower_threads = []
 
         self.story = None
         self.story_error = []
 
+        self.tagged_list = NODES()
+        self.tagged_error = []
+
+        self.highlight_list = NODES("id")
+        self.highlight_error = []
+
+        if isinstance(checkpoint, str):
+            checkpoint = CHECKPOINT(checkpoint)
+        self.checkpoint = checkpoint
+
+        if isinstance(index, str):
+            index = INDEX(index)
+        self.index = index
+
         if session:
             self.session = session
         else:
@@ -80,20 +120,43 @@ class USER(object):
             self.session.cookies = requests.cookies.cookiejar_from_dict(self.cookie)
         
         self.__PreSession()
-        self.jail = threading.Semaphore(threads)
+        if pools:
+            self.pool, self.resolver = pools
+        else:
+            # every cursor chain runs on this pool so the number of threads stays bounded
+            self.pool = ThreadPoolExecutor(max_workers=threads)
+            # post pages of sidecars and videos are requested on their own pool
+            self.resolver = ThreadPoolExecutor(max_workers=threads)
 
     def __PreSession(self):
-        connection_pool = requests.adapters.HTTPAdapter(pool_connections=30, pool_maxsize=30)
-        self.session.mount("https://", connection_pool)
-        self.session.mount("http://", connection_pool)
         self.session.verify = self.ssl
-        self.session.proxies = self.proxy
+        self.session.proxies = {} if isinstance(self.proxy, PROXIES) else self.proxy
         self.session.headers = self.headers
+        # every user sharing the session shares its connection pool, request budgets and rate limit backoff
+        if not hasattr(self.session, "scheduler"):
+            connection_pool = requests.adapters.HTTPAdapter(pool_connections=30, pool_maxsize=30)
+            self.session.mount("https://", connection_pool)
+            self.session.mount("http://", connection_pool)
+            self.session.scheduler = SCHEDULER(self.session)
+        self.scheduler = self.session.scheduler
+        self.backoff = self.scheduler.backoff
+        if isinstance(self.proxy, PROXIES):
+            self.scheduler.proxies = self.proxy
         return self.session
 
-    def Information(self) -> dict:
+    def Information(self, business="wait", refresh=False) -> dict:
         '''collecting user basic information
 
+        Parameters
+        ----------
+        business : str
+            how the business info (full_info) is requested (default wait)
+            wait: before returning, background: on the resolver pool while the
+            caller goes on, lazy: on first access to full_info, skip: never,
+            "full" is None unless business is wait
+        refresh : bool
+            skip the cached profile and business info responses of scheduler.cache (default False)
+
         Returns
         -------
         dict
@@ -118,6 +181,9 @@ class USER(object):
             "full": {}
             }
         '''
+        if business not in ("wait", "background", "lazy", "skip"):
+            raise ValueError("unknown business option <%s>" % business)
+
         # checking whether cookies or session are there
         if (self.cookie == None) and (dict(self.session.cookies) == {}):
             msg = "NON_VALID_SESSION"
@@ -127,6 +193,7 @@ class USER(object):
             return 
 
         done = False
+        pending = None
         retry_attempts = 0
         query_url = "https://www.instagram.com/%s/?__a=1" % (self.username)
         
@@ -134,13 +201,16 @@ class USER(object):
             try:
                 errors = []
                 # whether to use cookies or session
-                query_result = self.session.get(query_url, timeout=self.timeout)
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.INTERACTIVE, refresh=refresh,
+                                                  validate=lambda response: "id" in response.json()['graphql']['user'])
 
                 # make sure that user is exist  
                 if "The link you followed may be broken" in query_result.text:
                     self.user_valid = False
                     errors.append("USER_NOT_FOUND")
                     logging.error("USER_NOT_FOUND <%s>" % self.username)
+                    if self.index is not None:
+                        self.index.Remove(self.username)
                     msg = self.p.Error("USER_NOT_FOUND" + self.p.High(self.username))
                     if self.verbose:
                         tqdm.tqdm.write(msg)
@@ -148,18 +218,14 @@ class USER(object):
                 
                 if query_result.status_code == 200:
                     # scraping pref data from json response
+                    self.backoff.Success()
                     profile_page = query_result.json()['graphql']['user']
-                    profile_id = profile_page['id']
-                    profile_full_name = profile_page['full_name']
-                    profile_node_number = profile_page['edge_owner_to_timeline_media']['count']
-                    profile_following = profile_page['edge_follow']['count']
-                    profile_follwers = profile_page['edge_followed_by']['count']
-                    profile_pic = profile_page['profile_pic_url']
-                    profile_pic_hd = profile_page['profile_pic_url_hd']
-                    profile_biography = profile_page['biography']
-                    profile_security = profile_page['is_private']
-                    profile_is_verified = profile_page['is_verified']
+                    pref_data = ProfilePref(profile_page, self.username)
+                    profile_id = pref_data['id']
+                    profile_security = pref_data['private']
                     followed_by_viewer = profile_page['followed_by_viewer']
+                    if self.index is not None:
+                        self.index.Add(self.username, profile_id)
                 else:
                     raise(RATE_LIMIT)
 
@@ -172,40 +238,14 @@ class USER(object):
                         msg = self.p.Error("PRIVATE_USER" + self.p.High(self.username))
                         if self.verbose:
                             tqdm.tqdm.write(msg)
-                            
-                # generate user pref data
-                pref_data = {
-                    "id": profile_id,
-                    "username": self.username,
-                    "full_name": profile_full_name,
-                    "media": profile_node_number,
-                    "followers": profile_follwers,
-                    "following": profile_following,
-                    "profile_picture": {
-                        "normal": profile_pic,
-                        "hd": profile_pic_hd
-                    },
-                    "biography": profile_biography,
-                    'private': profile_security,
-                    "verified": profile_is_verified 
-                }
 
-                business_done = False
-                while not business_done:
-                    business_mail = "https://i.instagram.com/api/v1/users/{0}/info/".format(pref_data['id'])
-                    business_result = self.session.get(business_mail, timeout=self.timeout)
-                    if business_result.status_code == 200:
-                        business_done = True
-                        business_info = business_result.json()['user']
-                    elif business_result.status_code == 400:
-                        business_info = business_result.json()
-                        business_done = True
-                    else:
-                        msg = "RATE_LIMITED [business_info]"
-                        logging.error(msg)
-                        if self.verbose:
-                            tqdm.tqdm.write(self.p.Error(msg))
-                        time.sleep(30)
+                business_info = None
+                if business == "wait":
+                    business_info = self.__BusinessInfo(profile_id, refresh)
+                elif business == "background":
+                    pending = self.resolver.submit(self.__BusinessInfo, profile_id, refresh)
+                elif business == "lazy":
+                    pending = partial(self.__BusinessInfo, profile_id, refresh)
 
                 logging.info("<%s> profile scraped successfuly" % self.username)
                 msg = self.p.Success("profile scraped successfuly" + self.p.High(self.username))
@@ -228,7 +268,7 @@ class USER(object):
                 logging.error(msg)
                 if self.verbose:
                     tqdm.tqdm.write(self.p.Error(msg))
-                time.sleep(30)
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
             
             except Exception as e:
 
@@ -260,11 +300,85 @@ class USER(object):
                        
         # set object data
         self.info = data['pref']
-        self.full_info = data['full']
+        self.full_info = data['full'] if pending is None else pending
         self.__CsrfToken()
         return data
 
-    def Media(self, get_number=0, per_request=50, after="") -> dict:
+    def Resolve(self, business="skip") -> dict:
+        '''profile id of the user from the index, Information() if it is not there
+
+        a profile taken from the index carries only its id and username so
+        Media(), Follower() and Following() with get_number=0 run until the
+        last page instead of the profile counts
+
+        Parameters
+        ----------
+        business : str
+            Information(business=) when the username is not in the index (default skip)
+
+        Returns
+        -------
+        dict
+            user profile information as Information()["pref"]
+            {
+            "id": "",
+            "username": ""
+            }
+        '''
+        profile_id = self.index.Get(self.username) if self.index is not None else None
+        if profile_id is None:
+            self.Information(business=business)
+            return self.info
+
+        logging.info("<%s> profile resolved from index" % self.username)
+        self.info = {"id": profile_id, "username": self.username}
+        self.full_info = None
+        self.user_valid = True
+        self.__CsrfToken()
+        return self.info
+
+    @property
+    def full_info(self):
+        '''business info of the user, waits for it with Information(business="background"|"lazy")'''
+        with self.__business:
+            if isinstance(self.__full_info, Future):
+                self.__full_info = self.__full_info.result()
+            elif callable(self.__full_info):
+                self.__full_info = self.__full_info()
+            return self.__full_info
+
+    @full_info.setter
+    def full_info(self, full_info):
+        self.__full_info = full_info
+
+    def __BusinessInfo(self, profile_id: str, refresh=False):
+        # bounded by info_retry_attempts, "" once they are used up
+        business_mail = "https://i.instagram.com/api/v1/users/{0}/info/".format(profile_id)
+        for _ in range(self.info_retry_attempts + 1):
+            try:
+                business_result = self.scheduler.Get(business_mail, timeout=self.timeout, priority=self.scheduler.INTERACTIVE, refresh=refresh,
+                                                     validate=lambda response: "user" in response.json())
+                if business_result.status_code == 200:
+                    self.backoff.Success()
+                    return business_result.json()['user']
+                elif business_result.status_code == 400:
+                    return business_result.json()
+
+                msg = "RATE_LIMITED [business_info]"
+                logging.error(msg)
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(msg))
+                self.backoff.Failure(business_result.status_code, business_result.headers.get("Retry-After"))
+
+            except Exception as e:
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+
+        logging.error("MAX_RETRIES [business_info] <%s>" % self.username)
+        return ""
+
+    def Media(self, get_number=0, per_request=50, after="", sink=None, incremental=False) -> dict:
         ''' collecting user media 
 
         Parameters
@@ -275,6 +389,11 @@ class USER(object):
             number of media each request (default 50)
         after : str
             represent instagram cursor of last media
+        sink : COLUMNS or NDJSON
+            send the media to sink.Add() as they are scraped instead of keeping them, ex: COLUMNS(MEDIA) (default None)
+        incremental : bool
+            only media newer than the newest one of the last incremental crawl, the chain
+            stops at the first page reaching it, needs index (default False)
 
         Returns
         -------
@@ -297,12 +416,16 @@ class USER(object):
                 tqdm.tqdm.write(self.p.Error(msg) + self.p.High(self.username))
             return
 
+        if incremental and self.index is None:
+            raise ValueError("Media(incremental=True) needs an index")
+
         time1 = time.time()
         profile_id = self.info['id']
 
         # whether to get specefic number of media or all of them
+        # profiles taken from the index have no counts, their chains run until the last page
         if get_number == 0:
-            nodes_number = self.info['media']
+            nodes_number = self.info.get('media', self.ALL)
         else:
             nodes_number = get_number
         
@@ -315,7 +438,7 @@ class USER(object):
 
         # init progress bar
         if self.bar:
-            media_progress = tqdm.trange(nodes_number, unit=" Node @ "+self.username, leave=False, ascii=True)
+            media_progress = tqdm.tqdm(total=None if nodes_number == self.ALL else nodes_number, unit=" Node @ "+self.username, leave=False, ascii=True)
             media_progress.refresh(True)
         else:
             media_progress = None
@@ -323,22 +446,23 @@ class USER(object):
         # used to decide the next thread options
         next_options = self.__ParseVar(nodes_number, per_request)
 
-        # start scraping media
-        self.__GetMedia(profile_id=profile_id,after=after, options=next_options, bar=media_progress, username=self.username)
-        while True:
-            # wait until every thread is done scraping media
-            for item in self.threads:
-                if item.is_alive():
-                    continue
-                else:
-                    try:
-                        self.threads.remove(item)
-                    except ValueError:
-                        continue
-            
-            # end the loop
-            if len(self.threads) == 0:
-                break 
+        # start scraping media and wait until every page is done
+        fetch = partial(self.__GetMedia, profile_id, username=self.username)
+        if sink is None:
+            rows, add = self.media_list, self.__Replayed(self.media_list.Add, MEDIA)
+        else:
+            rows, add = sink, self.__Sink(sink, "node_id")
+        scrap = partial(self.__ScrapMedia, bar=media_progress, records=True if sink is not None else None)
+        job = "media:%s" % profile_id
+        if incremental:
+            newest = self.index.Newest(profile_id)
+            fetch, add, save = self.__Incremental(fetch, add, newest)
+            job = "media:%s:%s" % (profile_id, newest[1] if newest else 0)
+        paginator = PAGINATOR(self.pool, fetch, scrap, add, checkpoint=self.checkpoint, job=job, resolver=self.resolver, errors=self.__Errors(self.media_error))
+        paginator.Run(after, next_options)
+        # media lost to errors are requested again by the next crawl
+        if incremental and not after and not paginator.failed:
+            save(profile_id)
         
         logging.info("profile media scraped successfuly <{0}>".format(self.username))
         msg = "profile media scraped successfuly {0}".format(self.p.High(self.username))
@@ -353,213 +477,285 @@ class USER(object):
         data = {
             "errors": self.media_error,
             "media": {
-                "count": len(self.media_list),
-                "data": self.media_list
+                "count": len(rows),
+                "data": rows
             },
             "time": time2-time1
         }
 
         return data
 
-    def __GetMedia(self, profile_id: int, after: str, options: list, bar, username:str="") -> None:
+    def __GetMedia(self, profile_id: int, after: str, number: int, username:str="") -> tuple:
+        query_hash_pic = hashes['profile_media']
 
-        with self.jail:
-            done = False
-            has_next = None
-            query_hash_pic = hashes['profile_media']
-
-            # check whether start scraping or return
-            if options[0] == 1:
-                has_next = False
-                number = options[1]
-            elif options[0] == 0:
-                return
-            else:
-                has_next == True
-                number = options[2]
+        while True:
+            try:
+                query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"id":%s,"first":%s,"after":"%s"}' % (query_hash_pic, str(profile_id), number, after)
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.BULK)
+                query_json = json.loads(query_result.text)
                 
-            
-            while not done:
                 try:
-                    query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"id":%s,"first":%s,"after":"%s"}' % (query_hash_pic, str(profile_id), number, after)
-                    query_result = self.session.get(query_url, timeout=self.timeout)
-                    query_json = json.loads(query_result.text)
-                    
-                    try:
-                        user = query_json['data']['user']['edge_owner_to_timeline_media']
-                        has_next = user['page_info']["has_next_page"]
-                        after_that = user['page_info']['end_cursor']
-                    except KeyError:
-                        raise(RATE_LIMIT)
-                    
-                    status = query_json['status']
-                    if status == "ok":
-                        if has_next == True:
-                            options[0] -= 1 
-                            runing_thread = threading.Thread(target=self.__GetMedia,args=(profile_id, after_that, options, bar))
-                            runing_thread.start()
-                            self.threads.append(runing_thread)
-                        self.__ScrapMedia(user, bar=bar)
-                    done = True
-            
-                except RATE_LIMIT:
-                    self.media_error.append("RATE_LIMITED [media] <%s>" % str(profile_id))
-                    logging.error("<%s> RATE_LIMITED" % username)
+                    user = query_json['data']['user']['edge_owner_to_timeline_media']
+                    has_next = user['page_info']["has_next_page"]
+                    after_that = user['page_info']['end_cursor']
+                except KeyError:
+                    raise(RATE_LIMIT)
+                
+                status = query_json['status']
+                if status == "ok":
+                    self.backoff.Success()
+                    return user, has_next, after_that
+                return
+        
+            except RATE_LIMIT:
+                self.media_error.append("RATE_LIMITED [media] <%s>" % str(profile_id))
+                logging.error("<%s> RATE_LIMITED" % username)
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [media]" + self.p.High(self.username)))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
+
+            except Exception as e:
+                if not e in self.media_error:
+                    self.media_error.append(str(e).upper())
+                    logging.error("%s \n %s" % (e,traceback.format_exc()))
                     if self.verbose:
-                        tqdm.tqdm.write(self.p.Error("RATE_LIMITED [media]" + self.p.High(self.username)))
-                    time.sleep(30)
+                        tqdm.tqdm.write(self.p.Error(str(e).upper()))
+
+    def __Incremental(self, fetch, add, newest):
+        # newest is (post id, taken_at) of the last crawl, pinned posts lead the first
+        # page so only the last media of a page tells whether the chain reached it
+        lock = threading.Lock()
+        seen = [newest]
+        ended = []
+
+        def mark(node_id, taken_at: int) -> None:
+            with lock:
+                if seen[0] is None or taken_at > seen[0][1]:
+                    seen[0] = (node_id, taken_at)
+
+        def since(after: str, number: int):
+            result = fetch(after, number)
+            if result is None:
+                return
+            page, has_next, end_cursor = result
+            edges = page['edges']
+            if newest is not None:
+                if edges and edges[-1]['node']['taken_at_timestamp'] <= newest[1]:
+                    has_next = False
+                edges = [edge for edge in edges if edge['node']['taken_at_timestamp'] >= newest[1] and edge['node']['id'] != newest[0]]
+                page = dict(page, edges=edges)
+            # the marker is the post, not the sidecar children it resolves to
+            for edge in edges:
+                mark(edge['node']['id'], edge['node']['taken_at_timestamp'])
+            if not has_next:
+                ended.append(True)
+            return page, has_next, end_cursor
+
+        def added(row) -> None:
+            # rows replayed from the checkpoint skip since(), without a post id
+            # their post is requested once more by the next crawl
+            mark(None, row["taken_time"])
+            add(row)
+
+        def save(profile_id: str) -> None:
+            # a chain cut by get_number left newer media behind the last one it reached
+            if ended and seen[0] is not None:
+                self.index.SaveNewest(profile_id, *seen[0])
+
+        return since, added, save
+
+    def __ScrapMedia(self, user:dict, add, resolve, bar, records=None) -> None:
+        for nodes in user['edges']:
+            node_db = MediaNode(nodes['node'])
+            if node_db[1] == "GraphSidecar" or node_db[8]:
+                # post page is requested off the page worker
+                resolve(self.__MediaDetail, (node_db, bar, records))
+            else:
+                add(self.__MediaRow(node_db, records))
+                if self.bar:
+                    bar.update(1)
 
-                except Exception as e:
-                    if not e in self.media_error:
-                        self.media_error.append(str(e).upper())
-                        logging.error("%s \n %s" % (e,traceback.format_exc()))
-                        if self.verbose:
-                            tqdm.tqdm.write(self.p.Error(str(e).upper()))
-
-    def __ScrapMedia(self, user:dict, bar) -> None:
-        nodess = user['edges']
-        for nodes in nodess:
-            node_done = False
-            nodes = nodes['node']
-            while not node_done:
-                # MEDIA_DATA
-                node_id = nodes['id']
-                node_type = nodes['__typename']
-                node_code = nodes['shortcode']
-                owner = nodes['owner']['id']
-                try:
-                    caption = nodes['edge_media_to_caption']['edges'][0]['node']['text']
-                except IndexError:
-                    caption = ""
-                node_comment_count = nodes['edge_media_to_comment']['count']
-                node_like_count = nodes['edge_media_preview_like']['count']
-                taken_at = nodes['taken_at_timestamp']
-                node_is_video = nodes['is_video']
-                dimentions = nodes['dimensions']
-                comments_disabled = nodes['comments_disabled']
-                nodes_links = nodes['thumbnail_resources']
-                gating_info = nodes['gating_info']
+    def __MediaDetail(self, node_db: list, bar=None, records=None) -> list:
+        rows = self.__PostPage(node_db, records)
+        if self.bar and bar is not None:
+            bar.update(1)
+        return rows
 
-                # GET SIDECAR ALL MEDIA
-                if node_type == "GraphSidecar":
-                    node_sidecar_done = False
-                    while not node_sidecar_done:
-                        try:
-                            sidecar_page_url = "https://www.instagram.com/p/%s" % (node_code)
-                            sidecar_html = self.session.get(sidecar_page_url, timeout=self.timeout)
-                            try:
-                                sidecar_result_html = bs(sidecar_html.content, "lxml").findAll("script")[3].text
-                                sidecar_result_json = json.loads(sidecar_result_html.split("Data =")[1].replace(";", ""))
-                            except IndexError:
-                                sidecar_result_html = bs(sidecar_html.content, "lxml").findAll("script")[4].text
-                                sidecar_result_json = json.loads(sidecar_result_html.split("Data =")[1].replace(";", ""))
-
-                            sidecar_media = sidecar_result_json['entry_data']['PostPage'][0]['graphql']['shortcode_media']['edge_sidecar_to_children']['edges']
-                            for sidecar_nodes in sidecar_media:
-                                sidecar_nodes = sidecar_nodes['node']
-                                # MEDIA_DATA
-                                node_id = sidecar_nodes['id']
-                                node_type = sidecar_nodes['__typename']
-                                node_code = sidecar_nodes['shortcode']
-                                node_is_video = sidecar_nodes['is_video']
-                                dimentions = sidecar_nodes['dimensions']
-                                nodes_links = sidecar_nodes['display_resources']
-                                gating_info = sidecar_nodes['gating_info']
-                                node_download_link = sidecar_nodes['display_url']
-                                node_db = [node_id, node_type, node_code, owner, caption, node_comment_count, node_like_count,
-                                            taken_at, node_is_video, dimentions, comments_disabled, nodes_links, gating_info,
-                                            node_download_link]
-                                node_db = {
-                                    "node_id": node_db[0],
-                                    "type": node_db[1],
-                                    "code": node_db[2],
-                                    "owner": node_db[3],
-                                    "caption": node_db[4],
-                                    "comments_number": node_db[5],
-                                    "likes_number": node_db[6],
-                                    "taken_time": node_db[7],
-                                    "video": node_db[8],
-                                    "dimentions": node_db[9],
-                                    "comments_disabled": node_db[10],
-                                    "links": node_db[11],
-                                    "gating_info": node_db[12],
-                                    "hd_link": node_db[13]
-                                }
-                                if node_db not in self.media_list:
-                                    self.media_list.append(node_db)
-                            node_sidecar_done = True
-                        except Exception as e:
-                            logging.error("%s \n %s" % (e,traceback.format_exc()))
-                            if self.verbose:
-                                tqdm.tqdm.write(self.p.Error(str(e).upper()))
-                            continue
+    def __PostPage(self, node_db: list, records=None) -> list:
+        # pictures need no post page
+        if not (node_db[1] == "GraphSidecar" or node_db[8]):
+            return [self.__MediaRow(node_db, records)]
+
+        # bounded by info_retry_attempts, deleted or private posts keep the row of the graph node
+        post_page_url = "https://www.instagram.com/p/%s" % (node_db[2])
+        for _ in range(self.info_retry_attempts + 1):
+            try:
+                post_page = self.scheduler.Get(post_page_url, timeout=self.timeout, priority=self.scheduler.BULK)
+                if post_page.status_code in (404, 410):
+                    logging.error("POST_NOT_FOUND <%s>" % node_db[2])
+                    break
+                elif post_page.status_code != 200:
+                    if post_page.status_code in self.backoff.THROTTLED:
+                        self.backoff.Failure(post_page.status_code, post_page.headers.get("Retry-After"))
+                    continue
 
+                # GET SIDECAR ALL MEDIA
+                if node_db[1] == "GraphSidecar":
+                    return [self.__MediaRow(child, records) for child in SidecarNodes(node_db, post_page.content)]
                 # GET VIDEO
-                elif node_is_video:
-                    node_video_done = False
-                    while not node_video_done:
-                        try:
-                            video_page_url = "https://www.instagram.com/p/%s" % (node_code)
-                            video_html = self.session.get(video_page_url, timeout=self.timeout).text
-                            video_page = bs(video_html, "lxml").find("meta", {"property": "og:video:secure_url"})
-                            node_download_link = video_page['content']
-                            node_db = [node_id, node_type, node_code, owner, caption, node_comment_count, node_like_count,
-                                        taken_at, node_is_video, dimentions, comments_disabled, nodes_links, gating_info,
-                                        node_download_link]
-                            node_db = {
-                                "node_id": node_db[0],
-                                "type": node_db[1],
-                                "code": node_db[2],
-                                "owner": node_db[3],
-                                "caption": node_db[4],
-                                "comments_number": node_db[5],
-                                "likes_number": node_db[6],
-                                "taken_time": node_db[7],
-                                "video": node_db[8],
-                                "dimentions": node_db[9],
-                                "comments_disabled": node_db[10],
-                                "links": node_db[11],
-                                "gating_info": node_db[12],
-                                "hd_link": node_db[13]
-                            }
-                            if node_db not in self.media_list:
-                                self.media_list.append(node_db)
-                            node_video_done = True
-                        except Exception as e:
-                            logging.error("%s \n %s" % (e,traceback.format_exc()))
-                            if self.verbose:
-                                tqdm.tqdm.write(self.p.Error(str(e).upper()))
-                            continue
-
-                # GET PIC
-                else:
-                    node_download_link = nodes['display_url']
-                    node_db = [node_id, node_type, node_code, owner, caption, node_comment_count, node_like_count,
-                                taken_at, node_is_video, dimentions, comments_disabled, nodes_links, gating_info,
-                                node_download_link]
-                    node_db = {
-                        "node_id": node_db[0],
-                        "type": node_db[1],
-                        "code": node_db[2],
-                        "owner": node_db[3],
-                        "caption": node_db[4],
-                        "comments_number": node_db[5],
-                        "likes_number": node_db[6],
-                        "taken_time": node_db[7],
-                        "video": node_db[8],
-                        "dimentions": node_db[9],
-                        "comments_disabled": node_db[10],
-                        "links": node_db[11],
-                        "gating_info": node_db[12],
-                        "hd_link": node_db[13]
-                    }
-                    if node_db not in self.media_list:
-                        self.media_list.append(node_db)
-                node_done = True
-                if self.bar:
-                    bar.update(1)
+                node_db[13] = VideoLink(post_page.content)
+                return [self.__MediaRow(node_db, records)]
+            except Exception as e:
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+        else:
+            logging.error("MAX_RETRIES [post] <%s>" % node_db[2])
+
+        # the display url is not the video or the sidecar children
+        node_db[13] = None
+        return [self.__MediaRow(node_db, records)]
+
+    def __MediaRow(self, node_db: list, records=None):
+        if self.records if records is None else records:
+            return MEDIA(*node_db)
+        return MediaDict(node_db)
+
+    def __UserRow(self, node: dict, records=None):
+        if self.records if records is None else records:
+            return PROFILE(*UserFields(node))
+        return UserNode(node)
+
+    def __Sink(self, sink, key: str):
+        # media pages can repeat nodes, only their keys are kept for dedup
+        seen = NODES(key)
+
+        def add(row) -> None:
+            if seen.New(row):
+                sink.Add(row)
+        return add
+
+    def __Errors(self, errors: list):
+        # worker errors reach the errors of the call, the paginator logged them already
+        def error(e: Exception) -> None:
+            if str(e).upper() not in errors:
+                errors.append(str(e).upper())
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(str(e).upper()))
+        return error
+
+    def __Replayed(self, add, record):
+        # checkpoint pages are replayed as dicts
+        if not (self.records and self.checkpoint):
+            return add
+
+        def replayed(row) -> None:
+            add(record.FromDict(row) if isinstance(row, dict) else row)
+        return replayed
+
+    def Tagged(self, get_number=0, per_request=50, after="", sink=None) -> dict:
+        ''' collecting media the user is tagged in
+
+        Parameters
+        ----------
+        get_number : int
+            number of media to scrap (default 0 == all)
+        per_request : int
+            number of media each request (default 50)
+        after : str
+            represent instagram cursor of last tagged media
+        sink : COLUMNS or NDJSON
+            send the media to sink.Add() as they are scraped instead of keeping them, ex: COLUMNS(MEDIA) (default None)
+
+        Returns
+        -------
+        dict
+            dictionary with media and time elapsed
+            {
+            "errors": [],
+            "media": {
+                "count": 0,
+                "data": []
+            },
+            "time": 2
+            }
+        '''
+        if not self.user_valid:
+            msg = "NOT_VALID_USERNAME"
+            logging.error("{0} <{1}>".format(msg,self.username))
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(msg) + self.p.High(self.username))
+            return
+
+        time1 = time.time()
+        profile_id = self.info['id']
+
+        # the profile has no tagged count, the chain runs until its last page
+        if self.bar:
+            tagged_progress = tqdm.tqdm(total=get_number or None, unit=" Tagged @ " + self.username, leave=False, ascii=True)
+        else:
+            tagged_progress = None
+
+        if sink is None:
+            rows, add = self.tagged_list, self.__Replayed(self.tagged_list.Add, MEDIA)
+        else:
+            rows, add = sink, self.__Sink(sink, "node_id")
+        fetch = partial(self.__GetTagged, profile_id, username=self.username)
+        scrap = partial(self.__ScrapMedia, bar=tagged_progress, records=True if sink is not None else None)
+        PAGINATOR(self.pool, fetch, scrap, add, checkpoint=self.checkpoint, job="tagged:%s" % profile_id, resolver=self.resolver, errors=self.__Errors(self.tagged_error)).Run(after, self.__ParseVar(get_number or self.ALL, per_request))
+
+        logging.info("profile tagged media scraped successfuly <{0}>".format(self.username))
+        if self.verbose:
+            tqdm.tqdm.write(self.p.Success("profile tagged media scraped successfuly " + self.p.High(self.username)))
+
+        if self.bar:
+            tagged_progress.close()
+
+        data = {
+            "errors": self.tagged_error,
+            "media": {
+                "count": len(rows),
+                "data": rows
+            },
+            "time": time.time() - time1
+        }
+        return data
 
-    def Following(self, get_number=0, per_request=50, after="") -> dict:
+    def __GetTagged(self, profile_id: int, after: str, number: int, username:str="") -> tuple:
+        query_hash_tagged = hashes['profile_tagged']
+
+        while True:
+            try:
+                query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"id":"%s","first":%s,"after":"%s"}' % (query_hash_tagged, str(profile_id), number, after)
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.BULK)
+                query_json = json.loads(query_result.text)
+                try:
+                    user = query_json['data']['user']['edge_user_to_photos_of_you']
+                    has_next = user['page_info']["has_next_page"]
+                    after_that = user['page_info']['end_cursor']
+                except (KeyError, TypeError):
+                    raise(RATE_LIMIT)
+
+                if query_json['status'] == "ok":
+                    self.backoff.Success()
+                    return user, has_next, after_that
+                return
+
+            except RATE_LIMIT:
+                self.tagged_error.append("RATE_LIMITED [tagged] <%s>" % str(profile_id))
+                logging.error("<%s> RATE_LIMITED [tagged]" % username)
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [tagged]" + self.p.High(self.username)))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
+
+            except Exception as e:
+                if str(e).upper() not in self.tagged_error:
+                    self.tagged_error.append(str(e).upper())
+                    logging.error("%s \n %s" % (e,traceback.format_exc()))
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error(str(e).upper()))
+
+    def Following(self, get_number=0, per_request=50, after="", sink=None) -> dict:
         '''collecting user following list 
 
         Parameters
@@ -570,6 +766,8 @@ class USER(object):
             number of following each request (default 50)
         after : str
             represent instagram cursor of last following
+        sink : COLUMNS or NDJSON
+            send the following to sink.Add() as they are scraped instead of keeping them, ex: COLUMNS(PROFILE) (default None)
         
         Returns
         -------
@@ -597,7 +795,7 @@ class USER(object):
         profile_id = self.info['id']
 
         if get_number == 0:
-            followings_number = self.info['following']
+            followings_number = self.info.get('following', self.ALL)
         else:
             followings_number = get_number
 
@@ -607,23 +805,20 @@ class USER(object):
             tqdm.tqdm.write(self.p.Debug(msg) + self.p.High(str(followings_number)))
 
         if self.bar:
-            following_progress = tqdm.trange(followings_number, unit=" following @ " + self.username, leave=False, ascii=True)
+            following_progress = tqdm.tqdm(total=None if followings_number == self.ALL else followings_number, unit=" following @ " + self.username, leave=False, ascii=True)
             following_progress.refresh(True)
         else:
             following_progress = None
 
         next_options = self.__ParseVar(followings_number, per_request)
 
-        self.__GetFollowing(profile_id=profile_id, after=after, options=next_options, bar=following_progress, username=username)
-        while True:
-            for item in self.following_threads:
-                if item.is_alive():
-                    pass
-                else:
-                    self.following_threads.remove(item)
-            
-            if len(self.following_threads) == 0:
-                break 
+        fetch = partial(self.__GetFollowing, profile_id, username=username)
+        if sink is None:
+            rows, add = self.following_list, self.__Replayed(self.following_list.append, PROFILE)
+        else:
+            rows, add = sink, sink.Add
+        scrap = partial(self.__ScrapFollowing, bar=following_progress, records=True if sink is not None else None)
+        PAGINATOR(self.pool, fetch, scrap, add, checkpoint=self.checkpoint, job="following:%s" % profile_id, errors=self.__Errors(self.following_error)).Run(after, next_options)
         
         logging.info("profile following scraped successfuly <{0}>".format(self.username))
         msg = "profile following scraped successfuly {0}".format(self.p.High(self.username))
@@ -637,97 +832,61 @@ class USER(object):
         data = {
             "errors": self.following_error,
             "following": {
-                "count": len(self.following_list),
-                "data": self.following_list
+                "count": len(rows),
+                "data": rows
             },
             "time": time2-time1
         }
         
         return data
 
-    def __GetFollowing(self, profile_id: int, after: str, options: list, bar, username:str="") -> None:
-        with self.jail:
+    def __GetFollowing(self, profile_id: int, after: str, number: int, username:str="") -> tuple:
+        query_hash_following = hashes['profile_following']
+        
+        while True:
+            try:
+                query_url = 'https://www.instagram.com:443/graphql/query/?query_hash=%s&variables={"id":%s,"first":%s,"after":"%s"}' % (query_hash_following, profile_id, number, after)
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.BULK)
+                query_json = json.loads(query_result.text)
+                status = query_json['status']
+
+                if status == "ok":
+                    followings = query_json['data']['user']['edge_follow']
+                    has_next = followings['page_info']['has_next_page']
+                    after_that = followings['page_info']['end_cursor']
+                    self.backoff.Success()
+                    return followings, has_next, after_that
+                else:
+                    raise RATE_LIMIT
 
-            done = False
-            has_next = None
-            query_hash_following = hashes['profile_following']
-            
-            if options[0] == 1:
-                has_next = False
-                number = options[1]
-            elif options[0] == 0:
+            except PRIVATE_USER:
+                self.following_error.append("PRIVATE_USER")
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("PRIVATE_USER"))
                 return
-            else:
-                has_next == True
-                number = options[2]
-            
-            while not done:
-                try:
-                    query_url = 'https://www.instagram.com:443/graphql/query/?query_hash=%s&variables={"id":%s,"first":%s,"after":"%s"}' % (query_hash_following, profile_id, number, after)
-                    query_result = self.session.get(query_url, timeout=self.timeout)
-                    query_json = json.loads(query_result.text)
-                    status = query_json['status']
-
-                    if status == "ok":
-                        followings = query_json['data']['user']['edge_follow']
-                        has_next = followings['page_info']['has_next_page']
-                        after_that = followings['page_info']['end_cursor']
-                    
-                        if has_next == True:
-                            options[0] -= 1
-                            following_thread = threading.Thread(target=self.__GetFollowing,args=(profile_id, after_that, options, bar))
-                            following_thread.start()
-                            self.following_threads.append(following_thread)
-                        self.__ScrapFollowing(followings['edges'], bar=bar)  
-                    else:
-                        raise RATE_LIMIT
-                    done = True  
-
-                except PRIVATE_USER:
-                    self.following_error.append("PRIVATE_USER")
-                    if self.verbose:
-                        tqdm.tqdm.write(self.p.Error("PRIVATE_USER"))
-                    return
 
 
-                except RATE_LIMIT:
-                    self.following_error.append("RATE_LIMITED")
-                    logging.error("RATE_LIMITED [following]")
-                    if self.verbose:
-                        tqdm.tqdm.write(self.p.Error("RATE_LIMITED [following]"))
-                    time.sleep(30)
+            except RATE_LIMIT:
+                self.following_error.append("RATE_LIMITED")
+                logging.error("RATE_LIMITED [following]")
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [following]"))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
 
-                except Exception as e:
-                    if e not in self.following_error:
-                        self.following_error.append(e)
-                        logging.error(" %s \n %s " % (e,traceback.format_exc()))
-                        if self.verbose:
-                            tqdm.tqdm.write(self.p.Error(str(e).upper()))
+            except Exception as e:
+                if e not in self.following_error:
+                    self.following_error.append(e)
+                    logging.error(" %s \n %s " % (e,traceback.format_exc()))
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error(str(e).upper()))
                     
-    def __ScrapFollowing(self, followings: dict, bar) -> None:
-        for user in followings:
-            node = user['node']
-            userid = node['id']
-            username = node['username']
-            full_name = node['full_name']
-            profile_pic_small = node['profile_pic_url']
-            is_verified = node['is_verified']
-            viewer_following_user = node['followed_by_viewer']
-            viewer_requested = node['requested_by_viewer']
-            data = {
-                "id": userid,
-                "username": username,
-                "full_name": full_name,
-                "small_pic": profile_pic_small,
-                "verified": is_verified,
-                "following_user": viewer_following_user,
-                "requested_by_viewer": viewer_requested
-            }
-            self.following_list.append(data)
+    def __ScrapFollowing(self, followings: dict, add, resolve, bar, records=None) -> None:
+        for user in followings['edges']:
+            add(self.__UserRow(user['node'], records))
             if self.bar:
                 bar.update(1)
 
-    def Follower(self, get_number=0, per_request=50, after="") -> dict:
+    def Follower(self, get_number=0, per_request=50, after="", sink=None) -> dict:
         '''collecting user follower list 
 
         Parameters
@@ -738,6 +897,8 @@ class USER(object):
             number of follower each request (default 50)
         after : str
             represent instagram cursor of last follower
+        sink : COLUMNS or NDJSON
+            send the follower to sink.Add() as they are scraped instead of keeping them, ex: COLUMNS(PROFILE) (default None)
         
         Returns
         -------
@@ -765,7 +926,7 @@ class USER(object):
         profile_id = self.info['id']
 
         if get_number == 0:
-            follower_number = self.info['followers']
+            follower_number = self.info.get('followers', self.ALL)
         else:
             follower_number = get_number
 
@@ -775,23 +936,20 @@ class USER(object):
             tqdm.tqdm.write(self.p.Debug(msg) + self.p.High(str(follower_number)))
         
         if self.bar:
-            follower_progress = tqdm.trange(follower_number, unit=" follower @ " + self.username, leave=False, ascii=True)
+            follower_progress = tqdm.tqdm(total=None if follower_number == self.ALL else follower_number, unit=" follower @ " + self.username, leave=False, ascii=True)
             follower_progress.refresh(True)
         else:
             follower_progress = None
 
         next_options = self.__ParseVar(follower_number, per_request)
 
-        self.__GetFollower(profile_id=profile_id, after=after, options=next_options, bar=follower_progress, username=username)
-        while True:
-            for item in self.follower_threads:
-                if item.is_alive():
-                    pass
-                else:
-                    self.follower_threads.remove(item)
-            
-            if len(self.follower_threads) == 0:
-                break 
+        fetch = partial(self.__GetFollower, profile_id, username=username)
+        if sink is None:
+            rows, add = self.follower_list, self.__Replayed(self.follower_list.append, PROFILE)
+        else:
+            rows, add = sink, sink.Add
+        scrap = partial(self.__ScrapFollower, bar=follower_progress, records=True if sink is not None else None)
+        PAGINATOR(self.pool, fetch, scrap, add, checkpoint=self.checkpoint, job="follower:%s" % profile_id, errors=self.__Errors(self.follower_error)).Run(after, next_options)
 
         logging.info("profile follower scraped successfuly <{0}>".format(self.username))
         msg = "profile follower scraped successfuly {0}".format(self.p.High(self.username))
@@ -805,165 +963,724 @@ class USER(object):
         data = {
             "errors": self.follower_error,
             "following": {
-                "count": len(self.follower_list),
-                "data": self.follower_list
+                "count": len(rows),
+                "data": rows
             },
             "time": time2-time1
         }  
         return data
 
-    def __GetFollower(self, profile_id: int, after: str, options: list, bar, username:str=""):
-        with self.jail:
-            done = False
-            has_next = None
-            query_hash_follower = hashes['profile_follower']
-            if options[0] == 1:
-                has_next = False
-                number = options[1]
-            elif options[0] == 0:
-                return
-            else:
-                has_next == True
-                number = options[2]
-            
-            while not done:
-                try:
-                    query_url = 'https://www.instagram.com:443/graphql/query/?query_hash=%s&variables={"id":%s,"first":%s,"after":"%s"}' % (query_hash_follower, profile_id, number, after)
-                    query_result = self.session.get(query_url, timeout=15)
-                    query_json = json.loads(query_result.text)
-                    status = query_json['status']
-
-                    if status == "ok":
-                        followers = query_json['data']['user']['edge_followed_by']
-                        has_next = followers['page_info']['has_next_page']
-                        after_that = followers['page_info']['end_cursor']
-                    
-                        if has_next == True:
-                            options[0] -= 1
-                            follower_thread = threading.Thread(target=self.__GetFollower,args=(profile_id, after_that, options, bar))
-                            follower_thread.start()
-                            self.follower_threads.append(follower_thread)
-                        self.__ScrapFollower(followers['edges'], bar=bar)  
-                    else:
-                        raise RATE_LIMIT
-
-                    done = True  
-
-                except PRIVATE_USER:
-                    self.follower_error.append("PRIVATE_USER")
-                    if self.verbose:
-                        tqdm.tqdm.write(self.p.Error("PRIVATE_USER"))
+    def __GetFollower(self, profile_id: int, after: str, number: int, username:str="") -> tuple:
+        query_hash_follower = hashes['profile_follower']
+        
+        while True:
+            try:
+                query_url = 'https://www.instagram.com:443/graphql/query/?query_hash=%s&variables={"id":%s,"first":%s,"after":"%s"}' % (query_hash_follower, profile_id, number, after)
+                query_result = self.scheduler.Get(query_url, timeout=15, priority=self.scheduler.BULK)
+                query_json = json.loads(query_result.text)
+                status = query_json['status']
+
+                if status == "ok":
+                    followers = query_json['data']['user']['edge_followed_by']
+                    has_next = followers['page_info']['has_next_page']
+                    after_that = followers['page_info']['end_cursor']
+                    self.backoff.Success()
+                    return followers, has_next, after_that
+                else:
+                    raise RATE_LIMIT
+
+            except PRIVATE_USER:
+                self.follower_error.append("PRIVATE_USER")
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("PRIVATE_USER"))
+
+            except RATE_LIMIT:
+                self.follower_error.append("RATE_LIMITED")
+                logging.error("RATE_LIMITED [follower]")
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [follower]"))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
 
-                except RATE_LIMIT:
-                    self.follower_error.append("RATE_LIMITED")
-                    logging.error("RATE_LIMITED [follower]")
+            except Exception as e:
+                if e not in self.follower_error:
+                    self.follower_error.append(e)
+                    logging.error(" %s \n %s " % (e,traceback.format_exc()))
                     if self.verbose:
-                        tqdm.tqdm.write(self.p.Error("RATE_LIMITED [follower]"))
-                    time.sleep(30)
+                        tqdm.tqdm.write(self.p.Error(str(e)))
 
-                except Exception as e:
-                    if e not in self.follower_error:
-                        self.follower_error.append(e)
-                        logging.error(" %s \n %s " % (e,traceback.format_exc()))
-                        if self.verbose:
-                            tqdm.tqdm.write(self.p.Error(str(e)))
-
-    def __ScrapFollower(self, followers: dict, bar):
-
-        for user in followers:
-            node = user['node']
-            userid = node['id']
-            username = node['username']
-            full_name = node['full_name']
-            profile_pic_small = node['profile_pic_url']
-            is_verified = node['is_verified']
-            viewer_following_user = node['followed_by_viewer']
-            viewer_requested = node['requested_by_viewer']
-            data = {
-                "id": userid,
-                "username": username,
-                "full_name": full_name,
-                "small_pic": profile_pic_small,
-                "verified": is_verified,
-                "following_user": viewer_following_user,
-                "requested_by_viewer": viewer_requested
-            }
-            self.follower_list.append(data)
+    def __ScrapFollower(self, followers: dict, add, resolve, bar, records=None):
+
+        for user in followers['edges']:
+            add(self.__UserRow(user['node'], records))
             if self.bar:
                 bar.update(1)
 
-    def Story(self) -> dict:
-        ''' getting user stories 
+    def IterMedia(self, get_number=0, per_request=50, after=""):
+        ''' yielding user media as soon as its page is parsed
 
-        Returns
-        -------
+        Parameters
+        ----------
+        get_number : int
+            number of media to scrap (default all)
+        per_request : int
+            number of media each request (default 50)
+        after : str
+            represent instagram cursor of last media
+
+        Yields
+        ------
         dict
-            users stories
-            {
-            "errors": []],
-            "stories": {},
-            "time": 0
-            }
+            media node as in Media()["media"]["data"], closing the generator stops the paging
         '''
-        # INIT VARIABLES
-        json_type = json.dumps([self.info['id']])
-        query_hash_story = hashes['story']
-        time1 = time.time()
-
-        try:
-            query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"reel_ids":%s,"precomposed_overlay":false}' % (query_hash_story, json_type)
-            query_result = self.session.get(query_url).text
-            query_json = json.loads(query_result)
-            all_users = query_json['data']['reels_media']
-            for user in all_users:
-                latest_story = user['latest_reel_media']
-                end_at = user['expiring_at']
-                seen = user['seen']
-                stories = user['items']
-                username = user['user']['username']
-                story_data = {
-                    "username": username,
-                    "last_story": latest_story,
-                    "end": end_at,
-                    "seen": seen,
-                    "stories": stories
-                }
-                self.story = story_data
-
-        except KeyError:
-            pass
-
-        except Exception as e:
-            self.story_error.append(e)
-            logging.error(str(e).upper())
+        if not self.user_valid:
+            msg = "NOT_VALID_USERNAME"
+            logging.error("{0} <{1}>".format(msg,self.username))
             if self.verbose:
-                tqdm.tqdm.write(self.p.Error((str(e).upper())))
+                tqdm.tqdm.write(self.p.Error(msg) + self.p.High(self.username))
+            return
 
-        logging.info("profile story scraped successfuly <{0}>".format(self.username))
-        msg = "profile story scraped successfuly {0}".format(self.p.High(self.username))
-        if self.verbose:
-            tqdm.tqdm.write(self.p.Success(msg))
+        nodes_number = self.info.get('media', self.ALL) if get_number == 0 else get_number
+        if self.bar:
+            media_progress = tqdm.tqdm(total=None if nodes_number == self.ALL else nodes_number, unit=" Node @ "+self.username, leave=False, ascii=True)
+        else:
+            media_progress = None
 
-        time2 = time.time()
-        # FINAL DATA
-        try: 
-            c = len(self.story['stories'])
-        except TypeError:
-            c = 0 
+        fetch = partial(self.__GetMedia, self.info['id'], username=self.username)
+        yield from self.__Stream(fetch, self.__ScrapMedia, "node_id", "media:%s" % self.info['id'], after, self.__ParseVar(nodes_number, per_request), media_progress, self.media_error)
 
-        data = {
-            "errors": self.story_error,
-            "stories": {
-                "count": c,
-                'data': self.story
-            },
-            "time": time2-time1
-        }
-        
-        return data
+    def IterTagged(self, get_number=0, per_request=50, after=""):
+        ''' yielding media the user is tagged in as soon as its page is parsed
 
-    def LogIn(self, username: str, password: str) -> requests.Session:
-        '''get user cookie using username and password
+        Parameters
+        ----------
+        get_number : int
+            number of media to scrap (default 0 == all)
+        per_request : int
+            number of media each request (default 50)
+        after : str
+            represent instagram cursor of last tagged media
+
+        Yields
+        ------
+        dict
+            media node as in Tagged()["media"]["data"], closing the generator stops the paging
+        '''
+        if not self.user_valid:
+            msg = "NOT_VALID_USERNAME"
+            logging.error("{0} <{1}>".format(msg,self.username))
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(msg) + self.p.High(self.username))
+            return
+
+        if self.bar:
+            tagged_progress = tqdm.tqdm(total=get_number or None, unit=" Tagged @ " + self.username, leave=False, ascii=True)
+        else:
+            tagged_progress = None
+
+        fetch = partial(self.__GetTagged, self.info['id'], username=self.username)
+        yield from self.__Stream(fetch, self.__ScrapMedia, "node_id", "tagged:%s" % self.info['id'], after, self.__ParseVar(get_number or self.ALL, per_request), tagged_progress, self.tagged_error)
+
+    def IterFollowing(self, get_number=0, per_request=50, after=""):
+        ''' yielding user following as soon as its page is parsed
+
+        Parameters
+        ----------
+        get_number : int
+            number of following to scrap (default 0 == all)
+        per_request : int
+            number of following each request (default 50)
+        after : str
+            represent instagram cursor of last following
+
+        Yields
+        ------
+        dict
+            user as in Following()["following"]["data"], closing the generator stops the paging
+        '''
+        if not self.user_valid:
+            msg = "NOT_VALID_USERNAME"
+            logging.error("{0} <{1}>".format(msg,self.username))
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(msg) + self.p.High(self.username))
+            return
+
+        followings_number = self.info.get('following', self.ALL) if get_number == 0 else get_number
+        if self.bar:
+            following_progress = tqdm.tqdm(total=None if followings_number == self.ALL else followings_number, unit=" following @ " + self.username, leave=False, ascii=True)
+        else:
+            following_progress = None
+
+        fetch = partial(self.__GetFollowing, self.info['id'], username=self.username)
+        yield from self.__Stream(fetch, self.__ScrapFollowing, "id", "following:%s" % self.info['id'], after, self.__ParseVar(followings_number, per_request), following_progress, self.following_error, PROFILE)
+
+    def IterFollower(self, get_number=0, per_request=50, after=""):
+        ''' yielding user follower as soon as its page is parsed
+
+        Parameters
+        ----------
+        get_number : int
+            number of follower to scrap (default 0 == all)
+        per_request : int
+            number of follower each request (default 50)
+        after : str
+            represent instagram cursor of last follower
+
+        Yields
+        ------
+        dict
+            user as in Follower()["following"]["data"], closing the generator stops the paging
+        '''
+        if not self.user_valid:
+            msg = "NOT_VALID_USERNAME"
+            logging.error("{0} <{1}>".format(msg,self.username))
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(msg) + self.p.High(self.username))
+            return
+
+        follower_number = self.info.get('followers', self.ALL) if get_number == 0 else get_number
+        if self.bar:
+            follower_progress = tqdm.tqdm(total=None if follower_number == self.ALL else follower_number, unit=" follower @ " + self.username, leave=False, ascii=True)
+        else:
+            follower_progress = None
+
+        fetch = partial(self.__GetFollower, self.info['id'], username=self.username)
+        yield from self.__Stream(fetch, self.__ScrapFollower, "id", "follower:%s" % self.info['id'], after, self.__ParseVar(follower_number, per_request), follower_progress, self.follower_error, PROFILE)
+
+    def __Stream(self, fetch, scrap, key: str, job: str, after: str, options: list, bar, errors: list, record=MEDIA):
+        # rows only pass through the stream, just their keys are kept for dedup
+        stream = STREAM()
+        seen = NODES(key)
+
+        def put(node: dict) -> None:
+            if seen.New(node):
+                stream.Put(node)
+        add = self.__Replayed(put, record)
+
+        paginator = PAGINATOR(self.pool, fetch, partial(scrap, bar=bar), add, done=stream.End, checkpoint=self.checkpoint, job=job, resolver=self.resolver, errors=self.__Errors(errors))
+        try:
+            yield from stream.Iter(paginator, after, options)
+        finally:
+            if self.bar and bar is not None:
+                bar.close()
+
+    def Story(self) -> dict:
+        ''' getting user stories 
+
+        Returns
+        -------
+        dict
+            users stories
+            {
+            "errors": []],
+            "stories": {},
+            "time": 0
+            }
+        '''
+        # INIT VARIABLES
+        json_type = json.dumps([self.info['id']])
+        query_hash_story = hashes['story']
+        time1 = time.time()
+
+        try:
+            query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"reel_ids":%s,"precomposed_overlay":false}' % (query_hash_story, json_type)
+            query_result = self.scheduler.Get(query_url, priority=self.scheduler.INTERACTIVE).text
+            query_json = json.loads(query_result)
+            all_users = query_json['data']['reels_media']
+            for user in all_users:
+                self.story = STORY.FromDict(StoryReel(user)) if self.records else StoryReel(user)
+
+        except KeyError:
+            pass
+
+        except Exception as e:
+            self.story_error.append(e)
+            logging.error(str(e).upper())
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error((str(e).upper())))
+
+        logging.info("profile story scraped successfuly <{0}>".format(self.username))
+        msg = "profile story scraped successfuly {0}".format(self.p.High(self.username))
+        if self.verbose:
+            tqdm.tqdm.write(self.p.Success(msg))
+
+        time2 = time.time()
+        # FINAL DATA
+        try: 
+            c = len(self.story['stories'])
+        except TypeError:
+            c = 0 
+
+        data = {
+            "errors": self.story_error,
+            "stories": {
+                "count": c,
+                'data': self.story
+            },
+            "time": time2-time1
+        }
+        
+        return data
+
+    def Stories(self, user_ids: list, per_request=50) -> dict:
+        ''' getting stories of many users with a few reel_ids requests
+
+        Parameters
+        ----------
+        user_ids : list
+            instagram user ids
+        per_request : int
+            number of user ids each request (default 50)
+
+        Returns
+        -------
+        dict
+            stories of every user having stories, keyed by user id
+            {
+            "errors": [],
+            "stories": {
+                "count": 0,
+                "data": {}
+            },
+            "time": 0
+            }
+        '''
+        time1 = time.time()
+        user_ids = [str(user_id) for user_id in dict.fromkeys(user_ids)]
+        errors = []
+        stories = {}
+        lock = threading.Lock()
+
+        def chunk(reel_ids: list) -> None:
+            for user in self.__GetReels(reel_ids, errors):
+                story = STORY.FromDict(StoryReel(user)) if self.records else StoryReel(user)
+                with lock:
+                    stories[str(user['user']['id'])] = story
+
+        # every chunk is one request, chunks are sent on the page pool
+        tasks = TASKS(self.pool, errors=self.__Errors(errors))
+        for index in range(0, len(user_ids), per_request):
+            tasks.Start(chunk, (user_ids[index:index + per_request],))
+        tasks.Wait()
+
+        logging.info("stories scraped successfuly <{0} users>".format(len(user_ids)))
+        if self.verbose:
+            tqdm.tqdm.write(self.p.Success("stories scraped successfuly " + self.p.High(str(len(user_ids)))))
+
+        data = {
+            "errors": errors,
+            "stories": {
+                "count": len(stories),
+                "data": stories
+            },
+            "time": time.time() - time1
+        }
+        return data
+
+    def __GetReels(self, reel_ids: list, errors: list) -> list:
+        query_hash_story = hashes['story']
+
+        # bounded by info_retry_attempts, the chunk is dropped once they are used up
+        for _ in range(self.info_retry_attempts + 1):
+            try:
+                query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"reel_ids":%s,"precomposed_overlay":false}' % (query_hash_story, json.dumps(reel_ids))
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.INTERACTIVE)
+                try:
+                    reels = json.loads(query_result.text)['data']['reels_media']
+                except (KeyError, ValueError):
+                    raise(RATE_LIMIT)
+                self.backoff.Success()
+                return reels
+
+            except RATE_LIMIT:
+                errors.append("RATE_LIMITED [story]")
+                logging.error("RATE_LIMITED [story]")
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [story]"))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
+
+            except requests.exceptions.RequestException as e:
+                # connection resets and timeouts are sent again once the backoff allows it
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+                self.backoff.Failure()
+
+            except Exception as e:
+                errors.append(str(e).upper())
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+                return []
+
+        errors.append("MAX_RETRIES [story]")
+        logging.error("MAX_RETRIES [story] <%s>" % ",".join(reel_ids))
+        return []
+
+    def Highlights(self, per_request=20) -> dict:
+        ''' collecting user highlight reels and their stories
+
+        Parameters
+        ----------
+        per_request : int
+            number of highlight reels each request (default 20)
+
+        Returns
+        -------
+        dict
+            highlight reels and their stories, a story saved in many reels is kept once
+            {
+            "errors": [],
+            "reels": [],
+            "highlights": {
+                "count": 0,
+                "data": []
+            },
+            "time": 0
+            }
+        '''
+        if not self.user_valid:
+            msg = "NOT_VALID_USERNAME"
+            logging.error("{0} <{1}>".format(msg,self.username))
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(msg) + self.p.High(self.username))
+            return
+
+        time1 = time.time()
+        profile_id = self.info['id']
+        reels = self.__GetHighlightReels(profile_id)
+
+        # the cursor of every page is the index of its first reel id
+        reel_ids = [reel['id'] for reel in reels]
+        if reel_ids:
+            fetch = partial(self.__GetHighlights, reel_ids)
+            PAGINATOR(self.pool, fetch, self.__ScrapHighlights, self.highlight_list.Add, checkpoint=self.checkpoint, job="highlights:%s" % profile_id, errors=self.__Errors(self.highlight_error)).Run("", self.__ParseVar(len(reel_ids), per_request))
+
+        logging.info("profile highlights scraped successfuly <{0}>".format(self.username))
+        if self.verbose:
+            tqdm.tqdm.write(self.p.Success("profile highlights scraped successfuly " + self.p.High(self.username)))
+
+        data = {
+            "errors": self.highlight_error,
+            "reels": reels,
+            "highlights": {
+                "count": len(self.highlight_list),
+                "data": self.highlight_list
+            },
+            "time": time.time() - time1
+        }
+        return data
+
+    def __GetHighlightReels(self, profile_id: str) -> list:
+        query_hash_reels = hashes['highlight_reels']
+        variables = {"user_id": str(profile_id), "include_chaining": False, "include_reel": False, "include_suggested_users": False,
+                     "include_logged_out_extras": False, "include_highlight_reels": True, "include_live_status": False}
+
+        # bounded by info_retry_attempts, no reels once they are used up
+        for _ in range(self.info_retry_attempts + 1):
+            try:
+                query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables=%s' % (query_hash_reels, json.dumps(variables, separators=(",", ":")))
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.INTERACTIVE)
+                try:
+                    edges = json.loads(query_result.text)['data']['user']['edge_highlight_reels']['edges']
+                except (KeyError, ValueError):
+                    raise(RATE_LIMIT)
+                self.backoff.Success()
+                return [HighlightReel(edge['node']) for edge in edges]
+
+            except RATE_LIMIT:
+                self.highlight_error.append("RATE_LIMITED [highlight_reels]")
+                logging.error("RATE_LIMITED [highlight_reels]")
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [highlight_reels]" + self.p.High(self.username)))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
+
+            except requests.exceptions.RequestException as e:
+                # connection resets and timeouts are sent again once the backoff allows it
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+                self.backoff.Failure()
+
+            except Exception as e:
+                self.highlight_error.append(str(e).upper())
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+                return []
+
+        self.highlight_error.append("MAX_RETRIES [highlight_reels]")
+        logging.error("MAX_RETRIES [highlight_reels] <%s>" % self.username)
+        return []
+
+    def __GetHighlights(self, reel_ids: list, after: str, number: int) -> tuple:
+        query_hash_highlight = hashes['highlight_stort']
+        start = int(after or 0)
+        end = start + number
+        variables = {"reel_ids": [], "tag_names": [], "location_ids": [], "highlight_reel_ids": reel_ids[start:end], "precomposed_overlay": False,
+                     "show_story_header_follow_button": False, "show_story_viewer_list": False, "story_viewer_first": 0, "story_viewer_last": ""}
+
+        # bounded by info_retry_attempts, the chain stops once they are used up
+        for _ in range(self.info_retry_attempts + 1):
+            try:
+                query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables=%s' % (query_hash_highlight, json.dumps(variables, separators=(",", ":")))
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.BULK)
+                try:
+                    reels = json.loads(query_result.text)['data']['reels_media']
+                except (KeyError, ValueError):
+                    raise(RATE_LIMIT)
+                self.backoff.Success()
+                return reels, end < len(reel_ids), str(end)
+
+            except RATE_LIMIT:
+                self.highlight_error.append("RATE_LIMITED [highlight]")
+                logging.error("RATE_LIMITED [highlight]")
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [highlight]" + self.p.High(self.username)))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
+
+            except requests.exceptions.RequestException as e:
+                # connection resets and timeouts are sent again once the backoff allows it
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+                self.backoff.Failure()
+
+            except Exception as e:
+                self.highlight_error.append(str(e).upper())
+                logging.error("%s \n %s" % (e,traceback.format_exc()))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error(str(e).upper()))
+                return
+
+        self.highlight_error.append("MAX_RETRIES [highlight]")
+        logging.error("MAX_RETRIES [highlight] <%s>" % self.username)
+
+    def __ScrapHighlights(self, reels: list, add, resolve) -> None:
+        for reel in reels:
+            # reels_media ids are highlight:<id>
+            reel_id = str(reel['id']).split(":")[-1]
+            for item in reel['items']:
+                add(HighlightItem(reel_id, item))
+
+    def Comments(self, shortcode: str, get_number=0, per_request=50, after="") -> dict:
+        ''' collecting post comments
+
+        Parameters
+        ----------
+        shortcode : str
+            post code as in Media()["media"]["data"][0]["code"]
+        get_number : int
+            number of comments to scrap (default 0 == all)
+        per_request : int
+            number of comments each request (default 50)
+        after : str
+            represent instagram cursor of last comment
+
+        Returns
+        -------
+        dict
+            {
+            "errors": [],
+            "comments": {
+                "count": 0,
+                "data": []
+            },
+            "time": 2
+            }
+        '''
+        time1 = time.time()
+        errors = []
+        comments = NODES("id")
+        self.__PostCrawl("comments", shortcode, get_number or self.ALL, per_request, after, comments.Add, errors).tasks.Wait()
+
+        data = {
+            "errors": errors,
+            "comments": {
+                "count": len(comments),
+                "data": comments
+            },
+            "time": time.time() - time1
+        }
+        return data
+
+    def Likers(self, shortcode: str, get_number=0, per_request=50, after="") -> dict:
+        ''' collecting users who liked the post
+
+        Parameters
+        ----------
+        shortcode : str
+            post code as in Media()["media"]["data"][0]["code"]
+        get_number : int
+            number of likers to scrap (default 0 == all)
+        per_request : int
+            number of likers each request (default 50)
+        after : str
+            represent instagram cursor of last liker
+
+        Returns
+        -------
+        dict
+            {
+            "errors": [],
+            "likes": {
+                "count": 0,
+                "data": []
+            },
+            "time": 2
+            }
+        '''
+        time1 = time.time()
+        errors = []
+        likers = NODES("id")
+        self.__PostCrawl("likes", shortcode, get_number or self.ALL, per_request, after, likers.Add, errors).tasks.Wait()
+
+        data = {
+            "errors": errors,
+            "likes": {
+                "count": len(likers),
+                "data": likers
+            },
+            "time": time.time() - time1
+        }
+        return data
+
+    def Engagement(self, media=None, get_number=0, per_request=50, comments=True, likes=True) -> dict:
+        ''' collecting comments and likers of many posts at once
+
+        without media the user posts are streamed from the media pages and
+        the crawls of every post start as soon as its media page is parsed,
+        every post crawl is its own cursor chain on the page pool
+
+        Parameters
+        ----------
+        media : list
+            post rows as in Media()["media"]["data"], rows of sidecar children carry their own
+            code and not the one of their post (default None == the user posts, get_number of them)
+        get_number : int
+            number of media to stream when media is not given (default 0 == all)
+        per_request : int
+            number of comments/likers each request (default 50)
+        comments : bool
+            crawl comments (default True)
+        likes : bool
+            crawl likers (default True)
+
+        Returns
+        -------
+        dict
+            comments and likers keyed by post code
+            {
+            "errors": [],
+            "media": 0,
+            "comments": {},
+            "likes": {},
+            "time": 2
+            }
+        '''
+        time1 = time.time()
+        errors = []
+        found = {"comments": {}, "likes": {}}
+        crawls = []
+
+        for row in (self.__Posts(get_number) if media is None else media):
+            shortcode = row["code"]
+            for kind, number_key, wanted in (("comments", "comments_number", comments), ("likes", "likes_number", likes)):
+                if not wanted or shortcode in found[kind]:
+                    continue
+                found[kind][shortcode] = NODES("id")
+                if row[number_key]:
+                    crawls.append(self.__PostCrawl(kind, shortcode, row[number_key], per_request, "", found[kind][shortcode].Add, errors))
+
+        for crawl in crawls:
+            crawl.tasks.Wait()
+
+        data = {
+            "errors": errors,
+            "media": len(set(found["comments"]) | set(found["likes"])),
+            "comments": found["comments"],
+            "likes": found["likes"],
+            "time": time.time() - time1
+        }
+        return data
+
+    def __Posts(self, get_number: int):
+        # post rows straight from the media pages, sidecars keep the code of their post and no post page is requested
+        if not self.user_valid:
+            msg = "NOT_VALID_USERNAME"
+            logging.error("{0} <{1}>".format(msg,self.username))
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(msg) + self.p.High(self.username))
+            return
+
+        def scrap(user: dict, add, resolve, bar) -> None:
+            for nodes in user['edges']:
+                add(self.__MediaRow(MediaNode(nodes['node'])))
+
+        fetch = partial(self.__GetMedia, self.info['id'], username=self.username)
+        options = self.__ParseVar(get_number or self.info.get('media', self.ALL), 50)
+        yield from self.__Stream(fetch, scrap, "node_id", "posts:%s" % self.info['id'], "", options, None, self.media_error)
+
+    def __PostCrawl(self, kind: str, shortcode: str, number: int, per_request: int, after: str, add, errors: list) -> PAGINATOR:
+        # start the comments/likes chain of one post without waiting
+        fetch = partial(self.__GetPostPage, kind, shortcode, errors=errors)
+        scrap = self.__ScrapComments if kind == "comments" else self.__ScrapLikers
+        if kind == "likes":
+            add = self.__Replayed(add, PROFILE)
+        paginator = PAGINATOR(self.pool, fetch, scrap, add, checkpoint=self.checkpoint, job="%s:%s" % (kind, shortcode), errors=self.__Errors(errors))
+        paginator.Start(after, self.__ParseVar(number, per_request))
+        return paginator
+
+    def __GetPostPage(self, kind: str, shortcode: str, after: str, number: int, errors: list) -> tuple:
+        hash_name, edge, variables = self.POST_CRAWLS[kind]
+
+        while True:
+            try:
+                query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"shortcode":"%s",%s"first":%s,"after":"%s"}' % (hashes[hash_name], shortcode, variables, number, after)
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.BULK)
+                query_json = json.loads(query_result.text)
+                # deleted or private posts and bad codes are answered with a null post, not a rate limit
+                if query_json.get('status') == "ok" and (query_json.get('data') or {}).get('shortcode_media', {}) is None:
+                    errors.append("POST_NOT_FOUND <%s>" % shortcode)
+                    logging.error("POST_NOT_FOUND <%s>" % shortcode)
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error("POST_NOT_FOUND" + self.p.High(shortcode)))
+                    return
+                try:
+                    page = query_json['data']['shortcode_media'][edge]
+                    has_next = page['page_info']["has_next_page"]
+                    after_that = page['page_info']['end_cursor']
+                except (KeyError, TypeError):
+                    raise(RATE_LIMIT)
+
+                if query_json['status'] == "ok":
+                    self.backoff.Success()
+                    return page, has_next, after_that
+                return
+
+            except RATE_LIMIT:
+                errors.append("RATE_LIMITED [%s] <%s>" % (kind, shortcode))
+                logging.error("<%s> RATE_LIMITED [%s]" % (shortcode, kind))
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [%s]" % kind + self.p.High(shortcode)))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
+
+            except Exception as e:
+                if str(e).upper() not in errors:
+                    errors.append(str(e).upper())
+                    logging.error("%s \n %s" % (e,traceback.format_exc()))
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error(str(e).upper()))
+
+    def __ScrapComments(self, comments: dict, add, resolve) -> None:
+        for comment in comments['edges']:
+            add(CommentNode(comment['node']))
+
+    def __ScrapLikers(self, likers: dict, add, resolve) -> None:
+        for user in likers['edges']:
+            add(self.__UserRow(user['node']))
+
+    def LogIn(self, username: str, password: str) -> requests.Session:
+        '''get user cookie using username and password
         Parameters
         ----------
         username : str
@@ -1044,7 +1761,8 @@ class USER(object):
             if request_number_left > 0:
                 request_number += 1
             else:
-                request_number = request_number
+                # last request is a full one
+                request_number_left = per_request
         else:
             request_number = 1
             request_number_left = var
@@ -1063,6 +1781,8 @@ class ROOT(USER):
             valid session cookies
         session: requests.Session
             active requests session
+        proxy: dict or PROXIES
+            requests proxies, or pool of proxies picked per request
         verbose: bool
             enable debug messages
         bar: bool
@@ -1071,17 +1791,24 @@ class ROOT(USER):
             request timeout
         threads: int
             number of running threads
+        checkpoint: str or CHECKPOINT
+            sqlite file saving every scraped page to resume interrupted crawls (default None)
+        records: bool
+            keep scraped rows as compact MEDIA/PROFILE/STORY records instead of dicts (default False)
+        pools: tuple
+            (page pool, resolver pool) executors shared with other users instead of own pools of threads (default None)
+        index: str or INDEX
+            sqlite file keeping the profile id of every username for Resolve() (default None)
         '''
 
-    def __init__(self, username, cookies=None, session=None, proxy={}, ssl=True, verbose=False, bar=True, timeout=20, threads=5):
-        super().__init__(username, cookies, session, proxy, ssl, verbose, bar, timeout, threads)
+    def __init__(self, username, cookies=None, session=None, proxy={}, ssl=True, verbose=False, bar=True, timeout=20, threads=5, checkpoint=None, records=False, pools=None, index=None):
+        super().__init__(username, cookies, session, proxy, ssl, verbose, bar, timeout, threads, checkpoint, records, pools, index)
 
         self.alerts = None
         self. notification_error = []
 
-        self.explore_list = []
+        self.explore_list = NODES()
         self.explore_error = []
-        self.explore_threads = []
 
     def Notifcation(self) -> dict:
         ''' getting root user notifcation and follow request 
@@ -1102,7 +1829,7 @@ class ROOT(USER):
         time1 = time.time()
         try:
             query_url = "https://www.instagram.com:443/accounts/activity/?__a=1"
-            query_result = self.session.get(query_url, timeout=self.timeout)
+            query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.INTERACTIVE)
             query_json = json.loads(query_result.text)
             result = query_json['graphql']['user']
             follow_requests = result['edge_follow_requests']['edges']
@@ -1150,31 +1877,184 @@ class ROOT(USER):
         dict
         '''
         query_url = "https://www.instagram.com/web/search/topsearch/?context=blended&query=%s" % query
-        query_result = self.session.get(query_url, timeout=self.timeout).json()
+        query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.INTERACTIVE).json()
         return query_result
 
-    def HashTag(self, tag: str, get_number=50, after="") -> dict:
-        '''search for hashtag and get the result media
-        
+    def HashTag(self, tag: str, get_number=50, per_request=50, after="", sink=None) -> dict:
+        '''search for hashtag and collect its media
+
         Parameters
         ----------
         tag : str
             keyword to search
         get_number : int
             number of media to get (default 50)
+        per_request : int
+            number of media each request (default 50)
         after : str
             represent instagram cursor of last hashtag
+        sink : COLUMNS or NDJSON
+            send the media to sink.Add() as they are scraped instead of keeping them, ex: COLUMNS(MEDIA) (default None)
 
         Returns
         -------
         dict
+            dictionary with media and time elapsed
+            {
+            "errors": [],
+            "media": {
+                "count": 0,
+                "data": []
+            },
+            "time": 2
+            }
         '''
+        time1 = time.time()
+        errors = []
+
+        if self.bar:
+            hashtag_progress = tqdm.trange(get_number, unit=" Node @ #" + tag, leave=False, ascii=True)
+            hashtag_progress.refresh(True)
+        else:
+            hashtag_progress = None
+
+        # every call keeps its own list so many tags can run at once
+        if sink is None:
+            rows = NODES()
+            add = self._USER__Replayed(rows.Add, MEDIA)
+        else:
+            rows, add = sink, self._USER__Sink(sink, "node_id")
+        fetch = partial(self.__GetHashTag, tag, errors=errors)
+        scrap = partial(self._USER__ScrapMedia, bar=hashtag_progress, records=True if sink is not None else None)
+        PAGINATOR(self.pool, fetch, scrap, add, checkpoint=self.checkpoint, job="hashtag:%s" % tag, resolver=self.resolver, errors=self._USER__Errors(errors)).Run(after, self._USER__ParseVar(get_number, per_request))
+
+        logging.info("hashtag media scraped successfuly <{0}>".format(tag))
+        if self.verbose:
+            tqdm.tqdm.write(self.p.Success("hashtag media scraped successfuly " + self.p.High(tag)))
+
+        if self.bar:
+            hashtag_progress.close()
+
+        data = {
+            "errors": errors,
+            "media": {
+                "count": len(rows),
+                "data": rows
+            },
+            "time": time.time() - time1
+        }
+        return data
+
+    def HashTags(self, tags: list, get_number=50, per_request=50, threads=5) -> dict:
+        '''collect the media of many hashtags at once
+
+        every tag runs as HashTag() on the shared pools and request budgets,
+        graphql:hash_tag budget bounds the requests of all of them
+
+        Parameters
+        ----------
+        tags : list
+            keywords to search
+        get_number : int
+            number of media to get for every tag (default 50)
+        per_request : int
+            number of media each request (default 50)
+        threads : int
+            number of tags scraped at a time (default 5)
+
+        Returns
+        -------
+        dict
+            {
+            "errors": [],
+            "tags": {tag: HashTag() result},
+            "time": 2
+            }
+        '''
+        time1 = time.time()
+        tags = list(dict.fromkeys(tags))
+        # tags wait on their chains so they run outside the page pool
+        with ThreadPoolExecutor(max_workers=threads) as runner:
+            results = list(runner.map(lambda tag: self.HashTag(tag, get_number, per_request), tags))
+
+        data = {
+            "errors": [error for result in results for error in result['errors']],
+            "tags": dict(zip(tags, results)),
+            "time": time.time() - time1
+        }
+        return data
+
+    def IterHashTag(self, tag: str, get_number=50, per_request=50, after=""):
+        ''' yielding hashtag media as soon as its page is parsed
+
+        Parameters
+        ----------
+        tag : str
+            keyword to search
+        get_number : int
+            number of media to get (default 50)
+        per_request : int
+            number of media each request (default 50)
+        after : str
+            represent instagram cursor of last hashtag
+
+        Yields
+        ------
+        dict
+            media node as in HashTag()["media"]["data"], closing the generator stops the paging
+        '''
+        if self.bar:
+            hashtag_progress = tqdm.trange(get_number, unit=" Node @ #" + tag, leave=False, ascii=True)
+        else:
+            hashtag_progress = None
+
+        errors = []
+        fetch = partial(self.__GetHashTag, tag, errors=errors)
+        yield from self._USER__Stream(fetch, self._USER__ScrapMedia, "node_id", "hashtag:%s" % tag, after, self._USER__ParseVar(get_number, per_request), hashtag_progress, errors)
+
+    def __GetHashTag(self, tag: str, after: str, number: int, errors: list) -> tuple:
         query_hash_hashtag = hashes['hash_tag']
-        query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"tag_name":"%s","first":%s,"after":"%s"}' % (query_hash_hashtag, tag, get_number, after)
-        query_result = self.session.get(query_url, timeout=self.timeout).json()
-        return query_result
 
-    def ExploreMedia(self, get_number=14, per_request=14, after="1") -> dict:
+        while True:
+            try:
+                query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"tag_name":"%s","first":%s,"after":"%s"}' % (query_hash_hashtag, tag, number, after)
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.BULK,
+                                                  validate=lambda response: response.json()['data']['hashtag']['edge_hashtag_to_media'] is not None)
+                query_json = json.loads(query_result.text)
+                # unknown tags are answered with a null hashtag, not a rate limit
+                if query_json.get('status') == "ok" and (query_json.get('data') or {}).get('hashtag', {}) is None:
+                    errors.append("HASHTAG_NOT_FOUND <%s>" % tag)
+                    logging.error("HASHTAG_NOT_FOUND <%s>" % tag)
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error("HASHTAG_NOT_FOUND" + self.p.High(tag)))
+                    return
+                try:
+                    media = query_json['data']['hashtag']['edge_hashtag_to_media']
+                    has_next = media['page_info']["has_next_page"]
+                    after_that = media['page_info']['end_cursor']
+                except (KeyError, TypeError):
+                    raise(RATE_LIMIT)
+
+                if query_json['status'] == "ok":
+                    self.backoff.Success()
+                    return media, has_next, after_that
+                return
+
+            except RATE_LIMIT:
+                errors.append("RATE_LIMITED [hashtag] <%s>" % tag)
+                logging.error("<%s> RATE_LIMITED [hashtag]" % tag)
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [hashtag]" + self.p.High(tag)))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
+
+            except Exception as e:
+                if str(e).upper() not in errors:
+                    errors.append(str(e).upper())
+                    logging.error("%s \n %s" % (e,traceback.format_exc()))
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error(str(e).upper()))
+
+    def ExploreMedia(self, get_number=14, per_request=14, after="1", sink=None) -> dict:
         ''' collecting root user explore media 
         
         Parameters
@@ -1185,6 +2065,8 @@ class ROOT(USER):
             number of media each request (default 14)
         after : str
             represent instagram cursor of last media (default '1')
+        sink : COLUMNS or NDJSON
+            send the media to sink.Add() as they are scraped instead of keeping them, ex: COLUMNS(MEDIA) (default None)
 
         Returns
         -------
@@ -1224,19 +2106,13 @@ class ROOT(USER):
         next_options = self._USER__ParseVar(nodes_number, per_request)
 
         # START COLLECTING MEDIA FOR EACH REQUEST
-        self.__GetExploreMedia(after=after, options=next_options, bar=explore_progress, username=self.username)
-        while True:
-            for item in self.explore_threads:
-                if item.is_alive():
-                    pass
-                else:
-                    try:
-                        self.explore_threads.remove(item)
-                    except ValueError:
-                        pass
-            
-            if len(self.explore_threads) == 0:
-                break 
+        fetch = partial(self.__GetExploreMedia, username=self.username)
+        if sink is None:
+            rows, add = self.explore_list, self._USER__Replayed(self.explore_list.Add, MEDIA)
+        else:
+            rows, add = sink, self._USER__Sink(sink, "node_id")
+        scrap = partial(self.__ScrapExploreNode, bar=explore_progress, records=True if sink is not None else None)
+        PAGINATOR(self.pool, fetch, scrap, add, checkpoint=self.checkpoint, job="explore:%s" % self.username, resolver=self.resolver, errors=self._USER__Errors(self.explore_error)).Run(after, next_options)
 
         logging.info("profile explore media scraped successfuly <{0}>".format(self.username))
         msg = "profile explore media scraped successfuly {0}".format(self.p.High(self.username))
@@ -1251,210 +2127,47 @@ class ROOT(USER):
         data = {
             "errors": self.explore_error,
             "media": {
-                "count": len(self.explore_list),
-                "data": self.explore_list
+                "count": len(rows),
+                "data": rows
             },
             "time": time2-time1
         }
         return data
 
-    def __GetExploreMedia(self, after: str, options: list, bar, username:str="") -> None:
-        with self.jail:
-            done = False
-            has_next = None
-            query_hash_pic = hashes['explore']
-
-            # check whether start scraping or return
-            if options[0] == 1:
-                has_next = False
-                number = options[1]
-            elif options[0] == 0:
-                return
-            else:
-                has_next == True
-                number = options[2]
-                
-            
-            while not done:
-                try:
-                    query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"first":%s,"after":"%s"}' % (query_hash_pic, number, after)
-                    query_result = self.session.get(query_url, timeout=self.timeout)
-                    query_json = json.loads(query_result.text)
-                    try:
-                        user = query_json['data']['user']['edge_web_discover_media']
-                        has_next = user['page_info']["has_next_page"]
-                        after_that = user['page_info']['end_cursor']
-                    except KeyError:
-                        raise(RATE_LIMIT)
-                    
-                    status = query_json['status']
-                    if status == "ok":
-                        if has_next == True:
-                            options[0] -= 1 
-                            runing_thread = threading.Thread(target=self.__GetExploreMedia,args=(after_that, options, bar))
-                            runing_thread.start()
-                            self.explore_threads.append(runing_thread)
-                        self.__ScrapExploreNode(user, bar=bar)
-                    done = True
-            
-                except RATE_LIMIT:
-                    self.explore_error.append("RATE_LIMITED")
-                    logging.error("RATE_LIMITED [explore]")
-                    if self.verbose:
-                        tqdm.tqdm.write(self.p.Error("RATE_LIMITED [explore]" + self.p.High(self.username)))
-                    time.sleep(30)
+    def __GetExploreMedia(self, after: str, number: int, username:str="") -> tuple:
+        query_hash_pic = hashes['explore']
 
-                except Exception as e:
-                    if not e in self.explore_error:
-                        self.explore_error.append(str(e).upper())
-                        logging.error("%s \n %s" % (e,traceback.format_exc()))
-                        if self.verbose:
-                            tqdm.tqdm.write(self.p.Error(str(e).upper()))
-
-    def __ScrapExploreNode(self, user: dict, bar) -> None :
-        nodess = user['edges']
-        for nodes in nodess:
-            node_done = False
-            nodes = nodes['node']
-            while not node_done:
-                # MEDIA_DATA
-                node_id = nodes['id']
-                node_type = nodes['__typename']
-                node_code = nodes['shortcode']
-                owner = nodes['owner']['id']
-                try:
-                    caption = nodes['edge_media_to_caption']['edges'][0]['node']['text']
-                except IndexError:
-                    caption = ""
-                node_comment_count = nodes['edge_media_to_comment']['count']
-                node_like_count = nodes['edge_media_preview_like']['count']
-                taken_at = nodes['taken_at_timestamp']
-                node_is_video = nodes['is_video']
-                dimentions = nodes['dimensions']
-                comments_disabled = nodes['comments_disabled']
-                nodes_links = nodes['thumbnail_resources']
+        while True:
+            try:
+                query_url = 'https://www.instagram.com/graphql/query/?query_hash=%s&variables={"first":%s,"after":"%s"}' % (query_hash_pic, number, after)
+                query_result = self.scheduler.Get(query_url, timeout=self.timeout, priority=self.scheduler.BULK)
+                query_json = json.loads(query_result.text)
                 try:
-                    gating_info = nodes['gating_info']
-                except:
-                    gating_info = None
+                    user = query_json['data']['user']['edge_web_discover_media']
+                    has_next = user['page_info']["has_next_page"]
+                    after_that = user['page_info']['end_cursor']
+                except KeyError:
+                    raise(RATE_LIMIT)
+                
+                status = query_json['status']
+                if status == "ok":
+                    self.backoff.Success()
+                    return user, has_next, after_that
+                return
+        
+            except RATE_LIMIT:
+                self.explore_error.append("RATE_LIMITED")
+                logging.error("RATE_LIMITED [explore]")
+                if self.verbose:
+                    tqdm.tqdm.write(self.p.Error("RATE_LIMITED [explore]" + self.p.High(self.username)))
+                self.backoff.Failure(query_result.status_code, query_result.headers.get("Retry-After"))
 
-                # GET SIDECAR ALL MEDIA
-                if node_type == "GraphSidecar":
-                    node_sidecar_done = False
-                    while not node_sidecar_done:
-                        try:
-                            sidecar_page_url = "https://www.instagram.com/p/%s" % (
-                                node_code)
-                            sidecar_html = self.session.get(sidecar_page_url,   timeout=self.timeout)
-                            try:
-                                sidecar_result_html = bs(sidecar_html.content, "lxml").findAll("script")[3].text
-                                sidecar_result_json = json.loads(sidecar_result_html.split("Data =")[1].replace(";", ""))
-                            except IndexError:
-                                sidecar_result_html = bs(sidecar_html.content, "lxml").findAll("script")[4].text
-                                sidecar_result_json = json.loads(sidecar_result_html.split("Data =")[1].replace(";", ""))
-
-                            sidecar_media = sidecar_result_json['entry_data']['PostPage'][0]['graphql']['shortcode_media']['edge_sidecar_to_children']['edges']
-                            for sidecar_nodes in sidecar_media:
-                                sidecar_nodes = sidecar_nodes['node']
-                                # MEDIA_DATA
-                                node_id = sidecar_nodes['id']
-                                node_type = sidecar_nodes['__typename']
-                                node_code = sidecar_nodes['shortcode']
-                                node_is_video = sidecar_nodes['is_video']
-                                dimentions = sidecar_nodes['dimensions']
-                                nodes_links = sidecar_nodes['display_resources']
-                                gating_info = sidecar_nodes['gating_info']
-                                node_download_link = sidecar_nodes['display_url']
-                                node_db = [node_id, node_type, node_code, owner, caption, node_comment_count, node_like_count,
-                                            taken_at, node_is_video, dimentions, comments_disabled, nodes_links, gating_info,
-                                            node_download_link]
-                                node_db = {
-                                    "node_id": node_db[0],
-                                    "type": node_db[1],
-                                    "code": node_db[2],
-                                    "owner": node_db[3],
-                                    "caption": node_db[4],
-                                    "comments_number": node_db[5],
-                                    "likes_number": node_db[6],
-                                    "taken_time": node_db[7],
-                                    "video": node_db[8],
-                                    "dimentions": node_db[9],
-                                    "comments_disabled": node_db[10],
-                                    "links": node_db[11],
-                                    "gating_info": node_db[12],
-                                    "hd_link": node_db[13]
-                                }
-                                if node_db not in self.explore_list:
-                                    self.explore_list.append(node_db)
-                            node_sidecar_done = True
-                        except Exception as e:
-                            logging.error("%s \n %s" % (e,traceback.format_exc()))
-                            if self.verbose:
-                                tqdm.tqdm.write(self.p.Error(str(e).upper()))
-                            continue
+            except Exception as e:
+                if not e in self.explore_error:
+                    self.explore_error.append(str(e).upper())
+                    logging.error("%s \n %s" % (e,traceback.format_exc()))
+                    if self.verbose:
+                        tqdm.tqdm.write(self.p.Error(str(e).upper()))
 
-                # GET VIDEO
-                elif node_is_video:
-                    node_video_done = False
-                    while not node_video_done:
-                        try:
-                            video_page_url = "https://www.instagram.com/p/%s" % (node_code)
-                            video_html = self.session.get(video_page_url,   timeout=self.timeout).text
-                            video_page = bs(video_html, "lxml").find("meta", {"property": "og:video:secure_url"})
-                            node_download_link = video_page['content']
-                            node_db = [node_id, node_type, node_code, owner, caption, node_comment_count, node_like_count,
-                                        taken_at, node_is_video, dimentions, comments_disabled, nodes_links, gating_info,
-                                        node_download_link]
-                            node_db = {
-                                "node_id": node_db[0],
-                                "type": node_db[1],
-                                "code": node_db[2],
-                                "owner": node_db[3],
-                                "caption": node_db[4],
-                                "comments_number": node_db[5],
-                                "likes_number": node_db[6],
-                                "taken_time": node_db[7],
-                                "video": node_db[8],
-                                "dimentions": node_db[9],
-                                "comments_disabled": node_db[10],
-                                "links": node_db[11],
-                                "gating_info": node_db[12],
-                                "hd_link": node_db[13]
-                            }
-                            if node_db not in self.explore_list:
-                                self.explore_list.append(node_db)
-                            node_video_done = True
-                        except Exception as e:
-                            logging.error("%s \n %s" % (e,traceback.format_exc()))
-                            if self.verbose:
-                                tqdm.tqdm.write(self.p.Error(str(e).upper()))
-                            continue
-
-                # GET PIC
-                else:
-                    node_download_link = nodes['display_url']
-                    node_db = [node_id, node_type, node_code, owner, caption, node_comment_count, node_like_count,
-                                taken_at, node_is_video, dimentions, comments_disabled, nodes_links, gating_info,
-                                node_download_link]
-                    node_db = {
-                        "node_id": node_db[0],
-                        "type": node_db[1],
-                        "code": node_db[2],
-                        "owner": node_db[3],
-                        "caption": node_db[4],
-                        "comments_number": node_db[5],
-                        "likes_number": node_db[6],
-                        "taken_time": node_db[7],
-                        "video": node_db[8],
-                        "dimentions": node_db[9],
-                        "comments_disabled": node_db[10],
-                        "links": node_db[11],
-                        "gating_info": node_db[12],
-                        "hd_link": node_db[13]
-                    }
-                    if node_db not in self.explore_list:
-                        self.explore_list.append(node_db)
-                node_done = True
-                if self.bar:
-                    bar.update(1)
- 
\ No newline at end of file
+    def __ScrapExploreNode(self, user: dict, add, resolve, bar, records=None) -> None :
+        self._USER__ScrapMedia(user, add, resolve, bar, records)
@@ -0,0 +1,218 @@
+#standard modules
+import time
+import logging
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+#third party modules
+import tqdm
+import requests
+
+#package modules
+from .back_end import USER
+from .index import INDEX
+from .meta import OUTPUT
+
+
+class BATCH(object):
+    '''scrap many profiles over one shared session
+
+        every profile gets its own USER but all of them share one
+        session (connection pool, request budgets and rate limit
+        backoff) and the same page and resolver pools, at most
+        profiles users run at a time and the usernames are read from
+        the iterable only as running profiles finish
+
+        Parameters
+        ----------
+        usernames : iterable
+            instagram usernames, may be a generator
+        cookies : dict
+            valid session cookies
+        session : requests.Session
+            active requests session
+        proxy : dict or PROXIES
+            requests proxies, or pool of proxies picked per request
+        ssl : bool
+            verify ssl certificates
+        verbose : bool
+            enable debug messages
+        timeout : int
+            request timeout
+        threads : int
+            number of page threads and of resolver threads shared by every profile (default 10)
+        profiles : int
+            number of profiles scraped at a time (default 10)
+        jobs : tuple
+            USER methods called for every profile in order (default ("Information", "Media", "Story"))
+        options : dict
+            {method name: keyword arguments} ex: {"Media": {"get_number": 50}}
+        records : bool
+            keep scraped rows as compact records instead of dicts (default False)
+        checkpoint : str or CHECKPOINT
+            sqlite file saving every scraped page to resume interrupted crawls (default None)
+        user : class
+            USER or ROOT (default USER)
+        index : str or INDEX
+            sqlite file of username to profile id shared by every profile, with
+            "Resolve" instead of "Information" in jobs the known profiles are not requested (default None)
+        business : str
+            Information(business=) of every profile (default background), the
+            business info of the running profiles is requested on the resolver
+            pool while their other jobs go on and lands in result["Information"]["full"]
+        '''
+
+    # formating the output
+    p = OUTPUT()
+
+    def __init__(self, usernames, cookies=None, session=None, proxy={}, ssl=True, verbose=False, timeout=20, threads=10,
+                 profiles=10, jobs=("Information", "Media", "Story"), options=None, records=False, checkpoint=None, user=USER, business="background", index=None):
+        self.usernames = usernames
+        self.cookie = cookies
+        self.proxy = proxy
+        self.ssl = ssl
+        self.verbose = verbose
+        self.timeout = timeout
+        self.threads = threads
+        self.profiles = profiles
+        self.jobs = jobs
+        self.options = options or {}
+        self.records = records
+        self.checkpoint = checkpoint
+        self.user = user
+        self.business = business
+
+        if isinstance(index, str):
+            index = INDEX(index)
+        self.index = index
+
+        if session:
+            self.session = session
+        else:
+            self.session = requests.Session()
+            self.session.cookies = requests.cookies.cookiejar_from_dict(self.cookie)
+
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+        self.resolver = ThreadPoolExecutor(max_workers=threads)
+
+        self.done = 0
+        self.failed = 0
+        self.started = None
+        self.__lock = threading.Lock()
+
+    def Profile(self, username: str) -> dict:
+        '''scrap one profile
+
+        Parameters
+        ----------
+        username : str
+            instagram username
+
+        Returns
+        -------
+        dict
+            {"username": username, "errors": [], <method name>: <method result>}
+        '''
+        result = {"username": username, "errors": []}
+        try:
+            user = self.user(username, cookies=self.cookie, session=self.session, proxy=self.proxy, ssl=self.ssl, verbose=self.verbose,
+                             bar=False, timeout=self.timeout, threads=self.threads, checkpoint=self.checkpoint, records=self.records,
+                             pools=(self.pool, self.resolver), index=self.index)
+            for job in self.jobs:
+                options = dict(self.options.get(job, {}))
+                if job == "Information":
+                    options.setdefault("business", self.business)
+                result[job] = getattr(user, job)(**options)
+                # the other methods need a valid user
+                if job in ("Information", "Resolve") and not user.user_valid:
+                    result["errors"].append("NOT_VALID_USERNAME")
+                    break
+
+            if result.get("Information") and user.user_valid and result["Information"]["full"] is None:
+                # business info requested in the background is ready by now or waited for here
+                result["Information"]["full"] = user.full_info
+        except Exception as e:
+            result["errors"].append(str(e).upper())
+            logging.error("<%s> %s \n %s" % (username, e, traceback.format_exc()))
+            if self.verbose:
+                tqdm.tqdm.write(self.p.Error(str(e).upper()) + self.p.High(username))
+
+        with self.__lock:
+            self.done += 1
+            if result["errors"]:
+                self.failed += 1
+        return result
+
+    def Iter(self):
+        '''scrap every profile and yield its result once it is done
+
+        Yields
+        ------
+        tuple
+            (username, result) as Profile() returns it, in finishing order
+        '''
+        if self.started is None:
+            self.started = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.profiles) as runner:
+            running = {}
+            for username in self.usernames:
+                running[runner.submit(self.Profile, username)] = username
+                # keep a few profiles queued without reading the whole iterable
+                if len(running) >= self.profiles * 2:
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        yield running.pop(future), future.result()
+
+            for future in as_completed(list(running)):
+                yield running.pop(future), future.result()
+
+    def Run(self, callback=None) -> dict:
+        '''scrap every profile and wait until the last one is done
+
+        Parameters
+        ----------
+        callback : callable
+            callback(username, result) called for every profile once it is done
+
+        Returns
+        -------
+        dict
+            throughput stats as Stats() returns them
+        '''
+        for username, result in self.Iter():
+            if callback:
+                callback(username, result)
+        return self.Stats()
+
+    def Stats(self) -> dict:
+        '''aggregate throughput of the batch
+
+        Returns
+        -------
+        dict
+            {
+            "profiles": 0,
+            "failed": 0,
+            "requests": 0,
+            "time": 0,
+            "profiles_per_sec": 0,
+            "requests_per_sec": 0
+            }
+        '''
+        elapsed = time.time() - self.started if self.started else 0
+        requests_number = self.session.scheduler.requests if hasattr(self.session, "scheduler") else 0
+        return {
+            "profiles": self.done,
+            "failed": self.failed,
+            "requests": requests_number,
+            "time": elapsed,
+            "profiles_per_sec": self.done / elapsed if elapsed else 0,
+            "requests_per_sec": requests_number / elapsed if elapsed else 0
+        }
+
+    def Close(self) -> None:
+        '''stop the shared pools'''
+        self.pool.shutdown()
+        self.resolver.shutdown()
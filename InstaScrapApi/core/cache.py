@@ -0,0 +1,156 @@
+#standard modules
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+#third party modules
+import requests
+
+
+class CACHE(object):
+    '''ttl cache of successful responses kept in memory and optionally in sqlite
+
+        only endpoint classes with a ttl are cached (see SCHEDULER.Classify),
+        the memory cache drops its least recently used responses past size
+        entries, the sqlite file keeps responses across runs and is trimmed
+        to disk_size entries
+
+        Parameters
+        ----------
+        ttls : dict
+            {endpoint class: seconds} (default CACHE.TTLS)
+        size : int
+            max responses kept in memory (default 1000)
+        path : str
+            sqlite file (default None == memory only)
+        disk_size : int
+            max responses kept in the sqlite file (default 100000)
+        '''
+
+    TTLS = {
+        "profile": 300,
+        "info": 3600,
+        "search": 300,
+        "graphql:hash_tag": 60
+    }
+
+    # puts between two trims of the sqlite file
+    TRIM = 100
+
+    def __init__(self, ttls=None, size=1000, path=None, disk_size=100000):
+        self.ttls = dict(self.TTLS if ttls is None else ttls)
+        self.size = size
+        self.path = path
+        self.disk_size = disk_size
+        self.hits = 0
+        self.misses = 0
+
+        self.__memory = OrderedDict()
+        self.__puts = 0
+        self.__lock = threading.Lock()
+        self.__db = None
+        if path:
+            self.__db = sqlite3.connect(path, check_same_thread=False)
+            with self.__db:
+                self.__db.execute("CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, stored REAL, status INTEGER, headers TEXT, encoding TEXT, content BLOB)")
+
+    def Cached(self, endpoint: str) -> bool:
+        '''whether responses of endpoint class are cached'''
+        return endpoint in self.ttls
+
+    @staticmethod
+    def Valid(response) -> bool:
+        '''whether response is a json answer worth caching, the default validate of SCHEDULER.Get'''
+        try:
+            body = response.json()
+        except ValueError:
+            return False
+        # login pages are html and failed graphql queries answer status fail
+        return isinstance(body, dict) and body.get("status", "ok") == "ok"
+
+    def Get(self, url: str, endpoint: str):
+        '''fresh cached response of url, None on miss
+
+        Parameters
+        ----------
+        url : str
+            request url
+        endpoint : str
+            endpoint class of url
+
+        Returns
+        -------
+        requests.Response
+        '''
+        oldest = time.time() - self.ttls[endpoint]
+        with self.__lock:
+            entry = self.__memory.get(url)
+            if entry is not None and entry[0] < oldest:
+                del self.__memory[url]
+                entry = None
+            if entry is None and self.__db is not None:
+                entry = self.__db.execute("SELECT stored, status, headers, encoding, content FROM responses WHERE url = ? AND stored >= ?", (url, oldest)).fetchone()
+                if entry is not None:
+                    entry = (entry[0], entry[1], json.loads(entry[2]), entry[3], entry[4])
+                    self.__Remember(url, entry)
+
+            if entry is None:
+                self.misses += 1
+                return
+            self.hits += 1
+            self.__memory.move_to_end(url)
+
+        response = requests.Response()
+        response.url = url
+        response.status_code = entry[1]
+        response.headers.update(entry[2])
+        response.encoding = entry[3]
+        response._content = entry[4]
+        return response
+
+    def Put(self, url: str, endpoint: str, response) -> None:
+        '''cache response of url if it succeeded, callers check it is valid first'''
+        if response.status_code != 200 or not self.Cached(endpoint):
+            return
+        entry = (time.time(), response.status_code, dict(response.headers), response.encoding, response.content)
+        with self.__lock:
+            self.__Remember(url, entry)
+            if self.__db is not None:
+                with self.__db:
+                    self.__db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)", (url, entry[0], entry[1], json.dumps(entry[2]), entry[3], entry[4]))
+                    self.__puts += 1
+                    if self.__puts % self.TRIM == 0:
+                        self.__db.execute("DELETE FROM responses WHERE url IN (SELECT url FROM responses ORDER BY stored DESC LIMIT -1 OFFSET ?)", (self.disk_size,))
+
+    def __Remember(self, url: str, entry: tuple) -> None:
+        self.__memory[url] = entry
+        self.__memory.move_to_end(url)
+        while len(self.__memory) > self.size:
+            self.__memory.popitem(last=False)
+
+    def Invalidate(self, url=None) -> None:
+        '''drop the cached response of url (default every response)'''
+        with self.__lock:
+            if url is None:
+                self.__memory.clear()
+            else:
+                self.__memory.pop(url, None)
+            if self.__db is not None:
+                with self.__db:
+                    if url is None:
+                        self.__db.execute("DELETE FROM responses")
+                    else:
+                        self.__db.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def Stats(self) -> dict:
+        '''hits, misses and responses kept in memory'''
+        with self.__lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.__memory)}
+
+    def Close(self) -> None:
+        '''close the sqlite file'''
+        if self.__db is not None:
+            with self.__lock:
+                self.__db.close()
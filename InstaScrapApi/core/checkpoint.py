@@ -0,0 +1,86 @@
+#standard modules
+import json
+import sqlite3
+import threading
+
+
+class CHECKPOINT(object):
+    '''sqlite store of scraped pages used to resume an interrupted crawl
+
+        every parsed page is saved with the cursor it was requested
+        with, the cursor of the page after it and the rows it produced,
+        a restarted crawl replays the saved chain and continues from
+        the last saved cursor, the pages of a chain are cleared once it
+        reaches its end so the next crawl requests it again
+
+        Parameters
+        ----------
+        path : str
+            sqlite database file
+        '''
+
+    def __init__(self, path: str):
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        with self.__db:
+            self.__db.execute("CREATE TABLE IF NOT EXISTS pages (job TEXT, after TEXT, next TEXT, rows TEXT, PRIMARY KEY (job, after))")
+
+    def Save(self, job: str, after: str, next_cursor, rows: list) -> None:
+        '''save one parsed page
+
+        Parameters
+        ----------
+        job : str
+            crawl name ex: media:<profile_id>
+        after : str
+            cursor the page was requested with
+        next_cursor : str
+            cursor of the next page, None if it is the last one
+        rows : list
+            rows parsed from the page, dicts or records
+        '''
+        with self.__lock, self.__db:
+            self.__db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", (job, after, next_cursor, json.dumps(rows, default=lambda row: row.to_dict())))
+
+    def Resume(self, job: str, after: str):
+        '''yield the saved pages of job chained from cursor after
+
+        Parameters
+        ----------
+        job : str
+            crawl name
+        after : str
+            cursor of the first page
+
+        Yields
+        ------
+        tuple
+            (rows, next_cursor) of every saved page in chain order
+        '''
+        # one page in memory at a time, seen cursors stop a looping chain
+        seen = set()
+        while after not in seen:
+            seen.add(after)
+            with self.__lock:
+                page = self.__db.execute("SELECT next, rows FROM pages WHERE job = ? AND after = ?", (job, after)).fetchone()
+            if page is None:
+                return
+            next_cursor, rows = page
+            yield json.loads(rows), next_cursor
+            if next_cursor is None:
+                return
+            after = next_cursor
+
+    def Clear(self, job=None) -> None:
+        '''delete saved pages of job (default every job)'''
+        with self.__lock, self.__db:
+            if job is None:
+                self.__db.execute("DELETE FROM pages")
+            else:
+                self.__db.execute("DELETE FROM pages WHERE job = ?", (job,))
+
+    def Close(self) -> None:
+        '''close the database'''
+        with self.__lock:
+            self.__db.close()
@@ -0,0 +1,191 @@
+#standard modules
+import sys
+import json
+import struct
+import threading
+from array import array
+
+#package modules
+from .records import MEDIA, PROFILE
+
+
+# typed columns of every record, nested fields (dimentions, links, gating_info) are left out
+# q: int64, b: bool, s: utf-8 string
+SCHEMAS = {
+    "MEDIA": (("node_id", "q"), ("type", "s"), ("code", "s"), ("owner", "q"), ("caption", "s"),
+              ("comments_number", "q"), ("likes_number", "q"), ("taken_time", "q"), ("video", "b"),
+              ("comments_disabled", "b"), ("hd_link", "s")),
+    "PROFILE": (("id", "q"), ("username", "s"), ("full_name", "s"), ("small_pic", "s"), ("verified", "b"),
+                ("following_user", "b"), ("requested_by_viewer", "b"))
+}
+
+# file layout: MAGIC, header length, json header, column buffers
+MAGIC = b"ISCOLS1\n"
+HEADER = struct.Struct("<Q")
+
+
+class COLUMN(object):
+    '''one typed column, strings are kept as one utf-8 buffer and offsets like arrow
+
+        Parameters
+        ----------
+        typecode : str
+            q, b or s
+        '''
+
+    def __init__(self, typecode: str):
+        self.typecode = typecode
+        # 1 for every row holding a value, 0 for None
+        self.valid = bytearray()
+        if typecode == "s":
+            self.offsets = array("q", [0])
+            self.data = bytearray()
+        else:
+            self.data = array(typecode)
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def Append(self, value) -> None:
+        '''append one value, None is kept as null'''
+        self.valid.append(value is not None)
+        if self.typecode == "s":
+            if value is not None:
+                self.data += str(value).encode()
+            self.offsets.append(len(self.data))
+        else:
+            self.data.append(int(value) if value is not None else 0)
+
+    def Value(self, index: int):
+        '''value of row index'''
+        if not self.valid[index]:
+            return
+        elif self.typecode == "s":
+            return self.data[self.offsets[index]:self.offsets[index + 1]].decode()
+        elif self.typecode == "b":
+            return bool(self.data[index])
+        return self.data[index]
+
+    def Values(self) -> list:
+        '''every value of the column'''
+        return [self.Value(index) for index in range(len(self))]
+
+    def Buffers(self) -> list:
+        '''raw buffers of the column'''
+        if self.typecode == "s":
+            return [bytes(self.valid), self.offsets.tobytes(), bytes(self.data)]
+        return [bytes(self.valid), self.data.tobytes()]
+
+    @classmethod
+    def FromBuffers(cls, typecode: str, buffers: list, swap=False):
+        '''column from the buffers Buffers() returned'''
+        column = cls(typecode)
+        column.valid = bytearray(buffers[0])
+        if typecode == "s":
+            column.offsets = array("q")
+            column.offsets.frombytes(buffers[1])
+            column.data = bytearray(buffers[2])
+            if swap:
+                column.offsets.byteswap()
+        else:
+            column.data.frombytes(buffers[1])
+            if swap:
+                column.data.byteswap()
+        return column
+
+
+class COLUMNS(object):
+    '''scraped rows kept as typed columns instead of a list of dicts
+
+        rows are split into their columns as soon as they are added so
+        a full crawl is held as a few arrays, Write() saves the arrays
+        as they are and Read() loads them back
+
+        Parameters
+        ----------
+        record : MEDIA or PROFILE
+            record class of the rows, MEDIA for Media()/ExploreMedia() and
+            PROFILE for Follower()/Following() (default PROFILE)
+        '''
+
+    def __init__(self, record=PROFILE):
+        self.record = record
+        self.schema = SCHEMAS[record.__name__]
+        self.columns = {name: COLUMN(typecode) for name, typecode in self.schema}
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.columns[self.schema[0][0]])
+
+    def __getitem__(self, name: str) -> list:
+        return self.columns[name].Values()
+
+    def Add(self, row) -> None:
+        '''append row, a record or a dict'''
+        values = [row[name] for name, _ in self.schema]
+        with self.__lock:
+            for (name, _), value in zip(self.schema, values):
+                self.columns[name].Append(value)
+
+    def to_dict(self) -> dict:
+        '''{column name: list of values}'''
+        return {name: self[name] for name, _ in self.schema}
+
+    def ToArrow(self):
+        '''columns as pyarrow.Table, needs pyarrow installed'''
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("pyarrow is required for COLUMNS.ToArrow()")
+        types = {"q": pyarrow.int64(), "b": pyarrow.bool_(), "s": pyarrow.string()}
+        return pyarrow.table({name: pyarrow.array(self[name], type=types[typecode]) for name, typecode in self.schema})
+
+    def Write(self, path: str) -> None:
+        '''write the columns to path
+
+        Parameters
+        ----------
+        path : str
+            output file
+        '''
+        with self.__lock:
+            buffers = []
+            header = {"record": self.record.__name__, "rows": len(self), "byteorder": sys.byteorder, "columns": []}
+            for name, typecode in self.schema:
+                sizes = []
+                for buffer in self.columns[name].Buffers():
+                    buffers.append(buffer)
+                    sizes.append(len(buffer))
+                header["columns"].append({"name": name, "type": typecode, "sizes": sizes})
+
+        header = json.dumps(header).encode()
+        with open(path, "wb") as output:
+            output.write(MAGIC)
+            output.write(HEADER.pack(len(header)))
+            output.write(header)
+            for buffer in buffers:
+                output.write(buffer)
+
+    @classmethod
+    def Read(cls, path: str):
+        '''load columns written by Write()
+
+        Parameters
+        ----------
+        path : str
+            file written by Write()
+
+        Returns
+        -------
+        COLUMNS
+        '''
+        with open(path, "rb") as source:
+            if source.read(len(MAGIC)) != MAGIC:
+                raise ValueError("not a columns file <%s>" % path)
+            header = json.loads(source.read(HEADER.unpack(source.read(HEADER.size))[0]))
+            columns = cls({"MEDIA": MEDIA, "PROFILE": PROFILE}[header["record"]])
+            swap = header["byteorder"] != sys.byteorder
+            for column in header["columns"]:
+                buffers = [source.read(size) for size in column["sizes"]]
+                columns.columns[column["name"]] = COLUMN.FromBuffers(column["type"], buffers, swap)
+        return columns
@@ -0,0 +1,398 @@
+#standard modules
+import queue
+import logging
+import threading
+import traceback
+from functools import partial
+
+
+def Report(error: Exception, errors=None) -> None:
+    '''log error raised on a worker with its traceback and hand it to errors
+
+    Parameters
+    ----------
+    error : Exception
+        exception raised by the worker
+    errors : callable
+        errors(error) called after logging (default None)
+    '''
+    logging.error("%s \n %s" % (error, traceback.format_exc()))
+    if errors is not None:
+        errors(error)
+
+
+class TASKS(object):
+    '''keep track of page workers running on a worker pool
+
+        every worker is submitted through Start() and the scraping
+        method blocks on Wait() until the last worker is done, the
+        waiting thread sleeps on a condition variable instead of
+        polling the workers
+
+        Parameters
+        ----------
+        pool : concurrent.futures.Executor
+            pool running the workers
+        done : callable
+            called once the last running worker is done
+        errors : callable
+            errors(exception) gets every exception a worker raised, after it is logged (default None)
+        '''
+
+    def __init__(self, pool, done=None, errors=None):
+        self.pool = pool
+        self.done = done
+        self.errors = errors
+        self.__running = 0
+        self.__done = threading.Condition()
+
+    def Start(self, target, args=(), pool=None):
+        '''run target(*args) on the pool and count it as running
+
+        Parameters
+        ----------
+        target : callable
+            worker function
+        args : tuple
+            worker arguments
+        pool : concurrent.futures.Executor
+            run on this pool instead (default None)
+
+        Returns
+        -------
+        concurrent.futures.Future
+        '''
+        with self.__done:
+            self.__running += 1
+        try:
+            return (pool or self.pool).submit(self.__Run, target, args)
+        except Exception:
+            self.__Finish()
+            raise
+
+    def __Run(self, target, args) -> None:
+        try:
+            target(*args)
+        except Exception as e:
+            # nothing reads the future, the error is reported here
+            Report(e, self.errors)
+        finally:
+            self.__Finish()
+
+    def __Finish(self) -> None:
+        with self.__done:
+            self.__running -= 1
+            finished = self.__running == 0
+            if finished:
+                self.__done.notify_all()
+        if finished and self.done:
+            self.done()
+
+    def Wait(self, timeout=None) -> bool:
+        '''block until every started worker is done
+
+        Parameters
+        ----------
+        timeout : float
+            max seconds to wait (default None == forever)
+
+        Returns
+        -------
+        bool
+            False if timeout passed while workers still running
+        '''
+        with self.__done:
+            return self.__done.wait_for(lambda: self.__running == 0, timeout)
+
+    def Running(self) -> int:
+        '''number of workers still running'''
+        with self.__done:
+            return self.__running
+
+
+class PAGINATOR(object):
+    '''follow an instagram cursor chain on a bounded worker pool
+
+        pages are requested one after another since every page needs
+        the cursor of the one before it, the next page is queued on the
+        pool before the current one is parsed so parsing and the next
+        request overlap without starting a thread per page
+
+        Parameters
+        ----------
+        pool : concurrent.futures.Executor
+            pool running the page workers
+        fetch : callable
+            fetch(after, number) -> (page, has_next, end_cursor) or None to stop
+        scrap : callable
+            scrap(page, add, resolve) parses one fetched page and calls add(row) for every row,
+            rows needing more requests are handed to resolve(target, args) where target(*args)
+            returns their rows
+        add : callable
+            add(row) collects the scraped rows
+        done : callable
+            called once the chain ended
+        checkpoint : CHECKPOINT
+            store of parsed pages to resume the chain from, cleared once the chain reaches its end (default None)
+        job : str
+            chain name inside the checkpoint
+        resolver : concurrent.futures.Executor
+            pool running the resolve targets so they do not hold the page workers (default None == inline)
+        errors : callable
+            errors(exception) gets every exception raised by fetch, scrap or a resolve target, the
+            rest of a page whose scrap raised is skipped and the page is not saved so a resume requests it again (default None)
+        '''
+
+    def __init__(self, pool, fetch, scrap, add, done=None, checkpoint=None, job="", resolver=None, errors=None):
+        self.fetch = fetch
+        self.scrap = scrap
+        self.add = add
+        self.checkpoint = checkpoint
+        self.job = job
+        self.resolver = resolver
+        self.done = done
+        self.errors = errors
+        self.tasks = TASKS(pool, self.__Done, self.__Error)
+        self.cancelled = threading.Event()
+        # the last page was reached, not only interrupted
+        self.ended = False
+        # a page lost rows to an error
+        self.failed = False
+
+    def Run(self, after: str, options: list) -> None:
+        '''scrap the chain starting at cursor after and wait until it ends
+
+        Parameters
+        ----------
+        after : str
+            instagram cursor of the first page
+        options : list
+            [number_or_requests, number_of_left, per_request] as USER.__ParseVar returns
+        '''
+        self.Start(after, options)
+        self.tasks.Wait()
+
+    def Start(self, after: str, options: list) -> None:
+        '''start scraping the chain without waiting, same parameters as Run()'''
+        if self.checkpoint is None:
+            self.tasks.Start(self.__Page, (after, list(options)))
+        else:
+            self.tasks.Start(self.__Resume, (after, list(options)))
+
+    def Cancel(self) -> None:
+        '''stop requesting pages, the running ones still finish'''
+        self.cancelled.set()
+
+    def __Done(self) -> None:
+        # a finished chain is not resumed, the next crawl requests it again,
+        # one with a failed page is kept to request only that page onward
+        if self.checkpoint is not None and self.ended and not self.cancelled.is_set() and not self.failed:
+            self.checkpoint.Clear(self.job)
+        if self.done:
+            self.done()
+
+    def __Resume(self, after: str, options: list) -> None:
+        # replay the saved pages then continue from the last saved cursor
+        for rows, next_cursor in self.checkpoint.Resume(self.job, after):
+            if options[0] == 0 or self.cancelled.is_set():
+                return
+            for row in rows:
+                self.add(row)
+            if next_cursor is None or options[0] == 1:
+                self.ended = True
+                return
+            options[0] -= 1
+            after = next_cursor
+        self.__Page(after, options)
+
+    def __Page(self, after: str, options: list) -> None:
+        # check whether start scraping or return
+        if options[0] == 0 or self.cancelled.is_set():
+            return
+        elif options[0] == 1:
+            number = options[1]
+        else:
+            number = options[2]
+
+        result = self.fetch(after, number)
+        if result is None:
+            return
+
+        page, has_next, end_cursor = result
+        if has_next and options[0] > 1 and not self.cancelled.is_set():
+            self.tasks.Start(self.__Page, (end_cursor, [options[0] - 1, options[1], options[2]]))
+        elif not self.cancelled.is_set():
+            self.ended = True
+
+        if self.checkpoint is None:
+            self.scrap(page, self.add, partial(self.__Resolve, self.add))
+            return
+
+        # the page is saved once its resolved rows are there too,
+        # a page missing rows is not saved so a resume requests it again
+        rows = []
+        pending = [1]
+        failed = []
+        lock = threading.Lock()
+
+        def finish(ok=True) -> None:
+            with lock:
+                if not ok:
+                    failed.append(True)
+                pending[0] -= 1
+                if pending[0] > 0:
+                    return
+            if not failed:
+                self.checkpoint.Save(self.job, after, end_cursor if has_next else None, rows)
+            for row in rows:
+                self.add(row)
+
+        def resolve(target, args) -> None:
+            with lock:
+                pending[0] += 1
+            self.__Resolve(rows.append, target, args, finish)
+
+        try:
+            self.scrap(page, rows.append, resolve)
+        except Exception as e:
+            Report(e, self.__Error)
+            finish(False)
+        else:
+            finish()
+
+    def __Resolve(self, add, target, args, finish=None) -> None:
+        if self.resolver is None:
+            self.__Resolved(add, target, args, finish)
+        else:
+            self.tasks.Start(self.__Resolved, (add, target, args, finish), pool=self.resolver)
+
+    def __Error(self, error: Exception) -> None:
+        self.failed = True
+        if self.errors is not None:
+            self.errors(error)
+
+    def __Resolved(self, add, target, args, finish) -> None:
+        # a failing target only loses its own rows, not the rest of the page
+        ok = True
+        try:
+            for row in target(*args):
+                add(row)
+        except Exception as e:
+            ok = False
+            Report(e, self.__Error)
+        finally:
+            if finish is not None:
+                finish(ok)
+
+
+class NODES(list):
+    '''list of scraped nodes with a hashed index of their keys
+
+        keeps insertion order, Add() skips any node whose key was
+        already added and is safe to call from many page workers
+
+        Parameters
+        ----------
+        key : str
+            node field used as the dedup key (default node_id)
+        '''
+
+    def __init__(self, key="node_id"):
+        super().__init__()
+        self.key = key
+        self.__index = set()
+        self.__lock = threading.Lock()
+
+    def New(self, node: dict) -> bool:
+        '''record node key without keeping the node
+
+        Parameters
+        ----------
+        node : dict
+            scraped node
+
+        Returns
+        -------
+        bool
+            False if the key was already recorded
+        '''
+        key = node[self.key]
+        with self.__lock:
+            if key in self.__index:
+                return False
+            self.__index.add(key)
+            return True
+
+    def Add(self, node: dict) -> bool:
+        '''append node unless its key is already in the list
+
+        Parameters
+        ----------
+        node : dict
+            scraped node
+
+        Returns
+        -------
+        bool
+            True if node was added
+        '''
+        if self.New(node):
+            self.append(node)
+            return True
+        return False
+
+
+class STREAM(object):
+    '''hand scraped rows from page workers to one consuming generator
+
+        the queue is bounded so workers wait while the consumer is
+        behind and memory stays the same whatever the crawl size,
+        closing the generator cancels the rest of the paging
+
+        Parameters
+        ----------
+        size : int
+            max rows waiting for the consumer
+        '''
+
+    END = object()
+
+    def __init__(self, size=500):
+        self.rows = queue.Queue(maxsize=size)
+        self.closed = threading.Event()
+
+    def Put(self, row) -> None:
+        '''queue row for the consumer, dropped once the consumer is gone'''
+        while not self.closed.is_set():
+            try:
+                self.rows.put(row, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def End(self) -> None:
+        '''mark the end of the rows'''
+        self.Put(self.END)
+
+    def Iter(self, paginator: PAGINATOR, after: str, options: list):
+        '''start the paginator and yield rows as its pages are parsed
+
+        Parameters
+        ----------
+        paginator : PAGINATOR
+            paginator created with add putting rows into this stream and done=End
+        after : str
+            instagram cursor of the first page
+        options : list
+            [number_or_requests, number_of_left, per_request] as USER.__ParseVar returns
+        '''
+        paginator.Start(after, options)
+        try:
+            while True:
+                row = self.rows.get()
+                if row is self.END:
+                    return
+                yield row
+        finally:
+            self.closed.set()
+            paginator.Cancel()
@@ -0,0 +1,106 @@
+#standard modules
+import sqlite3
+import threading
+
+
+class INDEX(object):
+    '''sqlite store of username to profile id resolved across runs
+
+        every profile scraped by Information() is saved with its id so
+        a later crawl of the same username can go straight to the paged
+        endpoints with USER.Resolve() instead of requesting the profile,
+        the newest media of every profile crawled with
+        Media(incremental=True) is kept too so the next crawl stops there
+
+        Parameters
+        ----------
+        path : str
+            sqlite database file (default ":memory:")
+        '''
+
+    # usernames per query of Lookup(), below the sqlite variables limit
+    CHUNK = 500
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        with self.__db:
+            self.__db.execute("CREATE TABLE IF NOT EXISTS profiles (username TEXT PRIMARY KEY, id TEXT)")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS newest (id TEXT PRIMARY KEY, node_id TEXT, taken_at INTEGER)")
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return self.__db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def __contains__(self, username: str) -> bool:
+        return self.Get(username) is not None
+
+    def Add(self, username: str, profile_id: str) -> None:
+        '''save the profile id of username'''
+        self.Load([(username, profile_id)])
+
+    def Load(self, profiles) -> None:
+        '''save many profiles at once
+
+        Parameters
+        ----------
+        profiles : iterable or dict
+            (username, profile id) pairs or {username: profile id}
+        '''
+        if isinstance(profiles, dict):
+            profiles = profiles.items()
+        rows = [(username.lower(), str(profile_id)) for username, profile_id in profiles]
+        with self.__lock, self.__db:
+            self.__db.executemany("INSERT OR REPLACE INTO profiles VALUES (?, ?)", rows)
+
+    def Get(self, username: str):
+        '''profile id of username, None if it is not known'''
+        with self.__lock:
+            row = self.__db.execute("SELECT id FROM profiles WHERE username = ?", (username.lower(),)).fetchone()
+        return row[0] if row else None
+
+    def Lookup(self, usernames) -> dict:
+        '''profile ids of many usernames at once
+
+        Parameters
+        ----------
+        usernames : iterable
+            instagram usernames
+
+        Returns
+        -------
+        dict
+            {username: profile id} of the known usernames only
+        '''
+        usernames = {username.lower(): username for username in usernames}
+        keys = list(usernames)
+        found = {}
+        with self.__lock:
+            for start in range(0, len(keys), self.CHUNK):
+                chunk = keys[start:start + self.CHUNK]
+                query = "SELECT username, id FROM profiles WHERE username IN (%s)" % ",".join("?" * len(chunk))
+                for username, profile_id in self.__db.execute(query, chunk):
+                    found[usernames[username]] = profile_id
+        return found
+
+    def Remove(self, username: str) -> None:
+        '''forget username ex: after it was renamed or deleted'''
+        with self.__lock, self.__db:
+            self.__db.execute("DELETE FROM profiles WHERE username = ?", (username.lower(),))
+
+    def Newest(self, profile_id: str):
+        '''(node_id, taken_at) of the newest media crawled of profile_id, None if it was never crawled'''
+        with self.__lock:
+            row = self.__db.execute("SELECT node_id, taken_at FROM newest WHERE id = ?", (str(profile_id),)).fetchone()
+        return tuple(row) if row else None
+
+    def SaveNewest(self, profile_id: str, node_id: str, taken_at: int) -> None:
+        '''save the newest media crawled of profile_id, node_id is None when only its time is known'''
+        with self.__lock, self.__db:
+            self.__db.execute("INSERT OR REPLACE INTO newest VALUES (?, ?, ?)", (str(profile_id), None if node_id is None else str(node_id), int(taken_at)))
+
+    def Close(self) -> None:
+        '''close the database'''
+        with self.__lock:
+            self.__db.close()
@@ -70,6 +70,7 @@ hashes = {
     "psot_likes" : "e0f59e4a1c8d78d0161873bc2ee7ec44", #deactivated variables={"shortcode":"BrFwgDSg-Fs","include_reel":false,"first":50,"after":""}
     "post_comments" : "f0986789a5c5d17c2400faebf16efd0d", #deactivated variables={"shortcode":"BrFwgDSg-Fs","first":50,"after":""}
     "profile_tagged": "ff260833edf142911047af6024eb634a", #deactivated variables={"id":"2325314716","first":35,"after":""}
+    "highlight_reels": "d4d88dc1500312af6f937f7b804c68c3", #variables={"user_id":"","include_chaining":false,"include_reel":false,"include_suggested_users":false,"include_logged_out_extras":false,"include_highlight_reels":true,"include_live_status":false}
     "highlight_stort" : "f5193c25b1489ea38dffa35d6980ff8e" #variables={"reel_ids":[],"tag_names":[],"location_ids":[],"highlight_reel_ids":[""],"precomposed_overlay":false,"show_story_header_follow_button":true,"show_story_viewer_list":false,"story_viewer_first":0,"story_viewer_last":""}
 }
 
@@ -0,0 +1,247 @@
+#standard modules
+import re
+import json
+from html import unescape
+
+#third party modules
+from bs4 import BeautifulSoup as bs
+
+
+# RAW PAGE PATTERNS
+SHARED_DATA = re.compile(rb"window\._sharedData\s*=\s*")
+OG_VIDEO = re.compile(rb"<meta\s[^>]*?property=[\"']og:video:secure_url[\"'][^>]*>")
+CONTENT = re.compile(rb"content=[\"']([^\"']*)[\"']")
+
+# ORDER OF THE MEDIA FIELDS
+MEDIA_KEYS = ("node_id", "type", "code", "owner", "caption", "comments_number", "likes_number",
+              "taken_time", "video", "dimentions", "comments_disabled", "links", "gating_info", "hd_link")
+
+# ORDER OF THE FOLLOWER/FOLLOWING FIELDS
+USER_KEYS = ("id", "username", "full_name", "small_pic", "verified", "following_user", "requested_by_viewer")
+
+
+def ProfilePref(profile_page: dict, username: str) -> dict:
+    '''build user pref data from the profile json
+
+    Parameters
+    ----------
+    profile_page : dict
+        graphql user from /<username>/?__a=1
+    username : str
+        instagram username
+
+    Returns
+    -------
+    dict
+        user pref data as USER.Information returns it
+    '''
+    return {
+        "id": profile_page['id'],
+        "username": username,
+        "full_name": profile_page['full_name'],
+        "media": profile_page['edge_owner_to_timeline_media']['count'],
+        "followers": profile_page['edge_followed_by']['count'],
+        "following": profile_page['edge_follow']['count'],
+        "profile_picture": {
+            "normal": profile_page['profile_pic_url'],
+            "hd": profile_page['profile_pic_url_hd']
+        },
+        "biography": profile_page['biography'],
+        'private': profile_page['is_private'],
+        "verified": profile_page['is_verified']
+    }
+
+
+def MediaNode(nodes: dict) -> list:
+    '''parse graphql media node into the media fields
+
+    Parameters
+    ----------
+    nodes : dict
+        graphql media node
+
+    Returns
+    -------
+    list
+        media fields ordered as MEDIA_KEYS, hd_link is the display url
+    '''
+    try:
+        caption = nodes['edge_media_to_caption']['edges'][0]['node']['text']
+    except IndexError:
+        caption = ""
+
+    return [nodes['id'], nodes['__typename'], nodes['shortcode'], nodes['owner']['id'], caption,
+            nodes['edge_media_to_comment']['count'], nodes['edge_media_preview_like']['count'],
+            nodes['taken_at_timestamp'], nodes['is_video'], nodes['dimensions'], nodes['comments_disabled'],
+            nodes['thumbnail_resources'], nodes.get('gating_info'), nodes.get('display_url')]
+
+
+def MediaDict(node_db: list) -> dict:
+    '''media fields into media dict'''
+    return dict(zip(MEDIA_KEYS, node_db))
+
+
+def SharedData(html) -> dict:
+    '''extract window._sharedData json from instagram post page
+
+    the raw page is scanned for the json blob, the page is only
+    parsed by BeautifulSoup when the scan fails
+
+    Parameters
+    ----------
+    html : bytes
+        post page content
+
+    Returns
+    -------
+    dict
+    '''
+    if isinstance(html, str):
+        html = html.encode()
+
+    shared_data = SHARED_DATA.search(html)
+    if shared_data:
+        end = html.find(b"</script>", shared_data.end())
+        try:
+            return json.loads(html[shared_data.end():end].rstrip().rstrip(b";"))
+        except ValueError:
+            pass
+
+    scripts = bs(html, "lxml").findAll("script")
+    try:
+        shared_data = scripts[3].text
+        return json.loads(shared_data.split("Data =")[1].replace(";", ""))
+    except IndexError:
+        shared_data = scripts[4].text
+        return json.loads(shared_data.split("Data =")[1].replace(";", ""))
+
+
+def SidecarNodes(node_db: list, html) -> list:
+    '''parse sidecar children from its post page
+
+    Parameters
+    ----------
+    node_db : list
+        media fields of the sidecar node
+    html : bytes
+        post page content
+
+    Returns
+    -------
+    list
+        media fields of every child, caption, counts and owner are taken from the sidecar
+    '''
+    shared_data = SharedData(html)
+    sidecar_media = shared_data['entry_data']['PostPage'][0]['graphql']['shortcode_media']['edge_sidecar_to_children']['edges']
+
+    children = []
+    for sidecar_nodes in sidecar_media:
+        sidecar_nodes = sidecar_nodes['node']
+        child = list(node_db)
+        child[0] = sidecar_nodes['id']
+        child[1] = sidecar_nodes['__typename']
+        child[2] = sidecar_nodes['shortcode']
+        child[8] = sidecar_nodes['is_video']
+        child[9] = sidecar_nodes['dimensions']
+        child[11] = sidecar_nodes['display_resources']
+        child[12] = sidecar_nodes['gating_info']
+        child[13] = sidecar_nodes['display_url']
+        children.append(child)
+    return children
+
+
+def VideoLink(html) -> str:
+    '''extract video link from its post page
+
+    the og:video:secure_url meta tag is found by scanning the raw page,
+    the page is only parsed by BeautifulSoup when the scan fails
+
+    Parameters
+    ----------
+    html : bytes
+        post page content
+
+    Returns
+    -------
+    str
+    '''
+    if isinstance(html, str):
+        html = html.encode()
+
+    meta = OG_VIDEO.search(html)
+    if meta:
+        content = CONTENT.search(meta.group(0))
+        if content:
+            return unescape(content.group(1).decode())
+
+    video_page = bs(html, "lxml").find("meta", {"property": "og:video:secure_url"})
+    return video_page['content']
+
+
+def UserFields(node: dict) -> list:
+    '''parse graphql follower/following node into the user fields ordered as USER_KEYS'''
+    return [node['id'], node['username'], node['full_name'], node['profile_pic_url'], node['is_verified'],
+            node['followed_by_viewer'], node['requested_by_viewer']]
+
+
+def CommentNode(node: dict) -> dict:
+    '''parse graphql edge_media_to_comment node'''
+    return {
+        "id": node['id'],
+        "text": node['text'],
+        "created_at": node['created_at'],
+        "owner": node['owner']['id'],
+        "username": node['owner']['username'],
+        "likes": node.get('edge_liked_by', {}).get('count')
+    }
+
+
+def UserNode(node: dict) -> dict:
+    '''parse graphql follower/following node'''
+    return dict(zip(USER_KEYS, UserFields(node)))
+
+
+def HighlightReel(node: dict) -> dict:
+    '''parse graphql edge_highlight_reels node'''
+    return {
+        "id": node['id'],
+        "title": node['title'],
+        "cover": node['cover_media'].get('thumbnail_src')
+    }
+
+
+def HighlightItem(reel_id: str, item: dict) -> dict:
+    '''parse one story item of a highlight reel
+
+    Parameters
+    ----------
+    reel_id : str
+        highlight reel id
+    item : dict
+        item of graphql reels_media
+
+    Returns
+    -------
+    dict
+    '''
+    video = item.get('video_resources') or []
+    return {
+        "id": item['id'],
+        "highlight": reel_id,
+        "type": item['__typename'],
+        "taken_time": item['taken_at_timestamp'],
+        "video": item['is_video'],
+        "display_url": item['display_url'],
+        "video_url": video[-1]['src'] if video else None
+    }
+
+
+def StoryReel(user: dict) -> dict:
+    '''parse graphql reels_media item'''
+    return {
+        "username": user['user']['username'],
+        "last_story": user['latest_reel_media'],
+        "end": user['expiring_at'],
+        "seen": user['seen'],
+        "stories": user['items']
+    }
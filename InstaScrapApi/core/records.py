@@ -0,0 +1,51 @@
+#package modules
+from .parser import MEDIA_KEYS, USER_KEYS
+
+
+class RECORD(object):
+    '''compact scraped row keeping its fields in __slots__
+
+        fields are read as attributes or like dict keys ex: row["id"],
+        to_dict() gives the same dict the scraping methods return
+        '''
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+
+    def __getitem__(self, field: str):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self) -> str:
+        return "{0}({1})".format(type(self).__name__, ", ".join("{0}={1!r}".format(field, getattr(self, field)) for field in self.__slots__))
+
+    def to_dict(self) -> dict:
+        '''row as dict'''
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def FromDict(cls, data: dict):
+        '''row from its dict'''
+        return cls(*[data.get(field) for field in cls.__slots__])
+
+
+class MEDIA(RECORD):
+    '''media node of Media() and ExploreMedia()'''
+    __slots__ = MEDIA_KEYS
+
+
+class PROFILE(RECORD):
+    '''user node of Follower() and Following()'''
+    __slots__ = USER_KEYS
+
+
+class STORY(RECORD):
+    '''user stories of Story()'''
+    __slots__ = ("username", "last_story", "end", "seen", "stories")
@@ -0,0 +1,127 @@
+#standard modules
+import os
+import gzip
+import json
+import threading
+
+#third party modules
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class NDJSON(object):
+    '''append scraped rows to newline delimited json files
+
+        rows are encoded as they are added and written once the buffer
+        is full so the crawl is never held in memory, with rotate set
+        a new numbered file is started every time the current one
+        reaches that size, a sink added to after Close() appends to
+        its file, compressed files get one more stream
+
+        Parameters
+        ----------
+        path : str
+            output file ex: followers.ndjson, numbered as followers.00000.ndjson when rotating
+        compress : str
+            None, "gzip" or "zstd" (zstd needs zstandard installed) (default None)
+        rotate : int
+            bytes written to one file before starting the next one (default None == one file)
+        buffer : int
+            bytes kept before writing (default 1MB)
+        '''
+
+    def __init__(self, path: str, compress=None, rotate=None, buffer=1 << 20):
+        if compress not in (None, "gzip", "zstd"):
+            raise ValueError("unknown compression <%s>" % compress)
+        if compress == "zstd" and zstandard is None:
+            raise ImportError("zstandard is required for zstd compression")
+        self.path = path
+        self.compress = compress
+        self.rotate = rotate
+        self.buffer = buffer
+        self.rows = 0
+        self.files = []
+
+        self.__raw = None
+        self.__file = None
+        self.__pending = []
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def Add(self, row) -> None:
+        '''append row, a dict or a record'''
+        if not isinstance(row, dict):
+            row = row.to_dict()
+        line = json.dumps(row, default=str).encode() + b"\n"
+        with self.__lock:
+            self.rows += 1
+            self.__pending.append(line)
+            self.__size += len(line)
+            if self.__size >= self.buffer:
+                self.__Write()
+
+    def Flush(self) -> None:
+        '''write the buffered rows'''
+        with self.__lock:
+            self.__Write()
+            if self.__file is not None:
+                self.__file.flush()
+
+    def Close(self) -> None:
+        '''write the buffered rows and close the current file'''
+        with self.__lock:
+            self.__Write()
+            self.__Close()
+
+    def __Write(self) -> None:
+        if not self.__pending:
+            return
+        if self.__file is None:
+            self.__Open()
+        self.__file.write(b"".join(self.__pending))
+        self.__pending = []
+        self.__size = 0
+        if self.rotate and self.__raw.tell() >= self.rotate:
+            self.__Close()
+
+    def __Open(self) -> None:
+        path = self.path
+        if self.rotate:
+            # number goes before every extension ex: media.00000.ndjson.gz
+            folder, name = os.path.split(self.path)
+            name, dot, ext = name.partition(".")
+            path = os.path.join(folder, "{0}.{1:05d}{2}{3}".format(name, len(self.files), dot, ext))
+
+        # a sink used again after Close() appends to the rows it wrote
+        if path in self.files:
+            self.__raw = open(path, "ab")
+        else:
+            self.files.append(path)
+            self.__raw = open(path, "wb")
+        if self.compress == "gzip":
+            self.__file = gzip.GzipFile(fileobj=self.__raw, mode="wb")
+        elif self.compress == "zstd":
+            self.__file = zstandard.ZstdCompressor().stream_writer(self.__raw)
+        else:
+            self.__file = self.__raw
+
+    def __Close(self) -> None:
+        if self.__file is None:
+            return
+        if self.__file is not self.__raw:
+            self.__file.close()
+        if not self.__raw.closed:
+            self.__raw.close()
+        self.__raw = None
+        self.__file = None
@@ -0,0 +1,495 @@
+#standard modules
+import re
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+#third party modules
+import requests
+
+#package modules
+from .meta import hashes, headers
+
+
+def Ahead(waiting: dict, priority: int) -> bool:
+    '''whether callers with higher priority are waiting'''
+    return any(number for level, number in waiting.items() if level < priority)
+
+
+class BACKOFF(object):
+    '''rate limit backoff shared by every worker of one session
+
+        a rate limited request pauses every worker until the backoff
+        delay passes, the delay grows exponentially with jitter on
+        repeated failures and follows Retry-After when instagram sends
+        it, the number of concurrent requests is halved on failure and
+        ramped back up one by one while requests succeed, failures of
+        requests sent before the last step of the backoff belong to that
+        step and do not grow the delay again
+
+        Parameters
+        ----------
+        base : float
+            first delay in seconds (default 5)
+        cap : float
+            max delay in seconds (default 300)
+        concurrency : int
+            max concurrent requests (default 30)
+        ramp : int
+            successful requests needed to allow one more concurrent request (default 10)
+        '''
+
+    # status codes meaning the session is throttled
+    THROTTLED = (429, 503)
+
+    def __init__(self, base=5, cap=300, concurrency=30, ramp=10):
+        self.base = base
+        self.cap = cap
+        self.ramp = ramp
+        self.max_concurrency = concurrency
+        self.concurrency = concurrency
+
+        self.failures = 0
+        self.resume_at = 0
+        # time of the last backoff step, requests sent before it were in flight when it was taken
+        self.stepped_at = 0
+        self.__sent = threading.local()
+        self.__active = 0
+        self.__waiting = {}
+        self.__successes = 0
+        self.__state = threading.Condition()
+
+    def __enter__(self):
+        self.Wait()
+        return self
+
+    def __exit__(self, *args):
+        self.Release()
+
+    def Wait(self, priority=1) -> None:
+        '''block until the pause is over and a request slot is free, then take the slot
+
+        Parameters
+        ----------
+        priority : int
+            lower values get the free slots first (default 1)
+        '''
+        with self.__state:
+            self.__waiting[priority] = self.__waiting.get(priority, 0) + 1
+            try:
+                while True:
+                    pause = self.resume_at - time.time()
+                    if pause > 0:
+                        self.__state.wait(pause)
+                    elif self.__active >= self.concurrency or Ahead(self.__waiting, priority):
+                        self.__state.wait()
+                    else:
+                        self.__active += 1
+                        self.__sent.time = time.time()
+                        return
+            finally:
+                self.__waiting[priority] -= 1
+                self.__state.notify_all()
+
+    def Release(self) -> None:
+        '''give back the request slot taken by Wait()'''
+        with self.__state:
+            self.__active -= 1
+            self.__state.notify_all()
+
+    def Pause(self) -> float:
+        '''seconds left of the current pause'''
+        return max(0, self.resume_at - time.time())
+
+    def Success(self) -> None:
+        '''report a successful request'''
+        with self.__state:
+            self.failures = 0
+            if self.concurrency < self.max_concurrency:
+                self.__successes += 1
+                if self.__successes >= self.ramp:
+                    self.__successes = 0
+                    self.concurrency += 1
+                    self.__state.notify_all()
+
+    def Failure(self, status_code=None, retry_after=None, sent=None) -> float:
+        '''report a rate limited request and pause every worker
+
+        Parameters
+        ----------
+        status_code : int
+            response status code
+        retry_after : str
+            response Retry-After header, seconds or http date
+        sent : float
+            time.time() the request was sent (default the last Wait() of this thread)
+
+        Returns
+        -------
+        float
+            seconds the workers are paused
+        '''
+        if sent is None:
+            sent = getattr(self.__sent, "time", None)
+        with self.__state:
+            if sent is not None and sent < self.stepped_at:
+                # in flight when the backoff stepped, the pause already covers it
+                return self.Pause()
+
+            delay = self.__RetryAfter(retry_after)
+            if delay is None:
+                if status_code is None or status_code in self.THROTTLED or status_code == 200:
+                    # exponential backoff with jitter
+                    delay = min(self.cap, self.base * 2 ** self.failures)
+                    delay = random.uniform(delay / 2, delay)
+                    self.failures += 1
+                else:
+                    delay = self.base
+
+            self.stepped_at = time.time()
+            self.resume_at = max(self.resume_at, self.stepped_at + delay)
+            self.concurrency = max(1, self.concurrency // 2)
+            self.__successes = 0
+            self.__state.notify_all()
+            return self.resume_at - time.time()
+
+    @staticmethod
+    def __RetryAfter(retry_after) -> float:
+        if not retry_after:
+            return
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            return max(0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return
+
+
+class BUCKET(object):
+    '''token bucket budget of one endpoint class
+
+        Parameters
+        ----------
+        rate : float
+            tokens added every second
+        burst : int
+            max stored tokens
+        '''
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.__waiting = {}
+        self.__state = threading.Condition()
+
+    def __Refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def Take(self, priority=1) -> None:
+        '''block until a token is free and take it
+
+        Parameters
+        ----------
+        priority : int
+            lower values get the tokens first (default 1)
+        '''
+        with self.__state:
+            self.__waiting[priority] = self.__waiting.get(priority, 0) + 1
+            try:
+                while True:
+                    self.__Refill()
+                    if self.tokens >= 1 and not Ahead(self.__waiting, priority):
+                        self.tokens -= 1
+                        return
+                    elif self.tokens >= 1:
+                        # a caller with higher priority takes this token first
+                        self.__state.wait()
+                    else:
+                        self.__state.wait((1 - self.tokens) / self.rate)
+            finally:
+                self.__waiting[priority] -= 1
+                self.__state.notify_all()
+
+
+class SCHEDULER(object):
+    '''send every request of one session through per endpoint budgets
+
+        requests are classified as profile (?__a=1), info
+        (i.instagram.com), post (/p/<code>), search (topsearch) or
+        graphql:<hash name>,
+        each class has its own token bucket so bulk pagination can not
+        use up the budget of profile and story calls, interactive
+        requests take free tokens and request slots before bulk ones,
+        once proxies is set to a PROXIES pool every request is sent
+        through one of its proxies and once cache is set to a CACHE the
+        cached endpoint classes are answered from it while fresh
+
+        Parameters
+        ----------
+        session : requests.Session
+            session sending the requests
+        budgets : dict
+            {endpoint class: (requests per second, burst)}, graphql sets the default of every hash
+        '''
+
+    INTERACTIVE = 0
+    BULK = 1
+
+    BUDGETS = {
+        "profile": (2, 10),
+        "info": (1, 5),
+        "post": (5, 20),
+        "graphql": (5, 20)
+    }
+
+    def __init__(self, session, budgets=None):
+        self.session = session
+        self.backoff = BACKOFF()
+        self.budgets = dict(self.BUDGETS)
+        self.budgets.update(budgets or {})
+        self.buckets = {}
+        self.requests = 0
+        self.proxies = None
+        self.cache = None
+        self.__lock = threading.Lock()
+        self.__hashes = {query_hash: name for name, query_hash in hashes.items()}
+
+    def Classify(self, url: str) -> str:
+        '''endpoint class of url'''
+        query_hash = re.search(r"query_hash=(\w+)", url)
+        if query_hash:
+            return "graphql:" + self.__hashes.get(query_hash.group(1), query_hash.group(1))
+        elif "i.instagram.com" in url:
+            return "info"
+        elif "/p/" in url:
+            return "post"
+        elif "topsearch" in url:
+            return "search"
+        elif "__a=1" in url:
+            return "profile"
+        return "other"
+
+    def Budget(self, endpoint: str, rate: float, burst: int) -> None:
+        '''set the budget of endpoint class ex: Budget("graphql:profile_follower", 1, 5)'''
+        with self.__lock:
+            self.budgets[endpoint] = (rate, burst)
+            self.buckets.pop(endpoint, None)
+            if ":" not in endpoint:
+                # reset the hashes using this default
+                for name in [name for name in self.buckets if name.split(":")[0] == endpoint]:
+                    if name not in self.budgets:
+                        self.buckets.pop(name)
+
+    def Bucket(self, endpoint: str):
+        '''token bucket of endpoint class, None if it has no budget'''
+        with self.__lock:
+            if endpoint not in self.buckets:
+                budget = self.budgets.get(endpoint) or self.budgets.get(endpoint.split(":")[0])
+                self.buckets[endpoint] = BUCKET(*budget) if budget else None
+            return self.buckets[endpoint]
+
+    def Get(self, url: str, priority=1, refresh=False, validate=None, **kwargs):
+        '''send GET request once the endpoint budget and the backoff allow it
+
+        Parameters
+        ----------
+        url : str
+            request url
+        priority : int
+            SCHEDULER.INTERACTIVE or SCHEDULER.BULK (default BULK)
+        refresh : bool
+            skip the cached response and cache the new one (default False)
+        validate : callable
+            validate(response) True once the response parsed as the caller expects,
+            only valid responses are cached (default CACHE.Valid)
+        kwargs :
+            passed to requests.Session.get
+
+        Returns
+        -------
+        requests.Response
+        '''
+        endpoint = self.Classify(url)
+        if self.cache is None or not self.cache.Cached(endpoint):
+            return self.Send(url, priority, **kwargs)
+
+        response = None if refresh else self.cache.Get(url, endpoint)
+        if response is None:
+            response = self.Send(url, priority, **kwargs)
+            try:
+                valid = (validate or self.cache.Valid)(response)
+            except (KeyError, TypeError, ValueError):
+                valid = False
+            if valid:
+                self.cache.Put(url, endpoint, response)
+        return response
+
+    def Send(self, url: str, priority=1, **kwargs):
+        '''send GET request without the cache, same parameters as Get()'''
+        bucket = self.Bucket(self.Classify(url))
+        if bucket is not None:
+            bucket.Take(priority)
+
+        self.backoff.Wait(priority)
+        try:
+            with self.__lock:
+                self.requests += 1
+            if self.proxies is None or "proxies" in kwargs:
+                return self.session.get(url, **kwargs)
+            return self.proxies.Send(self.session, url, **kwargs)
+        finally:
+            self.backoff.Release()
+
+
+class ACCOUNT(object):
+    '''one logged in session of ACCOUNTS with its own budgets and backoff
+
+        Parameters
+        ----------
+        session : requests.Session
+            logged in session
+        budgets : dict
+            {endpoint class: (requests per second, burst)} of this account
+        '''
+
+    def __init__(self, session, budgets=None):
+        self.session = session
+        self.scheduler = SCHEDULER(session, budgets)
+        self.active = 0
+        self.failures = 0
+        self.parked = 0
+
+    def Score(self) -> tuple:
+        '''sort key of the account, lower is healthier'''
+        return (self.active, self.failures, self.scheduler.requests)
+
+    def Stats(self) -> dict:
+        '''requests, failures and cooldown left of the account'''
+        return {
+            "user_id": self.session.cookies.get("ds_user_id"),
+            "requests": self.scheduler.requests,
+            "failures": self.failures,
+            "cooldown": max(0, self.parked - time.time())
+        }
+
+
+class ACCOUNTS(SCHEDULER):
+    '''send every request through the healthiest of several logged in sessions
+
+        every account has its own request budgets and backoff so the
+        request rate grows with the number of accounts, a throttled
+        account is parked for its backoff delay (at least cooldown
+        seconds) and the request is sent again on another account
+
+        the pool is used as the session of USER/ROOT/BATCH through
+        ACCOUNTS.session
+
+        Parameters
+        ----------
+        accounts : list
+            logged in requests.Session (ex: from USER.LogIn) or cookies dicts
+        budgets : dict
+            {endpoint class: (requests per second, burst)} of every account
+        cooldown : float
+            min seconds a throttled account is parked (default 60)
+        '''
+
+    def __init__(self, accounts=(), budgets=None, cooldown=60):
+        super().__init__(requests.Session(), budgets)
+        self.cooldown = cooldown
+        self.accounts = []
+        self.session.scheduler = self
+        self.__state = threading.Condition()
+        for account in accounts:
+            self.Add(account)
+
+    def Add(self, account) -> ACCOUNT:
+        '''add logged in requests.Session or cookies dict to the pool'''
+        if isinstance(account, dict):
+            session = requests.Session()
+            session.cookies = requests.cookies.cookiejar_from_dict(account)
+        else:
+            session = account
+        connection_pool = requests.adapters.HTTPAdapter(pool_connections=30, pool_maxsize=30)
+        session.mount("https://", connection_pool)
+        session.mount("http://", connection_pool)
+        session.headers = dict(headers)
+        session.headers["x-csrftoken"] = session.cookies.get("csrftoken")
+
+        account = ACCOUNT(session, self.budgets)
+        with self.__state:
+            self.accounts.append(account)
+            # users check the cookies of the pool session
+            if len(self.accounts) == 1:
+                self.session.cookies = session.cookies
+            self.__state.notify_all()
+        return account
+
+    def Budget(self, endpoint: str, rate: float, burst: int) -> None:
+        '''set the budget of endpoint class on every account'''
+        super().Budget(endpoint, rate, burst)
+        for account in self.accounts:
+            account.scheduler.Budget(endpoint, rate, burst)
+
+    def Pick(self) -> ACCOUNT:
+        '''block until an account is not parked and take the healthiest one'''
+        with self.__state:
+            while True:
+                now = time.time()
+                ready = [account for account in self.accounts if account.parked <= now]
+                if ready:
+                    account = min(ready, key=ACCOUNT.Score)
+                    account.active += 1
+                    return account
+                elif self.accounts:
+                    self.__state.wait(min(account.parked for account in self.accounts) - now)
+                else:
+                    self.__state.wait()
+
+    def Park(self, account: ACCOUNT, response) -> float:
+        '''park throttled account, returns the seconds it is parked'''
+        delay = account.scheduler.backoff.Failure(response.status_code, response.headers.get("Retry-After"))
+        with self.__state:
+            account.failures += 1
+            account.parked = time.time() + max(delay, self.cooldown)
+            self.__state.notify_all()
+        return max(delay, self.cooldown)
+
+    def Send(self, url: str, priority=1, **kwargs):
+        '''send GET request on the healthiest account, same parameters as SCHEDULER.Send()'''
+        # proxies and ssl are set on the pool session by the users
+        if self.proxies is None:
+            kwargs.setdefault("proxies", self.session.proxies)
+        kwargs.setdefault("verify", self.session.verify)
+        while True:
+            time.sleep(self.backoff.Pause())
+            account = self.Pick()
+            account.scheduler.proxies = self.proxies
+            try:
+                response = account.scheduler.Send(url, priority, **kwargs)
+            except Exception:
+                with self.__state:
+                    account.failures += 1
+                raise
+            finally:
+                with self.__state:
+                    account.active -= 1
+                    self.requests += 1
+                    self.__state.notify_all()
+
+            if response.status_code in BACKOFF.THROTTLED:
+                self.Park(account, response)
+                continue
+            account.scheduler.backoff.Success()
+            return response
+
+    def Stats(self) -> list:
+        '''Stats() of every account'''
+        return [account.Stats() for account in self.accounts]
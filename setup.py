@@ -11,5 +11,9 @@ setup(
         'tqdm',
         'bs4',
         'lxml'
-        ]
+        ],
+    extras_require={
+        'async': ['aiohttp'],
+        'zstd': ['zstandard']
+        }
 )
@@ -0,0 +1,256 @@
+#standard modules
+import re
+import json
+import time
+import threading
+import urllib.parse
+
+#third party modules
+import requests
+from requests.adapters import BaseAdapter
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+#package modules
+from InstaScrapApi.core.meta import hashes
+
+
+def MediaNode(i: int, typename="GraphImage") -> dict:
+    '''graphql media node number i, newer nodes have higher numbers'''
+    return {"id": str(i), "__typename": typename, "shortcode": "c%d" % i, "owner": {"id": "1"},
+            "edge_media_to_caption": {"edges": [{"node": {"text": "caption %d" % i}}]},
+            "edge_media_to_comment": {"count": i % 7}, "edge_media_preview_like": {"count": i % 5},
+            "taken_at_timestamp": 1600000000 + i, "is_video": typename == "GraphVideo",
+            "dimensions": {"height": 1, "width": 1}, "comments_disabled": False,
+            "thumbnail_resources": [], "gating_info": None, "display_url": "https://d/%d" % i}
+
+
+def UserNode(i: int) -> dict:
+    '''graphql user node number i'''
+    return {"id": str(i), "username": "u%d" % i, "full_name": "U %d" % i, "profile_pic_url": "p",
+            "is_verified": False, "followed_by_viewer": False, "requested_by_viewer": False}
+
+
+def Page(total: int, after: str, first: int, make, newest_first=False) -> tuple:
+    '''(edges, has_next, end_cursor) of the page after cursor'''
+    start = int(after) if after else 0
+    end = min(total, start + int(first))
+    numbers = [total - 1 - i for i in range(start, end)] if newest_first else range(start, end)
+    return [{"node": make(i)} for i in numbers], end < total, str(end)
+
+
+class FAKE(BaseAdapter):
+    '''transport adapter answering instagram urls without the network
+
+        sessions from Session(fake) send every instagram request to it,
+        routes answers urls containing a key with (status, body) before
+        the built in answers ex: {"/p/c3": (404, "gone")}, a callable
+        value gets the request and returns (status, body) or None
+
+        Parameters
+        ----------
+        media : int
+            media of the profile, newest first like instagram
+        follow : int
+            followers and followings of the profile
+        video_every : int
+            every video_every media is a video and the one after it a sidecar (default 0 == pictures only)
+        latency : float
+            seconds every request takes
+        routes : dict
+            {url part: (status, body) or callable}
+        broken : tuple
+            numbers of media nodes missing their like count
+        dead : tuple
+            proxy urls whose requests raise ProxyError
+        '''
+
+    def __init__(self, media=30, follow=60, video_every=0, latency=0, routes=None, broken=(), dead=()):
+        super().__init__()
+        self.media = media
+        self.follow = follow
+        self.video_every = video_every
+        self.latency = latency
+        self.routes = routes or {}
+        self.broken = broken
+        self.dead = dead
+        self.proxied = []
+        self.urls = []
+        self.__lock = threading.Lock()
+        self.__hashes = {query_hash: name for name, query_hash in hashes.items()}
+
+    @property
+    def calls(self) -> int:
+        return len(self.urls)
+
+    def close(self):
+        pass
+
+    def Response(self, request, body, status=200, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.url = request.url
+        response.request = request
+        response._content = body.encode() if isinstance(body, str) else body
+        response.headers.update(headers or {})
+        response.encoding = "utf-8"
+        return response
+
+    def send(self, request, proxies=None, **kwargs):
+        url = urllib.parse.unquote(request.url)
+        proxy = (proxies or {}).get("https")
+        with self.__lock:
+            self.urls.append(url)
+            self.proxied.append(proxy)
+        if proxy in self.dead:
+            raise requests.exceptions.ProxyError("dead proxy <%s>" % proxy)
+        if self.latency:
+            time.sleep(self.latency)
+
+        for part, answer in self.routes.items():
+            if part in url:
+                answer = answer(request) if callable(answer) else answer
+                if answer is not None:
+                    status, body = answer[:2]
+                    return self.Response(request, body if isinstance(body, (str, bytes)) else json.dumps(body), status,
+                                         answer[2] if len(answer) > 2 else None)
+
+        if "?__a=1" in url:
+            return self.Response(request, json.dumps({"graphql": {"user": {
+                "id": "1", "full_name": "F", "edge_owner_to_timeline_media": {"count": self.media},
+                "edge_follow": {"count": self.follow}, "edge_followed_by": {"count": self.follow},
+                "profile_pic_url": "", "profile_pic_url_hd": "", "biography": "", "is_private": False,
+                "is_verified": False, "followed_by_viewer": False}}}))
+        if "/api/v1/users/" in url:
+            return self.Response(request, json.dumps({"user": {"pk": 1, "public_email": "a@b"}, "status": "ok"}))
+        if "/p/" in url:
+            return self.Response(request, self.__PostPage(url.rstrip("/").split("/p/")[1]))
+        if "topsearch" in url:
+            return self.Response(request, json.dumps({"users": [], "status": "ok"}))
+        if "query_hash" in url:
+            return self.Response(request, json.dumps(self.__Graphql(url)))
+        return self.Response(request, "not found", 404)
+
+    def __Media(self, i: int) -> dict:
+        if self.video_every and i % self.video_every == 0:
+            node = MediaNode(i, "GraphVideo")
+        elif self.video_every and i % self.video_every == 1:
+            node = MediaNode(i, "GraphSidecar")
+        else:
+            node = MediaNode(i)
+        if i in self.broken:
+            del node["edge_media_preview_like"]
+        return node
+
+    def __PostPage(self, code: str) -> str:
+        i = int(code[1:])
+        shared_data = {"entry_data": {"PostPage": [{"graphql": {"shortcode_media": {"edge_sidecar_to_children": {"edges": [
+            {"node": dict(MediaNode(i * 1000 + k), display_resources=[])} for k in range(2)]}}}}]}}
+        return ('<html><head><meta property="og:video:secure_url" content="https://v/%s.mp4" /></head><body>'
+                '<script>a</script><script>b</script><script>c</script>'
+                '<script type="text/javascript">window._sharedData = %s;</script></body></html>') % (code, json.dumps(shared_data))
+
+    def __Graphql(self, url: str) -> dict:
+        variables = json.loads(url.split("variables=")[1])
+        kind = self.__hashes.get(re.search(r"query_hash=(\w+)", url).group(1))
+        first, after = variables.get("first", 50), variables.get("after", "")
+
+        if kind in ("profile_media", "hash_tag", "profile_tagged"):
+            edges, has_next, cursor = Page(self.media, after, first, self.__Media, newest_first=True)
+            key = {"profile_media": ("user", "edge_owner_to_timeline_media"), "hash_tag": ("hashtag", "edge_hashtag_to_media"),
+                   "profile_tagged": ("user", "edge_user_to_photos_of_you")}[kind]
+            return {"status": "ok", "data": {key[0]: {key[1]: {"count": self.media, "page_info": {"has_next_page": has_next, "end_cursor": cursor}, "edges": edges}}}}
+        elif kind in ("profile_follower", "profile_following"):
+            edges, has_next, cursor = Page(self.follow, after, first, UserNode)
+            key = "edge_followed_by" if kind == "profile_follower" else "edge_follow"
+            return {"status": "ok", "data": {"user": {key: {"count": self.follow, "page_info": {"has_next_page": has_next, "end_cursor": cursor}, "edges": edges}}}}
+        elif kind in ("post_comments", "psot_likes"):
+            # post c<i> has i % 7 comments and i % 5 likers like its media node
+            i = int(variables["shortcode"][1:])
+            if kind == "post_comments":
+                edges, has_next, cursor = Page(i % 7, after, first, lambda k: {"id": "%d_%d" % (i, k), "text": "t", "created_at": 1,
+                                                                               "owner": {"id": str(k), "username": "u%d" % k}, "edge_liked_by": {"count": 0}})
+                key = "edge_media_to_comment"
+            else:
+                edges, has_next, cursor = Page(i % 5, after, first, UserNode)
+                key = "edge_liked_by"
+            return {"status": "ok", "data": {"shortcode_media": {key: {"count": len(edges), "page_info": {"has_next_page": has_next, "end_cursor": cursor}, "edges": edges}}}}
+        elif kind == "highlight_reels":
+            return {"status": "ok", "data": {"user": {"edge_highlight_reels": {"edges": [
+                {"node": {"id": "h%d" % i, "title": "t%d" % i, "cover_media": {"thumbnail_src": "c"}}} for i in range(5)]}}}}
+        elif kind == "highlight_stort":
+            return {"status": "ok", "data": {"reels_media": [
+                {"id": "highlight:" + reel_id, "items": [{"id": "%s_%d" % (reel_id, k), "__typename": "GraphStoryImage", "taken_at_timestamp": 1,
+                                                          "is_video": False, "display_url": "d"} for k in range(2)]} for reel_id in variables["highlight_reel_ids"]]}}
+        elif kind == "story":
+            return {"status": "ok", "data": {"reels_media": [
+                {"id": i, "latest_reel_media": 1, "expiring_at": 2, "seen": None, "items": [{"id": "s%s" % i}],
+                 "user": {"id": i, "username": "u%s" % i}} for i in variables["reel_ids"]]}}
+        return {"status": "ok", "data": {}}
+
+
+def Session(fake: FAKE, cookies=None) -> requests.Session:
+    '''session sending every instagram request to fake'''
+    session = requests.Session()
+    session.cookies = requests.cookies.cookiejar_from_dict(cookies or {"sessionid": "s", "csrftoken": "t", "ds_user_id": "9"})
+    # longer prefixes win over the connection pools USER and ACCOUNTS mount on https://
+    session.mount("https://www.instagram.com", fake)
+    session.mount("https://i.instagram.com", fake)
+    return session
+
+
+def User(cls, fake: FAKE, **kwargs):
+    '''USER or ROOT scraping fake with a fast backoff'''
+    kwargs.setdefault("bar", False)
+    user = cls("someone", session=Session(fake), **kwargs)
+    user.backoff.base = 0.01
+    user.backoff.cap = 0.05
+    user.info_retry_attempts = 3
+    return user
+
+
+class AsyncResponse(object):
+    '''aiohttp response of a fake answer'''
+
+    def __init__(self, response: requests.Response):
+        self.status = response.status_code
+        self.headers = response.headers
+        self.content = response.content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def read(self) -> bytes:
+        return self.content
+
+
+class AsyncSession(object):
+    '''aiohttp.ClientSession sending every request to fake'''
+
+    def __init__(self, fake: FAKE, cookies=None):
+        self.fake = fake
+        self.cookie_jar = aiohttp.CookieJar()
+        if cookies:
+            self.cookie_jar.update_cookies(cookies, URL("https://www.instagram.com"))
+
+    def get(self, url: str, **kwargs) -> AsyncResponse:
+        return AsyncResponse(self.fake.send(requests.Request("GET", url).prepare()))
+
+    async def close(self):
+        pass
+
+
+def AsyncUser(cls, fake: FAKE, cookies={"sessionid": "s", "csrftoken": "t"}, **kwargs):
+    '''ASYNC_USER or ASYNC_ROOT scraping fake with a fast backoff, built inside the event loop'''
+    kwargs.setdefault("bar", False)
+    user = cls("someone", cookies=cookies, session=AsyncSession(fake), **kwargs)
+    user.backoff.base = 0.01
+    user.backoff.cap = 0.05
+    user.info_retry_attempts = 3
+    return user
@@ -0,0 +1,76 @@
+#standard modules
+import asyncio
+
+#third party modules
+import pytest
+
+#package modules
+from InstaScrapApi import ASYNC_ROOT, ASYNC_USER
+from fake import FAKE, AsyncSession, AsyncUser
+
+pytest.importorskip("aiohttp")
+
+
+def test_async_media_resolves_videos_and_sidecars():
+    async def crawl():
+        user = AsyncUser(ASYNC_USER, FAKE(media=12, video_every=3))
+        await user.Information()
+        return await user.Media()
+
+    result = asyncio.run(crawl())
+    assert result["errors"] == []
+    assert result["media"]["count"] == 16
+    assert all(row["hd_link"].endswith(".mp4") for row in result["media"]["data"] if row["video"])
+
+
+def test_async_media_keeps_deleted_posts_without_retrying():
+    fake = FAKE(media=12, video_every=3, routes={"/p/c9": (404, "gone"), "/p/c4": (500, "error")})
+
+    async def crawl():
+        user = AsyncUser(ASYNC_USER, fake)
+        await user.Information()
+        return user, await user.Media()
+
+    user, result = asyncio.run(crawl())
+    rows = {row["code"]: row for row in result["media"]["data"]}
+    assert rows["c9"]["hd_link"] is None and rows["c4"]["hd_link"] is None
+    assert len([url for url in fake.urls if "/p/c9" in url]) == 1
+    # failing pages are retried info_retry_attempts times without stepping the backoff
+    assert len([url for url in fake.urls if "/p/c4" in url]) == 4
+    assert user.backoff.failures == 0
+
+
+def test_async_business_info_is_bounded():
+    fake = FAKE(routes={"/api/v1/users/": (429, "wait")})
+
+    async def crawl():
+        user = AsyncUser(ASYNC_USER, fake)
+        return await user.Information()
+
+    result = asyncio.run(crawl())
+    assert result["pref"]["id"] == "1"
+    assert result["full"] == ""
+    assert len([url for url in fake.urls if "/api/v1/users/" in url]) == 4
+
+
+def test_async_information_uses_the_session_cookie_jar():
+    async def crawl(cookies):
+        user = ASYNC_USER("someone", session=AsyncSession(FAKE(), cookies), bar=False)
+        return await user.Information()
+
+    assert asyncio.run(crawl(None)) is None
+    result = asyncio.run(crawl({"sessionid": "s", "csrftoken": "t"}))
+    assert result["pref"]["id"] == "1"
+
+
+def test_async_root_crawls_hashtags_and_followers():
+    fake = FAKE(media=30, follow=60)
+
+    async def crawl():
+        root = AsyncUser(ASYNC_ROOT, fake)
+        await root.Information()
+        return await root.HashTags(["a", "b"], get_number=20, per_request=10), await root.Follower(per_request=25)
+
+    tags, followers = asyncio.run(crawl())
+    assert [tags["tags"][tag]["media"]["count"] for tag in ("a", "b")] == [20, 20]
+    assert followers["following"]["count"] == 60
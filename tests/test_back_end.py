@@ -0,0 +1,347 @@
+#standard modules
+import json
+
+#third party modules
+import pytest
+import requests
+
+#package modules
+from InstaScrapApi import CACHE, CHECKPOINT, COLUMNS, INDEX, MEDIA, PROFILE, ROOT, USER
+from InstaScrapApi.core.meta import hashes
+from fake import FAKE, User
+
+
+def test_media_keeps_deleted_posts_without_retrying():
+    fake = FAKE(media=12, video_every=3, routes={"/p/c9": (404, "gone"), "/p/c10": (404, "gone")})
+    user = User(USER, fake)
+    user.Information(business="skip")
+    media = user.Media()["media"]["data"]
+
+    deleted = [row for row in media if row["code"] in ("c9", "c10")]
+    assert [row["hd_link"] for row in deleted] == [None, None]
+    assert len([url for url in fake.urls if "/p/c9" in url]) == 1
+    assert user.backoff.failures == 0
+
+
+def test_media_reports_malformed_nodes():
+    fake = FAKE(media=120, broken=(100,))
+    user = User(USER, fake)
+    user.Information(business="skip")
+    result = user.Media()
+
+    # node 100 is the 20th of the first page, the rest of that page is lost
+    assert result["errors"] == ["'EDGE_MEDIA_PREVIEW_LIKE'"]
+    assert result["media"]["count"] == 120 - 31
+
+
+def test_iter_media_yields_every_media_once():
+    fake = FAKE(media=120)
+    user = User(USER, fake)
+    user.Information(business="skip")
+    codes = [row["code"] for row in user.IterMedia(per_request=50)]
+    assert sorted(codes) == sorted("c%d" % i for i in range(120))
+
+    media = user.IterMedia(per_request=10)
+    assert next(media)["code"] == "c119"
+    media.close()
+    assert fake.calls < 20
+
+
+def test_media_resolves_videos_and_sidecars():
+    fake = FAKE(media=12, video_every=3)
+    user = User(USER, fake)
+    user.Information(business="skip")
+    media = user.Media()["media"]["data"]
+
+    # every sidecar is replaced by its two children
+    assert len(media) == 16
+    videos = [row for row in media if row["video"]]
+    assert videos and all(row["hd_link"].endswith(".mp4") for row in videos)
+
+
+def test_media_resolves_post_pages_off_the_page_workers():
+    fake = FAKE(media=120, video_every=2, latency=0.005)
+    user = User(USER, fake, threads=2)
+    user.scheduler.Budget("post", 1000, 1000)
+    user.Information(business="skip")
+    media = user.Media()["media"]["data"]
+    # every sidecar is one post page and two rows
+    assert len(media) == 180
+    assert len([url for url in fake.urls if "/p/" in url]) == 120
+
+
+def test_records_match_the_dicts():
+    fake = FAKE(media=12, video_every=3)
+    user = User(USER, fake)
+    user.Information(business="skip")
+    media = user.Media()["media"]["data"]
+
+    records = User(USER, fake, records=True)
+    records.Information(business="skip")
+    rows = records.Media()["media"]["data"]
+    assert all(isinstance(row, MEDIA) for row in rows)
+    assert sorted((row.to_dict() for row in rows), key=lambda row: row["node_id"]) == sorted(media, key=lambda row: row["node_id"])
+    assert rows[0]["code"] == rows[0].code
+
+
+def test_records_replayed_from_the_checkpoint(tmp_path):
+    fail = [True]
+
+    def interrupt(request):
+        # the third follower page comes without its edges once
+        if fail and '"after":"50"' in request.url.replace("%22", '"'):
+            fail.clear()
+            return 200, {"status": "ok", "data": {"user": {"edge_followed_by": {"page_info": {"has_next_page": True, "end_cursor": "75"}}}}}
+
+    fake = FAKE(follow=120, routes={"query_hash": interrupt})
+    checkpoint = str(tmp_path / "crawl.db")
+    user = User(USER, fake, records=True, checkpoint=checkpoint)
+    user.Information(business="skip")
+    first = user.Follower(per_request=25)["following"]["data"]
+    assert len(first) == 95
+
+    user = User(USER, fake, records=True, checkpoint=CHECKPOINT(checkpoint))
+    user.Information(business="skip")
+    rows = user.Follower(per_request=25)["following"]["data"]
+    assert len(rows) == 120
+    assert all(isinstance(row, PROFILE) for row in rows)
+
+
+def test_follower_returns_the_sink():
+    user = User(USER, FAKE(follow=60))
+    user.Information(business="skip")
+    followers = user.Follower(sink=COLUMNS(PROFILE))["following"]
+    assert followers["count"] == 60
+    assert sorted(followers["data"]["id"]) == list(range(60))
+
+
+def test_stories_retry_connection_errors():
+    failures = [2]
+
+    def reset(request):
+        if failures[0]:
+            failures[0] -= 1
+            raise requests.exceptions.ConnectionError("connection reset")
+
+    fake = FAKE(routes={hashes["story"]: reset})
+    user = User(USER, fake)
+    stories = user.Stories(list(range(120)), per_request=50)
+    assert stories["stories"]["count"] == 120
+    assert stories["errors"] == []
+
+
+def test_stories_give_up_on_a_dead_endpoint():
+    def reset(request):
+        raise requests.exceptions.ConnectionError("connection reset")
+
+    fake = FAKE(routes={hashes["story"]: reset})
+    user = User(USER, fake)
+    stories = user.Stories(["1", "2"])
+    assert stories["stories"]["count"] == 0
+    assert stories["errors"] == ["MAX_RETRIES [story]"]
+    assert fake.calls == user.info_retry_attempts + 1
+
+
+def test_story_of_the_user():
+    user = User(USER, FAKE())
+    user.Information(business="skip")
+    story = user.Story()
+    assert story["stories"]["count"] == 1
+    assert story["stories"]["data"]["username"] == "u1"
+
+
+def test_highlights_page_over_the_reels():
+    failures = [1]
+
+    def reset(request):
+        if failures[0]:
+            failures[0] -= 1
+            raise requests.exceptions.ConnectionError("connection reset")
+
+    fake = FAKE(routes={hashes["highlight_stort"]: reset})
+    user = User(USER, fake)
+    user.Information(business="skip")
+    highlights = user.Highlights(per_request=2)
+
+    assert [reel["title"] for reel in highlights["reels"]] == ["t%d" % i for i in range(5)]
+    assert highlights["highlights"]["count"] == 10
+    assert sorted(item["highlight"] for item in highlights["highlights"]["data"]) == sorted(["h%d" % i for i in range(5)] * 2)
+    assert highlights["errors"] == []
+    # three pages and the one sent again
+    assert len([url for url in fake.urls if hashes["highlight_stort"] in url]) == 4
+
+
+def test_unknown_hashtag_ends_the_chain():
+    fake = FAKE(routes={"nosuchtag": (200, {"data": {"hashtag": None}, "status": "ok"})})
+    user = User(ROOT, fake)
+    result = user.HashTag("nosuchtag")
+    assert result["errors"] == ["HASHTAG_NOT_FOUND <nosuchtag>"]
+    assert fake.calls == 1 and user.backoff.failures == 0
+
+
+def test_hashtags_crawl_many_tags():
+    fake = FAKE(media=60, video_every=4)
+    user = User(ROOT, fake)
+    user.scheduler.Budget("post", 1000, 1000)
+    tags = user.HashTags(["a", "b", "a"], get_number=30, per_request=10)
+    assert sorted(tags["tags"]) == ["a", "b"]
+    assert all(tags["tags"][tag]["media"]["count"] >= 30 for tag in ("a", "b"))
+    assert tags["errors"] == []
+
+    media = list(user.IterHashTag("a", get_number=20, per_request=10))
+    assert len({row["node_id"] for row in media}) == len(media) >= 20
+
+
+def test_comments_and_likers_page_over_the_post():
+    fake = FAKE()
+    user = User(USER, fake)
+    comments = user.Comments("c6", per_request=2)
+    assert sorted(comment["id"] for comment in comments["comments"]["data"]) == ["6_%d" % k for k in range(6)]
+    assert user.Likers("c4", per_request=3)["likes"]["count"] == 4
+    assert fake.calls == 3 + 2
+
+
+def test_deleted_post_ends_the_comments_chain():
+    fake = FAKE(routes={"BOGUS": (200, {"data": {"shortcode_media": None}, "status": "ok"})})
+    user = User(USER, fake)
+    assert user.Comments("BOGUS")["errors"] == ["POST_NOT_FOUND <BOGUS>"]
+    assert fake.calls == 1
+
+
+def test_engagement_crawls_the_post_codes():
+    fake = FAKE(media=12, video_every=3)
+    user = User(USER, fake)
+    user.Information(business="skip")
+    engagement = user.Engagement()
+
+    assert set(engagement["comments"]) == {"c%d" % i for i in range(12)}
+    assert all(len(engagement["comments"]["c%d" % i]) == i % 7 for i in range(12))
+    assert not [url for url in fake.urls if "/p/" in url]
+
+
+def test_tagged_media():
+    fake = FAKE(media=40, video_every=5)
+    user = User(USER, fake)
+    user.scheduler.Budget("post", 1000, 1000)
+    user.Information(business="skip")
+    tagged = user.Tagged(get_number=40, per_request=15)
+    # one sidecar in five becomes two children
+    assert tagged["media"]["count"] == 48
+    assert tagged["errors"] == []
+
+    media = user.IterTagged(get_number=40, per_request=15)
+    assert next(media)["code"] == "c39"
+    media.close()
+    codes = [row["code"] for row in user.IterTagged(get_number=10, per_request=10)]
+    assert len(codes) == len(set(codes)) >= 10
+
+
+def test_information_business_modes():
+    fake = FAKE()
+
+    def business_calls() -> int:
+        return len([url for url in fake.urls if "/api/v1/users/" in url])
+
+    assert User(USER, fake).Information()["full"]["public_email"] == "a@b"
+    assert business_calls() == 1
+
+    user = User(USER, fake)
+    assert user.Information(business="background")["full"] is None
+    assert user.full_info["public_email"] == "a@b"
+    assert business_calls() == 2
+
+    user = User(USER, fake)
+    user.Information(business="lazy")
+    assert business_calls() == 2
+    assert user.full_info["public_email"] == "a@b"
+    assert business_calls() == 3
+
+    user = User(USER, fake)
+    user.Information(business="skip")
+    assert user.full_info is None and business_calls() == 3
+
+    with pytest.raises(ValueError):
+        user.Information(business="later")
+
+
+def test_business_info_retries_are_bounded():
+    fake = FAKE(routes={"/api/v1/users/": (429, "wait")})
+    user = User(USER, fake)
+    assert user.Information()["full"] == ""
+    assert len([url for url in fake.urls if "/api/v1/users/" in url]) == user.info_retry_attempts + 1
+
+
+def test_information_is_not_cached_from_a_login_page():
+    pages = ["<html>login</html>"]
+
+    def login(request):
+        if pages:
+            return 200, pages.pop()
+
+    fake = FAKE(routes={"__a=1": login})
+    user = User(USER, fake)
+    user.scheduler.cache = CACHE()
+    assert user.Information(business="skip")["pref"]["id"] == "1"
+    assert json.loads(user.scheduler.Get("https://www.instagram.com/someone/?__a=1").text)["graphql"]["user"]["id"] == "1"
+
+
+def test_information_refresh_skips_the_cache():
+    fake = FAKE()
+    user = User(USER, fake)
+    user.scheduler.cache = CACHE()
+    user.Information()
+    user.Information()
+    assert fake.calls == 2
+    user.Information(refresh=True)
+    assert fake.calls == 4
+
+
+def test_resolve_and_incremental_media():
+    index = INDEX()
+    fake = FAKE(media=120)
+    user = User(USER, fake, index=index)
+    user.Information(business="skip")
+    assert index.Get("someone") == "1"
+    assert user.Media(incremental=True)["media"]["count"] == 120
+
+    # resolved without the profile request, only the new media are paged
+    fake.media = 125
+    calls = fake.calls
+    user = User(USER, fake, index=index)
+    assert user.Resolve() == {"id": "1", "username": "someone"}
+    media = user.Media(incremental=True)["media"]["data"]
+    assert sorted(row["code"] for row in media) == ["c%d" % i for i in range(120, 125)]
+    assert fake.calls - calls == 1
+    assert index.Newest("1") == ("124", 1600000124)
+
+
+def test_incremental_media_after_a_sidecar():
+    index = INDEX()
+    fake = FAKE(media=122, video_every=3)
+
+    def crawl() -> list:
+        user = User(USER, fake, index=index)
+        user.scheduler.Budget("post", 1000, 1000)
+        user.Resolve()
+        return user.Media(incremental=True)["media"]["data"]
+
+    crawl()
+    # the newest post c121 is a sidecar, its id is kept and not the id of a child
+    assert index.Newest("1") == ("121", 1600000121)
+
+    calls = fake.calls
+    assert crawl() == []
+    assert fake.calls - calls == 1
+
+    fake.media = 124
+    assert sorted(row["code"] for row in crawl()) == ["c122", "c123"]
+    assert index.Newest("1") == ("123", 1600000123)
+
+
+def test_incremental_media_is_not_marked_past_errors():
+    index = INDEX()
+    fake = FAKE(media=120, broken=(100,))
+    user = User(USER, fake, index=index)
+    user.Information(business="skip")
+    user.Media(incremental=True)
+    assert index.Newest("1") is None
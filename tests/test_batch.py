@@ -0,0 +1,37 @@
+#package modules
+from InstaScrapApi import BATCH
+from fake import FAKE, Session
+
+
+def test_batch_scraps_every_profile():
+    fake = FAKE(media=30, routes={"/missing/": (404, "The link you followed may be broken")})
+    batch = BATCH(["a", "b", "c", "missing"], session=Session(fake), jobs=("Information", "Media"),
+                  options={"Media": {"get_number": 20}}, profiles=2, threads=4)
+    results = {}
+    stats = batch.Run(lambda username, result: results.setdefault(username, result))
+    batch.Close()
+
+    assert sorted(results) == ["a", "b", "c", "missing"]
+    assert all(results[username]["Media"]["media"]["count"] == 20 for username in "abc")
+    # business info requested in the background is in the result
+    assert results["a"]["Information"]["full"]["public_email"] == "a@b"
+    assert results["missing"]["errors"] == ["NOT_VALID_USERNAME"]
+    assert "Media" not in results["missing"]
+    assert stats["profiles"] == 4 and stats["failed"] == 1
+    assert stats["requests"] == fake.calls
+
+
+def test_batch_reads_usernames_as_profiles_finish():
+    read = []
+
+    def usernames():
+        for i in range(10):
+            read.append(i)
+            yield "u%d" % i
+
+    batch = BATCH(usernames(), session=Session(FAKE(latency=0.01)), jobs=("Information",), profiles=2, threads=4, business="skip")
+    results = batch.Iter()
+    next(results)
+    assert len(read) <= 2 * 2 + 1
+    assert len(list(results)) == 9
+    batch.Close()
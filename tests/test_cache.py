@@ -0,0 +1,60 @@
+#standard modules
+import time
+
+#package modules
+from InstaScrapApi import CACHE
+from InstaScrapApi.core.throttle import SCHEDULER
+from fake import FAKE, Session
+
+
+PROFILE = "https://www.instagram.com/u%d/?__a=1"
+
+
+def test_cache_keeps_only_valid_responses():
+    fake = FAKE(routes={"/bad/": (200, "<html>login</html>")})
+    scheduler = SCHEDULER(Session(fake))
+    scheduler.cache = CACHE(ttls={"profile": 0.05})
+
+    for _ in range(2):
+        scheduler.Get("https://www.instagram.com/bad/?__a=1")
+    assert fake.calls == 2
+
+    for _ in range(2):
+        scheduler.Get("https://www.instagram.com/someone/?__a=1")
+    assert fake.calls == 3
+    time.sleep(0.06)
+    scheduler.Get("https://www.instagram.com/someone/?__a=1")
+    assert fake.calls == 4
+
+
+def test_cache_drops_the_least_recently_used():
+    fake = FAKE()
+    scheduler = SCHEDULER(Session(fake))
+    scheduler.cache = CACHE(size=2)
+    for i in (0, 1, 0, 2):
+        scheduler.Get(PROFILE % i)
+    assert fake.calls == 3
+
+    # u1 was the least recently used
+    scheduler.Get(PROFILE % 0)
+    scheduler.Get(PROFILE % 1)
+    assert fake.calls == 4
+    assert scheduler.cache.Stats() == {"hits": 2, "misses": 4, "size": 2}
+
+
+def test_cache_persists_to_disk(tmp_path):
+    path = str(tmp_path / "cache.db")
+    fake = FAKE()
+    scheduler = SCHEDULER(Session(fake))
+    scheduler.cache = CACHE(path=path)
+    scheduler.Get(PROFILE % 0)
+    scheduler.cache.Close()
+
+    scheduler.cache = CACHE(path=path)
+    assert scheduler.Get(PROFILE % 0).json()["graphql"]["user"]["id"] == "1"
+    scheduler.Get(PROFILE % 0, refresh=True)
+    assert fake.calls == 2
+
+    scheduler.cache.Invalidate()
+    scheduler.Get(PROFILE % 0)
+    assert fake.calls == 3
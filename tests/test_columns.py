@@ -0,0 +1,43 @@
+#third party modules
+import pytest
+
+#package modules
+from InstaScrapApi import COLUMNS, MEDIA, PROFILE
+from InstaScrapApi.core.parser import MediaDict, MediaNode, UserNode as UserDict
+from fake import MediaNode as Node, UserNode
+
+
+def test_columns_keep_the_rows():
+    columns = COLUMNS(PROFILE)
+    for i in range(3):
+        columns.Add(UserDict(UserNode(i)))
+    columns.Add(PROFILE.FromDict({"id": "3", "username": "ü"}))
+
+    assert len(columns) == 4
+    assert columns["id"] == [0, 1, 2, 3]
+    assert columns["username"] == ["u0", "u1", "u2", "ü"]
+    # missing fields are kept as nulls
+    assert columns["full_name"][3] is None and columns["verified"][3] is None
+
+
+def test_columns_write_and_read(tmp_path):
+    columns = COLUMNS(MEDIA)
+    for i in range(5):
+        row = MediaDict(MediaNode(Node(i, "GraphVideo" if i % 2 else "GraphImage")))
+        row["hd_link"] = None if i == 4 else row["hd_link"]
+        columns.Add(row)
+
+    path = str(tmp_path / "media.col")
+    columns.Write(path)
+    read = COLUMNS.Read(path)
+    assert read.record is MEDIA
+    assert read.to_dict() == columns.to_dict()
+    assert read["video"] == [False, True, False, True, False]
+    assert read["hd_link"][4] is None
+
+
+def test_columns_read_rejects_other_files(tmp_path):
+    path = tmp_path / "other.col"
+    path.write_bytes(b"not columns")
+    with pytest.raises(ValueError):
+        COLUMNS.Read(str(path))
@@ -0,0 +1,169 @@
+#standard modules
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+#third party modules
+import pytest
+
+#package modules
+from InstaScrapApi import CHECKPOINT
+from InstaScrapApi.core.engine import NODES, PAGINATOR, STREAM
+
+
+class CHAIN(object):
+    '''cursor chain of total rows, fetch returns None at cursor fail'''
+
+    def __init__(self, total=50, fail=None):
+        self.total = total
+        self.fail = fail
+        self.cursors = []
+
+    def fetch(self, after: str, number: int):
+        start = int(after or 0)
+        self.cursors.append(start)
+        if start == self.fail:
+            return
+        end = min(self.total, start + number)
+        return list(range(start, end)), end < self.total, str(end)
+
+    @staticmethod
+    def scrap(page: list, add, resolve) -> None:
+        for row in page:
+            add(row)
+
+
+@pytest.fixture
+def pool():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown()
+
+
+def test_paginator_follows_the_chain(pool):
+    chain = CHAIN(50)
+    rows = NODES("id")
+    PAGINATOR(pool, chain.fetch, chain.scrap, lambda row: rows.Add({"id": row})).Run("", [10, 10, 10])
+    assert sorted(row["id"] for row in rows) == list(range(50))
+    assert chain.cursors == [0, 10, 20, 30, 40]
+
+
+def test_paginator_stops_at_the_requested_number(pool):
+    chain = CHAIN(50)
+    rows = []
+    PAGINATOR(pool, chain.fetch, chain.scrap, rows.append).Run("", [2, 5, 10])
+    assert sorted(rows) == list(range(15))
+
+
+def test_paginator_reports_worker_errors(pool):
+    chain = CHAIN(30)
+    rows = []
+    errors = []
+
+    def scrap(page: list, add, resolve) -> None:
+        for row in page:
+            if row == 15:
+                raise KeyError("edge_media_preview_like")
+            add(row)
+
+    PAGINATOR(pool, chain.fetch, scrap, rows.append, errors=errors.append).Run("", [3, 10, 10])
+    # the rest of the failing page is skipped, the chain goes on
+    assert sorted(rows) == list(range(15)) + list(range(20, 30))
+    assert [str(error) for error in errors] == ["'edge_media_preview_like'"]
+
+
+def test_paginator_reports_resolve_errors(pool):
+    chain = CHAIN(10)
+    rows = []
+    errors = []
+
+    def detail(row: int) -> list:
+        if row == 3:
+            raise ValueError("no post page")
+        return [row]
+
+    def scrap(page: list, add, resolve) -> None:
+        for row in page:
+            resolve(detail, (row,))
+
+    PAGINATOR(pool, chain.fetch, scrap, rows.append, errors=errors.append).Run("", [1, 10, 10])
+    # only the failing row is lost
+    assert sorted(rows) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert [str(error) for error in errors] == ["no post page"]
+
+
+def test_checkpoint_resumes_interrupted_chain(pool, tmp_path):
+    checkpoint = CHECKPOINT(str(tmp_path / "crawl.db"))
+
+    interrupted = CHAIN(50, fail=30)
+    rows = []
+    PAGINATOR(pool, interrupted.fetch, interrupted.scrap, rows.append, checkpoint=checkpoint, job="t").Run("", [5, 10, 10])
+    assert rows == list(range(30))
+
+    resumed = CHAIN(50)
+    rows = []
+    PAGINATOR(pool, resumed.fetch, resumed.scrap, rows.append, checkpoint=checkpoint, job="t").Run("", [5, 10, 10])
+    assert sorted(rows) == list(range(50))
+    assert resumed.cursors == [30, 40]
+
+
+def test_checkpoint_clears_finished_chain(pool, tmp_path):
+    checkpoint = CHECKPOINT(str(tmp_path / "crawl.db"))
+    PAGINATOR(pool, CHAIN(20).fetch, CHAIN.scrap, lambda row: None, checkpoint=checkpoint, job="t").Run("", [2, 10, 10])
+    assert list(checkpoint.Resume("t", "")) == []
+
+    # the next crawl requests the chain again and sees its new rows
+    grown = CHAIN(30)
+    rows = []
+    PAGINATOR(pool, grown.fetch, grown.scrap, rows.append, checkpoint=checkpoint, job="t").Run("", [3, 10, 10])
+    assert sorted(rows) == list(range(30))
+    assert grown.cursors == [0, 10, 20]
+
+
+def test_checkpoint_requests_a_failed_page_again(pool, tmp_path):
+    checkpoint = CHECKPOINT(str(tmp_path / "crawl.db"))
+    chain = CHAIN(30)
+    broken = [True]
+
+    def scrap(page: list, add, resolve) -> None:
+        for row in page:
+            if row == 15 and broken:
+                raise KeyError("edge_media_preview_like")
+            add(row)
+
+    PAGINATOR(pool, chain.fetch, scrap, lambda row: None, checkpoint=checkpoint, job="t", errors=lambda error: None).Run("", [3, 10, 10])
+    broken.clear()
+    chain.cursors.clear()
+    rows = []
+    PAGINATOR(pool, chain.fetch, scrap, rows.append, checkpoint=checkpoint, job="t").Run("", [3, 10, 10])
+    assert sorted(rows) == list(range(30))
+    assert chain.cursors == [10, 20]
+
+
+def test_paginator_cancel_stops_requesting_pages(pool):
+    chain = CHAIN(1000)
+    started = threading.Event()
+    release = threading.Event()
+
+    def fetch(after, number):
+        started.set()
+        release.wait()
+        return chain.fetch(after, number)
+
+    paginator = PAGINATOR(pool, fetch, chain.scrap, lambda row: None)
+    paginator.Start("", [100, 10, 10])
+    started.wait()
+    paginator.Cancel()
+    release.set()
+    assert paginator.tasks.Wait(5)
+    assert chain.cursors == [0]
+
+
+def test_stream_close_cancels_the_paging(pool):
+    chain = CHAIN(10000)
+    stream = STREAM(size=5)
+    paginator = PAGINATOR(pool, chain.fetch, chain.scrap, stream.Put, done=stream.End)
+    rows = stream.Iter(paginator, "", [1000, 10, 10])
+    assert [next(rows) for _ in range(3)] == [0, 1, 2]
+    rows.close()
+    assert paginator.tasks.Wait(5)
+    assert len(chain.cursors) < 1000
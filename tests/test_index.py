@@ -0,0 +1,46 @@
+#package modules
+from InstaScrapApi import BATCH, INDEX, USER
+from fake import FAKE, Session, User
+
+
+def test_index_persists_across_runs(tmp_path):
+    path = str(tmp_path / "profiles.db")
+    index = INDEX(path)
+    index.Load({"Someone": 1, "other": "2"})
+    index.Close()
+
+    index = INDEX(path)
+    assert len(index) == 2
+    assert index.Get("someone") == "1" and "OTHER" in index
+    assert index.Lookup(["Someone", "unknown"]) == {"Someone": "1"}
+    index.Remove("other")
+    assert index.Get("other") is None
+
+
+def test_resolve_skips_known_profiles():
+    index = INDEX()
+    fake = FAKE(routes={"/missing/": (404, "The link you followed may be broken")})
+    User(USER, fake, index=index).Information(business="skip")
+    assert index.Get("someone") == "1"
+
+    calls = fake.calls
+    user = User(USER, fake, index=index)
+    assert user.Resolve() == {"id": "1", "username": "someone"}
+    assert fake.calls == calls
+
+    # unknown users are forgotten
+    index.Add("missing", "9")
+    user = USER("missing", session=Session(fake), bar=False, index=index)
+    user.Information(business="skip")
+    assert not user.user_valid and "missing" not in index
+
+
+def test_batch_resolves_from_the_index():
+    index = INDEX()
+    index.Load({"a": "1", "b": "1"})
+    fake = FAKE(media=10)
+    batch = BATCH(["a", "b"], session=Session(fake), jobs=("Resolve", "Media"), index=index, threads=2)
+    results = dict(batch.Iter())
+    batch.Close()
+    assert [results[username]["Media"]["media"]["count"] for username in "ab"] == [10, 10]
+    assert not [url for url in fake.urls if "__a=1" in url]
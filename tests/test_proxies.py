@@ -0,0 +1,69 @@
+#package modules
+from InstaScrapApi import PROXIES, USER
+from fake import FAKE, Session, User
+
+
+def test_empty_pool_sends_directly():
+    fake = FAKE()
+    response = PROXIES().Send(Session(fake), "https://www.instagram.com/someone/?__a=1")
+    assert response.status_code == 200
+    assert fake.proxied == [None]
+
+    user = User(USER, fake, proxy=PROXIES())
+    assert user.Information(business="skip")["pref"]["id"] == "1"
+
+
+def test_failing_proxy_is_dropped_for_the_cooldown():
+    pool = PROXIES(["http://a", "http://b"], cooldown=60)
+    a, b = pool.proxies
+    for _ in range(pool.WARMUP):
+        pool.Report(a, 0.1, False)
+        pool.Report(b, 0.1, True)
+
+    assert a.Stats()["dropped"] > 50 and a.requests == 0
+    assert pool.Healthy() == [b]
+    assert all(pool.Pick("https://www.instagram.com/p/c%d" % i) is b for i in range(10))
+
+    # with every proxy dropped the pool still sends through all of them
+    b.dropped = a.dropped
+    assert pool.Healthy() == [a, b]
+
+
+def test_slow_proxy_is_dropped():
+    pool = PROXIES(["http://a"], max_latency=1)
+    proxy = pool.proxies[0]
+    for _ in range(pool.WARMUP - 1):
+        pool.Report(proxy, 3, True)
+    assert not proxy.dropped
+    pool.Report(proxy, 3, True)
+    assert proxy.dropped
+
+
+def test_pick_prefers_the_faster_proxy():
+    pool = PROXIES(["http://a", "http://b"])
+    a, b = pool.proxies
+    pool.Report(a, 0.2, True)
+    pool.Report(b, 0.1, True)
+    assert pool.Pick("https://www.instagram.com/") is b
+    # errors weigh more than latency
+    pool.Report(b, 0.1, False)
+    assert pool.Pick("https://www.instagram.com/") is a
+
+
+def test_send_tries_the_next_proxy_on_proxy_errors():
+    fake = FAKE(dead=("http://dead",))
+    pool = PROXIES(["http://dead", "http://alive"])
+    session = Session(fake)
+    for _ in range(10):
+        assert pool.Send(session, "https://www.instagram.com/someone/?__a=1").status_code == 200
+
+    dead, alive = pool.proxies
+    assert alive.requests == 10
+    assert dead.dropped or dead.errors > 0
+
+
+def test_chain_stays_on_its_proxy():
+    pool = PROXIES(["http://%d" % i for i in range(10)], chain=True)
+    url = 'https://www.instagram.com/graphql/query/?query_hash=h&variables={"id":1,"first":50,"after":"%s"}'
+    proxy = pool.Pick(url % "")
+    assert all(pool.Pick(url % after) is proxy for after in ("a", "b", "c"))
@@ -0,0 +1,74 @@
+#standard modules
+import gzip
+import json
+
+#third party modules
+import pytest
+
+#package modules
+from InstaScrapApi import MEDIA, NDJSON, USER
+from fake import FAKE, User
+
+
+def Lines(path: str, compress=None) -> list:
+    opener = gzip.open if compress == "gzip" else open
+    with opener(path, "rb") as source:
+        return [json.loads(line) for line in source]
+
+
+def test_ndjson_writes_dicts_and_records(tmp_path):
+    path = str(tmp_path / "rows.ndjson")
+    with NDJSON(path) as sink:
+        sink.Add({"id": 1})
+        sink.Add(MEDIA.FromDict({"node_id": "2"}))
+    assert len(sink) == 2
+    assert Lines(path)[0] == {"id": 1}
+    assert Lines(path)[1]["node_id"] == "2"
+
+
+@pytest.mark.parametrize("compress", [None, "gzip"])
+def test_ndjson_reopen_appends(tmp_path, compress):
+    path = str(tmp_path / "rows.ndjson")
+    sink = NDJSON(path, compress=compress)
+    sink.Add({"id": 1})
+    sink.Close()
+    with sink:
+        sink.Add({"id": 2})
+
+    assert Lines(path, compress) == [{"id": 1}, {"id": 2}]
+    assert sink.files == [path]
+
+
+def test_ndjson_rotates_files(tmp_path):
+    path = str(tmp_path / "rows.ndjson")
+    with NDJSON(path, rotate=100, buffer=1) as sink:
+        for i in range(20):
+            sink.Add({"id": i, "text": "x" * 20})
+
+    assert len(sink.files) == 7
+    assert sink.files[0] == str(tmp_path / "rows.00000.ndjson")
+    rows = [row for name in sink.files for row in Lines(name)]
+    assert [row["id"] for row in rows] == list(range(20))
+
+
+def test_ndjson_compresses(tmp_path):
+    path = str(tmp_path / "rows.ndjson.gz")
+    with NDJSON(path, compress="gzip", buffer=100) as sink:
+        for i in range(50):
+            sink.Add({"id": i})
+    assert [row["id"] for row in Lines(path, "gzip")] == list(range(50))
+
+
+def test_ndjson_rejects_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        NDJSON(str(tmp_path / "rows.ndjson"), compress="lz4")
+
+
+def test_media_sink(tmp_path):
+    path = str(tmp_path / "media.ndjson")
+    user = User(USER, FAKE(media=120))
+    user.Information(business="skip")
+    with NDJSON(path) as sink:
+        result = user.Media(sink=sink)
+    assert result["media"]["count"] == 120
+    assert sorted(row["code"] for row in Lines(path)) == sorted("c%d" % i for i in range(120))
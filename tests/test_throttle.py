@@ -0,0 +1,127 @@
+#standard modules
+import time
+import threading
+
+#package modules
+from InstaScrapApi import ACCOUNTS, USER
+from InstaScrapApi.core.throttle import BACKOFF, BUCKET, SCHEDULER
+from fake import FAKE, Session
+
+
+def test_backoff_merges_in_flight_failures():
+    backoff = BACKOFF(base=1)
+    sent = threading.Barrier(5)
+    pauses = []
+
+    def worker():
+        backoff.Wait()
+        sent.wait()
+        pauses.append(backoff.Failure(429))
+        backoff.Release()
+
+    workers = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    # one throttle burst is one step of the backoff
+    assert backoff.failures == 1
+    assert backoff.concurrency == 15
+    assert max(pauses) <= 1
+
+
+def test_backoff_grows_on_failures_after_the_pause():
+    backoff = BACKOFF(base=0.01)
+    backoff.Failure(429, sent=time.time())
+    time.sleep(0.02)
+    backoff.Failure(429, sent=time.time())
+    assert backoff.failures == 2
+    assert backoff.concurrency == 7
+
+
+def test_backoff_follows_retry_after_and_ramps_up():
+    backoff = BACKOFF(concurrency=4, ramp=2)
+    assert 9 < backoff.Failure(429, "10", sent=time.time()) <= 10
+    assert backoff.concurrency == 2
+
+    backoff.resume_at = 0
+    for _ in range(4):
+        backoff.Success()
+    assert backoff.concurrency == 4
+    assert backoff.failures == 0
+
+
+def test_bucket_serves_interactive_callers_first():
+    bucket = BUCKET(rate=20, burst=1)
+    bucket.Take()
+    order = []
+
+    def take(priority):
+        bucket.Take(priority)
+        order.append(priority)
+
+    bulk = threading.Thread(target=take, args=(SCHEDULER.BULK,))
+    bulk.start()
+    time.sleep(0.01)
+    interactive = threading.Thread(target=take, args=(SCHEDULER.INTERACTIVE,))
+    interactive.start()
+    bulk.join()
+    interactive.join()
+    assert order == [SCHEDULER.INTERACTIVE, SCHEDULER.BULK]
+
+
+def test_scheduler_classifies_endpoints():
+    scheduler = SCHEDULER(Session(FAKE()))
+    assert scheduler.Classify("https://www.instagram.com/someone/?__a=1") == "profile"
+    assert scheduler.Classify("https://i.instagram.com/api/v1/users/1/info/") == "info"
+    assert scheduler.Classify("https://www.instagram.com/p/c1") == "post"
+    assert scheduler.Classify("https://www.instagram.com/web/search/topsearch/?query=a") == "search"
+    assert scheduler.Classify("https://www.instagram.com/graphql/query/?query_hash=42323d64886122307be10013ad2dcc44") == "graphql:profile_media"
+
+
+def test_scheduler_keeps_endpoint_budgets_apart():
+    fake = FAKE(media=12, video_every=2)
+    scheduler = SCHEDULER(Session(fake), budgets={"post": (20, 1)})
+
+    time1 = time.time()
+    for i in range(5):
+        scheduler.Get("https://www.instagram.com/p/c%d" % i)
+    assert time.time() - time1 >= 0.18
+
+    # the post budget is used up, profile requests still have theirs
+    time1 = time.time()
+    for _ in range(5):
+        scheduler.Get("https://www.instagram.com/someone/?__a=1")
+    assert time.time() - time1 < 0.1
+    assert scheduler.requests == 10
+
+
+def test_accounts_park_throttled_account():
+    throttled = FAKE(routes={"__a=1": (429, "wait", {"Retry-After": "0"})})
+    healthy = FAKE()
+    accounts = ACCOUNTS([Session(throttled), Session(healthy)], cooldown=60)
+
+    response = accounts.Get("https://www.instagram.com/someone/?__a=1")
+    assert response.status_code == 200
+    assert throttled.calls == 1
+
+    stats = accounts.Stats()
+    assert stats[0]["failures"] == 1 and stats[0]["cooldown"] > 50
+    # the parked account is left out until its cooldown passed
+    accounts.Get("https://www.instagram.com/someone/?__a=1")
+    assert throttled.calls == 1
+    assert healthy.calls == 2
+
+
+def test_accounts_spread_the_requests():
+    fakes = [FAKE(media=120) for _ in range(3)]
+    accounts = ACCOUNTS([Session(fake, {"sessionid": str(i), "ds_user_id": str(i)}) for i, fake in enumerate(fakes)])
+    user = USER("someone", session=accounts.session, bar=False)
+    user.Information(business="skip")
+    assert user.Media(per_request=10)["media"]["count"] == 120
+
+    # every account took a share of the pages
+    assert all(fake.calls > 1 for fake in fakes)
+    assert sum(fake.calls for fake in fakes) == accounts.requests == 13
+    assert [stats["user_id"] for stats in accounts.Stats()] == ["0", "1", "2"]